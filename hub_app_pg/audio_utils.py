@@ -0,0 +1,412 @@
+# audio_utils.py
+import bisect
+import hashlib
+import os
+import re
+import resource
+import subprocess
+import tempfile
+import wave
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 정적 오디오 파일 저장 위치 (RunPod가 URL로 내려받을 수 있도록 외부에 공개되는 디렉토리)
+STATIC_AUDIO_DIR = Path(__file__).parent.absolute() / "static" / "audio"
+STATIC_AUDIO_URL = os.getenv(
+    "STATIC_AUDIO_URL", "https://grapeman.duckdns.org/static/audio"
+)
+
+# 파일 해시 계산 및 저장 시 한 번에 처리할 크기
+CHUNK_SIZE = 1024 * 1024
+
+# Whisper 전송 전 전처리 설정 ("off"로 설정하면 원본 그대로 전송)
+AUDIO_PREPROCESS = os.getenv("AUDIO_PREPROCESS", "on")
+# 전처리 출력 형식: "flac"(무손실) 또는 "opus"(손실, 더 작음)
+AUDIO_PREPROCESS_FORMAT = os.getenv("AUDIO_PREPROCESS_FORMAT", "flac")
+# 이 음량 이하가 일정 시간 이상 이어지면 무음으로 간주
+SILENCE_NOISE = os.getenv("AUDIO_SILENCE_NOISE", "-35dB")
+SILENCE_MIN_SEC = float(os.getenv("AUDIO_SILENCE_MIN_SEC", 1.0))
+# 무음 구간을 잘라낼 때 말소리 앞뒤로 남겨둘 여유 (초)
+SILENCE_PADDING_SEC = 0.2
+
+# 긴 녹음을 나눠서 병렬 변환할 청크 수 (1이면 분할하지 않음)
+WHISPER_CHUNKS = int(os.getenv("WHISPER_CHUNKS", 1))
+# 이 길이(초)보다 짧은 녹음은 분할하지 않음
+CHUNK_MIN_DURATION_SEC = float(os.getenv("WHISPER_CHUNK_MIN_SEC", 600))
+# 분할 지점을 찾을 때 사용하는 짧은 무음 기준 (전처리로 긴 무음은 이미 제거됨)
+SPLIT_SILENCE_MIN_SEC = 0.3
+# 청크 경계 앞뒤로 겹쳐서 포함할 길이 (초)
+CHUNK_OVERLAP_SEC = 1.0
+
+# 전처리 중간 PCM(WAV) 샘플링 주파수와 구간 복사 시 한 번에 읽을 샘플 수
+PREPROCESS_SAMPLE_RATE = 16000
+PCM_COPY_FRAMES = 64 * 1024
+
+# 출력 형식별 ffmpeg 인코딩 옵션과 확장자
+PREPROCESS_CODECS = {
+    "flac": (["-c:a", "flac"], ".flac"),
+    "opus": (["-c:a", "libopus", "-b:a", "24k"], ".ogg"),
+}
+
+
+def hash_upload(uploaded_file) -> str:
+    """
+    업로드된 파일의 sha256 해시를 계산합니다.
+    getbuffer()의 memoryview를 청크 단위로 읽으므로 파일 내용을 복사하지 않습니다.
+
+    Args:
+        uploaded_file: st.file_uploader가 반환한 UploadedFile
+
+    Returns:
+        16진수 sha256 문자열
+    """
+    buffer = uploaded_file.getbuffer()
+    digest = hashlib.sha256()
+    for offset in range(0, len(buffer), CHUNK_SIZE):
+        digest.update(buffer[offset : offset + CHUNK_SIZE])
+    return digest.hexdigest()
+
+
+def store_upload(uploaded_file, file_hash: str) -> Path:
+    """
+    업로드된 파일을 내용 기반 경로(static/audio/{sha256}.{ext})에 한 번만 저장합니다.
+    같은 내용의 파일이 이미 있으면 다시 쓰지 않고 재사용합니다.
+
+    Args:
+        uploaded_file: st.file_uploader가 반환한 UploadedFile
+        file_hash: hash_upload 결과
+
+    Returns:
+        저장된 파일 경로
+    """
+    ext = Path(uploaded_file.name).suffix.lower()
+    file_path = STATIC_AUDIO_DIR / f"{file_hash}{ext}"
+    if file_path.exists() and file_path.stat().st_size == uploaded_file.size:
+        # 재사용 시 수정 시각을 갱신하여 오래된 파일 정리 대상에서 제외
+        os.utime(file_path)
+        return file_path
+
+    STATIC_AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+    buffer = uploaded_file.getbuffer()
+
+    # 같은 디렉토리의 임시 파일에 청크 단위로 기록한 뒤 원자적으로 이름 변경
+    fd, temp_path = tempfile.mkstemp(dir=STATIC_AUDIO_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for offset in range(0, len(buffer), CHUNK_SIZE):
+                f.write(buffer[offset : offset + CHUNK_SIZE])
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return file_path
+
+
+def get_audio_url(file_path: Path) -> str:
+    """정적 디렉토리에 저장된 파일의 공개 URL"""
+    return f"{STATIC_AUDIO_URL}/{Path(file_path).name}"
+
+
+def get_peak_rss_mb() -> float:
+    """현재 프로세스의 최대 메모리 사용량 (MB, Linux 기준)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def detect_silences(
+    file_path: Path, min_silence_sec: float = SILENCE_MIN_SEC
+) -> Tuple[List[Tuple[float, float]], float]:
+    """
+    ffmpeg silencedetect 필터로 무음 구간을 찾습니다.
+
+    Args:
+        file_path: 오디오 파일 경로
+        min_silence_sec: 무음으로 간주할 최소 길이 (초)
+
+    Returns:
+        ([(무음 시작, 무음 끝)], 전체 길이(초))
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            str(file_path),
+            "-af",
+            f"silencedetect=noise={SILENCE_NOISE}:d={min_silence_sec}",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    log = result.stderr
+
+    duration = 0.0
+    match = re.search(r"Duration: (\d+):(\d+):(\d+\.?\d*)", log)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    starts = [float(v) for v in re.findall(r"silence_start: (-?\d+\.?\d*)", log)]
+    ends = [float(v) for v in re.findall(r"silence_end: (\d+\.?\d*)", log)]
+    # 파일 끝까지 무음이면 silence_end가 출력되지 않음
+    if len(ends) < len(starts):
+        ends.append(duration)
+    return [(max(0.0, s), e) for s, e in zip(starts, ends)], duration
+
+
+def get_voiced_intervals(
+    silences: List[Tuple[float, float]], duration: float
+) -> List[Tuple[float, float]]:
+    """
+    무음 구간을 제외한 (시작, 끝) 구간 목록 (앞뒤 여유 포함)
+    여유를 더해 겹치거나 맞닿는 구간은 하나로 합칩니다. (같은 소리가 두 번 선택되지 않도록)
+    """
+    padded = []
+    cursor = 0.0
+    for start, end in silences:
+        if start > cursor:
+            padded.append(
+                (
+                    max(0.0, cursor - SILENCE_PADDING_SEC),
+                    min(duration, start + SILENCE_PADDING_SEC),
+                )
+            )
+        cursor = end
+    if cursor < duration:
+        padded.append((max(0.0, cursor - SILENCE_PADDING_SEC), duration))
+
+    intervals = []
+    for start, end in padded:
+        if intervals and start <= intervals[-1][1]:
+            intervals[-1] = (intervals[-1][0], max(intervals[-1][1], end))
+        else:
+            intervals.append((start, end))
+    return intervals
+
+
+def cut_voiced_pcm(
+    source_path: str, output_path: str, intervals: List[Tuple[float, float]]
+) -> List[Tuple[float, float]]:
+    """
+    PCM WAV 파일에서 말소리 구간만 샘플 단위로 이어 붙입니다.
+    구간마다 해당 위치로 이동해 복사하므로 구간 수와 관계없이 전체 길이에 비례하는 시간만 걸립니다.
+    (ffmpeg aselect 식은 모든 프레임에서 구간 수만큼 비교해야 하고, 긴 녹음에서는 인자 길이 제한도 넘음)
+
+    Returns:
+        시간 매핑 [(출력 파일 시작 시각, 원본 시작 시각)]
+    """
+    time_map = []
+    with wave.open(source_path, "rb") as source, wave.open(output_path, "wb") as output:
+        output.setparams(source.getparams())
+        rate = source.getframerate()
+        frame_bytes = source.getsampwidth() * source.getnchannels()
+        total = source.getnframes()
+        written = 0
+        for start, end in intervals:
+            first = min(total, round(start * rate))
+            last = min(total, round(end * rate))
+            if last <= first:
+                continue
+            time_map.append((written / rate, first / rate))
+            source.setpos(first)
+            remaining = last - first
+            while remaining > 0:
+                frames = source.readframes(min(remaining, PCM_COPY_FRAMES))
+                if not frames:
+                    break
+                output.writeframes(frames)
+                count = len(frames) // frame_bytes
+                remaining -= count
+                written += count
+    return time_map or [(0.0, 0.0)]
+
+
+def preprocess_audio(file_path: Path) -> Tuple[Path, List[Tuple[float, float]]]:
+    """
+    Whisper 전송용으로 16kHz 모노 FLAC/Opus 변환 및 무음 구간 제거를 수행합니다.
+
+    Args:
+        file_path: 원본 오디오 파일 경로
+
+    Returns:
+        (전처리된 파일 경로, 시간 매핑 [(출력 파일 시작 시각, 원본 시작 시각)])
+    """
+    codec_args, ext = PREPROCESS_CODECS[AUDIO_PREPROCESS_FORMAT]
+    file_path = Path(file_path)
+    output_path = file_path.with_name(f"{file_path.stem}.16k{ext}")
+
+    silences, duration = detect_silences(file_path)
+    intervals = get_voiced_intervals(silences, duration)
+
+    def run_ffmpeg(source, *args):
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-nostats", "-y", "-i", str(source), *args],
+            capture_output=True,
+            check=True,
+        )
+
+    # 같은 업로드를 여러 세션이 동시에 처리할 수 있으므로 임시 파일에 쓴 뒤 원자적으로 이름 변경
+    # (ffmpeg가 확장자로 출력 형식을 판단하므로 임시 파일도 같은 확장자로 끝나야 함)
+    temp_paths = []
+
+    def make_temp(suffix):
+        fd, temp_path = tempfile.mkstemp(dir=output_path.parent, suffix=suffix)
+        os.close(fd)
+        temp_paths.append(temp_path)
+        return temp_path
+
+    pcm_args = ["-ac", "1", "-ar", str(PREPROCESS_SAMPLE_RATE)]
+    try:
+        temp_path = make_temp(f".part{ext}")
+        if intervals and silences:
+            # 16kHz 모노 PCM으로 한 번 디코딩한 뒤 말소리 구간만 이어 붙여 인코딩
+            decoded_path = make_temp(".part.wav")
+            voiced_path = make_temp(".part.wav")
+            run_ffmpeg(file_path, *pcm_args, "-c:a", "pcm_s16le", decoded_path)
+            time_map = cut_voiced_pcm(decoded_path, voiced_path, intervals)
+            run_ffmpeg(voiced_path, *codec_args, temp_path)
+        else:
+            time_map = [(0.0, 0.0)]
+            run_ffmpeg(file_path, *pcm_args, *codec_args, temp_path)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, output_path)
+    finally:
+        for path in temp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+    return output_path, time_map
+
+
+def remap_timestamp(seconds: float, time_map: List[Tuple[float, float]]) -> float:
+    """전처리된 파일 기준 시각을 원본 파일 기준 시각으로 변환"""
+    index = max(0, bisect.bisect_right(time_map, seconds, key=lambda item: item[0]) - 1)
+    output_start, source_start = time_map[index]
+    return round(source_start + (seconds - output_start), 2)
+
+
+def remap_segments(
+    segments: List[Dict], time_map: List[Tuple[float, float]]
+) -> List[Dict]:
+    """Whisper 세그먼트의 start/end를 원본 파일 기준으로 변환"""
+    return [
+        {
+            **segment,
+            "start": remap_timestamp(segment["start"], time_map),
+            "end": remap_timestamp(segment["end"], time_map),
+        }
+        for segment in segments
+    ]
+
+
+def split_audio(file_path: Path, num_chunks: int) -> List[Tuple[Path, float]]:
+    """
+    오디오를 무음 지점 기준으로 num_chunks개로 나눕니다.
+    각 청크는 경계 앞뒤로 CHUNK_OVERLAP_SEC만큼 겹치도록 잘라 문장이 끊기지 않게 합니다.
+
+    Args:
+        file_path: 오디오 파일 경로
+        num_chunks: 나눌 청크 수
+
+    Returns:
+        [(청크 파일 경로, 원본 파일 기준 청크 시작 시각)], 분할하지 않으면 [(원본, 0.0)]
+    """
+    file_path = Path(file_path)
+    if num_chunks <= 1:
+        return [(file_path, 0.0)]
+    silences, duration = detect_silences(file_path, SPLIT_SILENCE_MIN_SEC)
+    if duration < CHUNK_MIN_DURATION_SEC:
+        return [(file_path, 0.0)]
+
+    # 균등 분할 지점에서 가장 가까운 무음 구간의 중앙을 경계로 사용
+    chunk_length = duration / num_chunks
+    midpoints = [(start + end) / 2 for start, end in silences]
+    boundaries = [0.0]
+    for k in range(1, num_chunks):
+        target = chunk_length * k
+        nearest = min(midpoints, key=lambda m: abs(m - target), default=target)
+        boundaries.append(nearest if abs(nearest - target) < chunk_length / 4 else target)
+    boundaries.append(duration)
+
+    # 같은 파일을 여러 세션이 동시에 분할할 수 있으므로 청크 파일 이름은 작업마다 고유하게 생성
+    chunks = []
+    try:
+        for index, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+            chunk_start = max(0.0, start - CHUNK_OVERLAP_SEC)
+            chunk_end = min(duration, end + CHUNK_OVERLAP_SEC)
+            fd, temp_path = tempfile.mkstemp(
+                dir=file_path.parent,
+                prefix=f"{file_path.stem}.part{index}.",
+                suffix=".flac",
+            )
+            os.close(fd)
+            chunk_path = Path(temp_path)
+            chunks.append((chunk_path, chunk_start))
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-nostats",
+                    "-y",
+                    "-ss",
+                    f"{chunk_start:.3f}",
+                    "-to",
+                    f"{chunk_end:.3f}",
+                    "-i",
+                    str(file_path),
+                    "-ac",
+                    "1",
+                    "-ar",
+                    "16000",
+                    "-c:a",
+                    "flac",
+                    str(chunk_path),
+                ],
+                capture_output=True,
+                check=True,
+            )
+            os.chmod(chunk_path, 0o644)
+    except Exception:
+        for chunk_path, _ in chunks:
+            try:
+                os.remove(chunk_path)
+            except OSError:
+                pass
+        raise
+    return chunks
+
+
+def stitch_segments(chunk_segments: List[Tuple[float, List[Dict]]]) -> List[Dict]:
+    """
+    청크별 Whisper 결과를 하나의 세그먼트 목록으로 합칩니다.
+    청크 시작 시각만큼 시간을 보정하고, 겹치는 구간에서 중복된 세그먼트는 제거합니다.
+
+    Args:
+        chunk_segments: [(청크 시작 시각, 세그먼트 리스트)]
+
+    Returns:
+        시간순으로 정렬된 세그먼트 리스트
+    """
+    stitched = []
+    last_end = 0.0
+    for offset, segments in sorted(chunk_segments, key=lambda item: item[0]):
+        for segment in segments:
+            start = round(segment["start"] + offset, 2)
+            end = round(segment["end"] + offset, 2)
+            # 이전 청크와 겹치는 구간에서 이미 포함된 세그먼트는 건너뜀
+            if stitched and (
+                start < last_end - CHUNK_OVERLAP_SEC / 2
+                or (
+                    start < last_end + CHUNK_OVERLAP_SEC
+                    and segment["text"].strip() == stitched[-1]["text"].strip()
+                )
+            ):
+                continue
+            stitched.append({**segment, "start": start, "end": end})
+            last_end = max(last_end, end)
+    return stitched
@@ -1,3 +1,4 @@
+import atexit
 import base64
 import json
 import logging
@@ -15,8 +16,14 @@ from dotenv import load_dotenv
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
+from crawl_state import CrawlStateStore, content_hash
+from file_sweeper import sweep_cookie_files
+from geocode_cache import LookupCache, coordinate_key, normalize_address
+from pipeline import Pipeline, RateLimiter, SkipItem, Stage
 from pydantic import BaseModel, Field
-from tqdm import tqdm
+from restaurant_journal import RestaurantJournal
+from subway_stations import ensure_station_index
+from save_db import get_db_connection
 
 
 # 로그 설정
@@ -51,12 +58,24 @@ youtube_cookies = os.environ.get("YOUTUBE_COOKIES", "")
 KAKAO_API_KEY = os.getenv("KAKAO_API_KEY")
 logger.info("환경 변수 로드 완료")
 
+# 단계별 작업 스레드 수와 호스트별 초당 요청 수 (환경 변수로 조정)
+METADATA_WORKERS = int(os.getenv("COLLECT_METADATA_WORKERS", "4"))
+SUBTITLE_WORKERS = int(os.getenv("COLLECT_SUBTITLE_WORKERS", "4"))
+LLM_WORKERS = int(os.getenv("COLLECT_LLM_WORKERS", "4"))
+GEOCODE_WORKERS = int(os.getenv("COLLECT_GEOCODE_WORKERS", "4"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("COLLECT_QUEUE_SIZE", "16"))
+PIPELINE_REPORT_INTERVAL = float(os.getenv("COLLECT_REPORT_INTERVAL", "30"))
+
+youtube_limiter = RateLimiter(float(os.getenv("YOUTUBE_RPS", "2")), burst=2)
+kakao_limiter = RateLimiter(float(os.getenv("KAKAO_RPS", "10")), burst=5)
+openai_limiter = RateLimiter(float(os.getenv("OPENAI_RPS", "1")), burst=2)
+
 # LLM 초기화
 llm = ChatOpenAI(model_name="gpt-4o", temperature=0.1)
 logger.info("LLM 초기화 완료")
 
 with open("./data/invalid_video.txt", "r", encoding="utf-8") as f:
-    invalid_video_ids = f.read().splitlines()
+    invalid_video_ids = set(f.read().splitlines())
 
 
 # 쿠키 파일 생성 함수
@@ -92,7 +111,10 @@ def create_cookie_file(cookie_data_base64):
             pass
 
         # 임시 파일 생성
-        cookie_file = tempfile.NamedTemporaryFile(delete=False, suffix=".txt")
+        # 비정상 종료로 남은 파일은 file_sweeper가 접두사로 찾아 정리
+        cookie_file = tempfile.NamedTemporaryFile(
+            delete=False, prefix="yt_cookies_", suffix=".txt"
+        )
         cookie_file.write(cookie_data.encode("utf-8"))
         cookie_file.close()
         logger.info(f"쿠키 파일 생성 완료: {cookie_file.name}")
@@ -153,6 +175,7 @@ def get_video_info(video_id, cookie_file_path=None):
         ydl_opts["coockiefile"] = cookie_file_path
 
     try:
+        youtube_limiter.acquire()
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             logger.info(f"비디오 정보 추출 완료...")
             return ydl.extract_info(video_url, download=False)
@@ -356,33 +379,54 @@ chain = (
     | parser
 )
 
-# JSON 파일 경로 설정
-json_file_path = "./data/meokten_restaurants.json"
+# 수집 결과 저널 (새 식당만 한 줄씩 추가, 커지면 meokten_restaurants.json 스냅샷으로 압축)
+journal = RestaurantJournal()
 
-# 기존 JSON 파일 로드 (있는 경우)
+# 기존 식당 정보 로드 (스냅샷 + 저널)
 all_restaurants = {}
-if os.path.exists(json_file_path):
-    try:
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            all_restaurants = json.load(f)
-        logger.info(f"기존 JSON 파일에서 {len(all_restaurants)} 개의 식당 정보 로드")
-    except Exception as e:
-        logger.error(f"기존 JSON 파일 로드 중 오류: {str(e)}")
-        all_restaurants = {}
+# 로드에 실패하면 스냅샷을 덮어쓰지 않도록 압축하지 않음 (저널 추가만 진행)
+compaction_enabled = True
+try:
+    all_restaurants = journal.load()
+    logger.info(f"기존 저널/스냅샷에서 {len(all_restaurants)} 개의 식당 정보 로드")
+except Exception as e:
+    logger.error(f"기존 식당 정보 로드 중 오류: {str(e)}")
+    compaction_enabled = False
 
 # 이미 처리된 비디오 ID 목록 (JSON에서 추출)
-processed_videos = []
+processed_videos = set()
 for key in all_restaurants.keys():
-    # video_id_i 형식에서 video_id 부분만 추출
+    # video_id_i 형식에서 video_id 부분만 추출 (인덱스가 두 자리 이상이어도 동작)
     if "_" in key:
-        video_id = key[:-2]
-        if video_id not in processed_videos:
-            processed_videos.append(video_id)
+        processed_videos.add(key.rsplit("_", 1)[0])
     else:
-        processed_videos.append(key)  # 기존 형식 지원
+        processed_videos.add(key)  # 기존 형식 지원
+
+# 수집 상태/좌표 캐시용 DB 연결 (작업 스레드들이 공유, 실패하면 메모리에서만 동작)
+try:
+    db_conn = get_db_connection()
+except Exception as e:
+    logger.error(f"DB를 사용할 수 없어 수집 상태와 캐시를 메모리에만 유지합니다: {str(e)}")
+    db_conn = None
+
+# 영상별 수집 상태 (완료/건너뜀/실패 횟수와 다음 재시도 시각)
+crawl_state = CrawlStateStore(db_conn)
+processed_videos |= crawl_state.completed_ids()
 
 logger.info(f"이미 처리된 비디오 수: {len(processed_videos)}")
 
+# 주소 -> 좌표, 좌표 -> 가까운 지하철역 조회 결과 캐시 (찾지 못한 결과도 일정 기간 저장)
+coordinate_cache = LookupCache("coordinate", db_conn)
+station_cache = LookupCache("station", db_conn)
+
+# 수도권 지하철역 KD-tree (assets/subway_stations.csv, 없으면 data/에 한 번 받아 둔 목록)
+# 목록을 만들 수 없으면 Kakao 역 검색만 사용
+station_index = ensure_station_index(KAKAO_API_KEY)
+if station_index is None:
+    logger.warning("지하철역 목록이 없어 Kakao 역 검색을 사용합니다.")
+else:
+    logger.info(f"지하철역 목록 {len(station_index)}개 로드")
+
 
 # Kakao Geocoding API 요청
 coordinate_url = "https://dapi.kakao.com/v2/local/search/address.json"
@@ -395,16 +439,29 @@ playlist_url = (
     "https://www.youtube.com/playlist?list=PLuMuHAJh9g_Py_PSm8gmHdlcil6CQ9QCM"
 )
 
+# 이전 실행이 비정상 종료되어 남긴 쿠키 파일 정리 (쿠키 파일은 이 컨테이너의 /tmp에만 생성됨)
+cookie_sweep = sweep_cookie_files()
+if cookie_sweep["removed"]:
+    logger.info(f"남은 임시 쿠키 파일 {cookie_sweep['removed']}개 삭제")
+
 logger.info("쿠키 파일 생성 중...")
 cookie_file_path = create_cookie_file(youtube_cookies) if youtube_cookies else None
 
+
+def remove_cookie_file():
+    """임시 쿠키 파일 삭제 (정상 종료, exit(), 처리되지 않은 예외 모두에서 실행)"""
+    if cookie_file_path and os.path.exists(cookie_file_path):
+        os.unlink(cookie_file_path)
+        logger.info("임시 쿠키 파일 삭제 완료")
+
+
+atexit.register(remove_cookie_file)
+
 # 플레이리스트 정보 가져오기 (extract_flat=True로 기본 정보만 가져옴)
 playlist_info = get_playlist_info(playlist_url, cookie_file_path)
 
 if not playlist_info:
     logger.error("플레이리스트 정보를 가져오지 못했습니다.")
-    if cookie_file_path and os.path.exists(cookie_file_path):
-        os.unlink(cookie_file_path)
     exit(1)
 
 total_videos = len(playlist_info.get("entries", []))
@@ -431,6 +488,7 @@ def get_transcript_with_cookies(video_id, cookie_file_path=None):
         options["cookiefile"] = cookie_file_path
 
     try:
+        youtube_limiter.acquire()
         with yt_dlp.YoutubeDL(options) as ydl:
             info = ydl.extract_info(
                 f"https://www.youtube.com/watch?v={video_id}", download=False
@@ -450,6 +508,7 @@ def get_transcript_with_cookies(video_id, cookie_file_path=None):
                 lang = subtitles_list[0]
                 url = subtitles[lang][0]["url"]
                 try:
+                    youtube_limiter.acquire()
                     response = requests.get(url)
                     if response.status_code == 200:
                         transcript_text = convert_vtt_to_text(response.json())
@@ -465,6 +524,7 @@ def get_transcript_with_cookies(video_id, cookie_file_path=None):
                     if caption.get("ext") == "json3":
                         url = caption["url"]
                         try:
+                            youtube_limiter.acquire()
                             response = requests.get(url)
                             if response.status_code == 200:
                                 transcript_text = convert_vtt_to_text(response.json())
@@ -510,12 +570,18 @@ def convert_vtt_to_text(response):
 
 
 def get_coordinates_from_address(address, headers, coordinate_url):
-    """주소로부터 좌표를 추출하는 함수 (여러 방법 시도)"""
+    """
+    주소로부터 좌표를 추출하는 함수 (여러 방법 시도)
+    찾으면 (위도, 경도), 모든 방법으로 찾지 못하면 None을 반환합니다.
+    응답 오류가 있었으면 일시적인 실패일 수 있으므로 결과가 캐시되지 않도록 예외를 발생시킵니다.
+    """
     latitude = longitude = "정보 없음"
+    failed_status = None
 
     # 1. 원본 주소로 시도
     logger.info(f"원본 주소로 좌표 검색 시도: {address}")
     params = {"query": address}
+    kakao_limiter.acquire()
     response = requests.get(coordinate_url, headers=headers, params=params)
 
     if response.status_code == 200:
@@ -528,12 +594,15 @@ def get_coordinates_from_address(address, headers, coordinate_url):
                 f"원본 주소로 위치 정보 추출 완료: 위도 {latitude}, 경도 {longitude}"
             )
             return latitude, longitude
+    else:
+        failed_status = response.status_code
 
     # 2. 괄호 제거 주소로 시도
     if "(" in address:
         address_2 = address.split("(")[0].strip()
         logger.info(f"괄호 제거 주소로 좌표 검색 시도: {address_2}")
         params = {"query": address_2}
+        kakao_limiter.acquire()
         response = requests.get(coordinate_url, headers=headers, params=params)
 
         if response.status_code == 200:
@@ -546,6 +615,8 @@ def get_coordinates_from_address(address, headers, coordinate_url):
                     f"괄호 제거 주소로 위치 정보 추출 완료: 위도 {latitude}, 경도 {longitude}"
                 )
                 return latitude, longitude
+        else:
+            failed_status = response.status_code
     else:
         address_2 = address
 
@@ -559,6 +630,7 @@ def get_coordinates_from_address(address, headers, coordinate_url):
         address_3 = " ".join(address_parts[:-i])
         logger.info(f"단어 {i}개 제거 주소로 좌표 검색 시도: {address_3}")
         params = {"query": address_3}
+        kakao_limiter.acquire()
         response = requests.get(coordinate_url, headers=headers, params=params)
 
         if response.status_code == 200:
@@ -571,170 +643,235 @@ def get_coordinates_from_address(address, headers, coordinate_url):
                     f"단어 {i}개 제거 주소로 위치 정보 추출 완료: 위도 {latitude}, 경도 {longitude}"
                 )
                 return latitude, longitude
+        else:
+            failed_status = response.status_code
 
     # 모든 시도 실패
+    if failed_status is not None:
+        raise RuntimeError(f"Kakao 주소 검색 응답 오류 ({failed_status}): {address}")
     logger.warning(f"모든 방법으로 좌표 검색 실패: {address}")
-    return latitude, longitude
-
-
-# 각 비디오 처리
-for entry in tqdm(playlist_info.get("entries", []), desc="처리 중"):
-    # 기본 정보만 있는 경우 (extract_flat=True)
-    video_id = entry.get("id", "")
-    if video_id in invalid_video_ids:
-        logger.info(f"무효한 비디오입니다: {video_id}")
-        skipped_count += 1
-        continue
-    video_title = entry.get("title", "제목 없음")
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
-
-    logger.info(f"처리 중: {video_title} ({video_id})")
+    return None
+
+
+# 단계별 작업 함수 (메타데이터 → 자막 → LLM 추출 → 좌표 검색 → 저장)
+# 각 단계는 job 딕셔너리에 결과를 채워 다음 단계로 넘기며, 실패하면 예외를 발생시킴
+def fetch_metadata(job):
+    """비디오 상세 정보를 가져와 설명에서 가게명과 주소를 추출"""
+    video_id = job["video_id"]
+    logger.info(f"처리 중: {job['video_title']} ({video_id})")
+    video_info = get_video_info(video_id, cookie_file_path)
+    if not video_info:
+        raise RuntimeError(f"비디오 정보를 가져오지 못했습니다: {video_id}")
+
+    description = video_info.get("description", "")
+    crawl_state.record_content(video_id, content_hash(description))
+
+    # #shorts 필터링
+    if "#shorts" in description:
+        raise SkipItem(f"Shorts 영상은 건너뜁니다: {video_id}")
+
+    # 정규표현식으로 가게명과 주소 추출
+    restaurants = extract_restaurant_info(description)
+    if not restaurants:
+        raise RuntimeError(f"가게명 또는 주소를 추출할 수 없습니다: {video_id}")
+
+    logger.info(f"{len(restaurants)}개 식당 정보 추출 완료")
+    job["restaurants"] = restaurants
+    return job
+
+
+def fetch_subtitles(job):
+    """자막 추출"""
+    logger.info(f"자막 추출 시작: {job['video_id']}")
+    script = get_transcript_with_cookies(job["video_id"], cookie_file_path)
+    if not script:
+        raise RuntimeError(f"자막을 추출할 수 없습니다: {job['video_id']}")
+
+    logger.info(f"자막 추출 완료: {len(script)} 글자")
+    job["script"] = script
+    return job
+
+
+def extract_menus(job):
+    """LLM을 사용하여 식당별 메뉴 정보 추출"""
+    restaurant_info_str = "\n".join(
+        [f"식당명: {r['name']}, 주소: {r['address']}" for r in job["restaurants"]]
+    )
+    logger.info("LLM을 사용하여 식당의 메뉴 정보 추출 중...")
+    openai_limiter.acquire()
+    result = chain.invoke(
+        {"script": job["script"], "restaurant_info": restaurant_info_str}
+    )
+    logger.info(f"여러 식당의 메뉴 정보 추출 완료: {len(result)}개 식당")
+    job["menus"] = result
+    return job
+
+
+def search_nearest_station(latitude, longitude):
+    """
+    좌표 기준 가장 가까운 지하철역 검색 (반경 2km)
+    (역 이름, 거리) 또는 반경 안에 역이 없으면 None을 반환합니다.
+    """
+    params = {
+        "category_group_code": "SW8",
+        "x": longitude,
+        "y": latitude,
+        "radius": 2000,
+        "sort": "distance",
+    }
+    kakao_limiter.acquire()
+    response = requests.get(station_url, headers=headers, params=params)
+    response.raise_for_status()
+    data = response.json()
+    if data["documents"]:
+        return data["documents"][0]["place_name"], data["documents"][0]["distance"]
+    return None
 
-    # 이미 처리된 비디오 건너뛰기
-    if video_id in processed_videos:
-        skip_reason = f"이미 처리된 영상입니다: {video_id}"
-        logger.info(skip_reason)
-        skipped_count += 1
-        continue
 
-    # 개별 비디오 정보 가져오기 (상세 정보)
+def lookup_coordinates(address):
+    """주소 좌표 (캐시 우선, 찾지 못하면 정보 없음)"""
     try:
-        # 비디오 정보 가져오기 전에 잠시 대기 (YouTube 서버 부하 방지)
-        time.sleep(1)
-        video_info = get_video_info(video_id, cookie_file_path)
-
-        if not video_info:
-            error_reason = f"비디오 정보를 가져오지 못했습니다: {video_id}"
-            logger.error(error_reason)
-            error_count += 1
-            continue
+        location = coordinate_cache.get(
+            normalize_address(address),
+            lambda: get_coordinates_from_address(address, headers, coordinate_url),
+        )
+    except Exception as e:
+        logger.error(f"좌표 검색 중 오류 발생: {str(e)}")
+        location = None
+    return tuple(location) if location else ("정보 없음", "정보 없음")
 
-        description = video_info.get("description", "")
 
-        # #shorts 필터링
-        if "#shorts" in description:
-            skip_reason = f"Shorts 영상은 건너뜁니다: {video_id}"
-            logger.info(skip_reason)
-            skipped_count += 1
-            continue
+def lookup_station(latitude, longitude):
+    """
+    가장 가까운 지하철역 (로컬 역 목록 우선, 범위 밖이면 캐시/Kakao 검색)
+    좌표가 없거나 찾지 못하면 정보 없음
+    """
+    cache_key = coordinate_key(latitude, longitude)
+    station = None
+    if cache_key is not None and station_index is not None:
+        station = station_index.nearest_station(float(latitude), float(longitude))
+    if cache_key is not None and station is None:
+        try:
+            station = station_cache.get(
+                cache_key, lambda: search_nearest_station(latitude, longitude)
+            )
+        except Exception as e:
+            logger.error(f"지하철역 검색 중 오류 발생: {str(e)}")
+    return tuple(station) if station else ("정보 없음", "정보 없음")
 
-        # 정규표현식으로 가게명과 주소 추출
-        restaurants = extract_restaurant_info(description)
 
-        if not restaurants:
-            error_reason = f"가게명 또는 주소를 추출할 수 없습니다: {video_id}"
-            logger.warning(error_reason)
-            error_count += 1
+def geocode_restaurants(job):
+    """식당별 좌표와 가까운 지하철역을 찾아 저장할 데이터 구성"""
+    records = {}
+    for i, restaurant_info in enumerate(job["menus"]):
+        if i >= len(job["restaurants"]):  # 안전 검사
+            break
+        logger.info(f"식당 정보 처리 중: {restaurant_info['restaurant_name']}")
+        restaurant_address = job["restaurants"][i]["address"]
+
+        latitude, longitude = lookup_coordinates(restaurant_address)
+        station_name, station_distance = lookup_station(latitude, longitude)
+
+        # 전체 식당 목록에 추가할 데이터 (video_id + 인덱스를 키로 사용)
+        records[f"{job['video_id']}_{i}"] = {
+            "restaurant_name": restaurant_info["restaurant_name"],
+            "address": restaurant_address,
+            "latitude": latitude,
+            "longitude": longitude,
+            "station_name": f"{station_name}({station_distance}m)",
+            "video_url": job["video_url"],
+            "menus": restaurant_info["menus"],
+        }
+    job["records"] = records
+    return job
+
+
+def persist_restaurants(job):
+    """변경사항 즉시 저장 (작업 스레드 1개에서만 실행되므로 all_restaurants 잠금 불필요)"""
+    journal.append(job["records"])
+    all_restaurants.update(job["records"])
+    if compaction_enabled and journal.needs_compaction():
+        # 다른 수집 프로세스가 추가한 식당까지 합쳐진 결과로 갱신
+        all_restaurants.update(journal.compact())
+        logger.info(f"저널 압축 완료 (세대 {journal.generation})")
+    crawl_state.mark_done(job["video_id"])
+    logger.info(f"'{job['video_title']}' 정보 저장 완료 (저널)")
+    return job
+
+
+def iter_jobs(entries):
+    """처리할 비디오만 작업으로 변환 (무효/이미 처리된 영상은 대기열에 넣지 않음)"""
+    global skipped_count
+    for entry in entries:
+        # 기본 정보만 있는 경우 (extract_flat=True)
+        video_id = entry.get("id", "")
+        if video_id in invalid_video_ids:
+            logger.info(f"무효한 비디오입니다: {video_id}")
+            skipped_count += 1
             continue
+        if video_id in processed_videos:
+            logger.info(f"이미 처리된 영상입니다: {video_id}")
+            skipped_count += 1
+            continue
+        wait = crawl_state.retry_wait(video_id)
+        if wait:
+            logger.info(f"재시도 대기 중인 영상입니다: {video_id} ({wait} 남음)")
+            skipped_count += 1
+            continue
+        yield {
+            "video_id": video_id,
+            "video_title": entry.get("title", "제목 없음"),
+            "video_url": f"https://www.youtube.com/watch?v={video_id}",
+        }
+
+
+def on_video_skipped(stage, job, error):
+    """Shorts 등은 다시 시도하지 않도록 기록"""
+    crawl_state.mark_skipped(job["video_id"], str(error))
+
+
+def on_video_failed(stage, job, error):
+    """실패한 단계와 오류를 기록하고 지수 백오프로 다음 재시도 시각을 정함"""
+    next_retry_at = crawl_state.mark_failed(job["video_id"], f"[{stage.name}] {error}")
+    logger.info(
+        f"다음 재시도: {job['video_id']} ({next_retry_at.astimezone():%Y-%m-%d %H:%M})"
+    )
+
+
+# 각 비디오 처리 (단계별 작업 스레드 풀, 단계 사이 큐는 크기 제한)
+pipeline = Pipeline(
+    [
+        Stage("metadata", fetch_metadata, workers=METADATA_WORKERS),
+        Stage("subtitles", fetch_subtitles, workers=SUBTITLE_WORKERS),
+        Stage("llm", extract_menus, workers=LLM_WORKERS),
+        Stage("geocode", geocode_restaurants, workers=GEOCODE_WORKERS),
+        Stage("persist", persist_restaurants, workers=1),
+    ],
+    queue_size=PIPELINE_QUEUE_SIZE,
+    report_interval=PIPELINE_REPORT_INTERVAL,
+    log=logger,
+    on_skip=on_video_skipped,
+    on_error=on_video_failed,
+)
 
-        logger.info(f"{len(restaurants)}개 식당 정보 추출 완료")
-
-        # 자막 가져오기
-        script = []
-        try:
-            logger.info(f"자막 추출 시작: {video_id}")
-
-            # yt-dlp로 시도
-            script_text = get_transcript_with_cookies(video_id, cookie_file_path)
-
-            if script_text:
-                script = script_text
-                logger.info(f"자막 추출 완료: {len(script)} 글자")
-            else:
-                error_reason = "자막을 추출할 수 없습니다."
-                logger.error(error_reason)
-                error_count += 1
-                continue
-
-            # 여러 식당 정보 처리
-            restaurant_info_str = "\n".join(
-                [f"식당명: {r['name']}, 주소: {r['address']}" for r in restaurants]
-            )
-            # 데이터 구성 (LLM 입력용)
-            # 메뉴 정보 추출
-            logger.info("LLM을 사용하여 식당의 메뉴 정보 추출 중...")
-            data = {"script": script, "restaurant_info": restaurant_info_str}
-            result = chain.invoke(data)
-            logger.info(f"여러 식당의 메뉴 정보 추출 완료: {len(result)}개 식당")
-            # 각 식당 정보 처리
-            for i, restaurant_info in enumerate(result):
-                if i < len(restaurants):  # 안전 검사
-                    logger.info(
-                        f"식당 정보 처리 중: {restaurant_info['restaurant_name']}"
-                    )
-                    restaurant_name = restaurant_info["restaurant_name"]
-                    restaurant_address = restaurants[i]["address"]
-
-                    # 좌표 검색
-                    latitude, longitude = get_coordinates_from_address(
-                        restaurant_address, headers, coordinate_url
-                    )
-                    station_name = "정보 없음"
-                    station_distance = "정보 없음"
-
-                    try:
-                        # 지하철역 검색
-                        params = {
-                            "category_group_code": "SW8",
-                            "x": longitude,
-                            "y": latitude,
-                            "radius": 2000,
-                            "sort": "distance",
-                        }
-
-                        response = requests.get(
-                            station_url, headers=headers, params=params
-                        )
-                        if response.status_code == 200:
-                            data = response.json()
-                            if data["documents"]:
-                                station_name = data["documents"][0]["place_name"]
-                                station_distance = data["documents"][0]["distance"]
-                    except Exception as e:
-                        logger.error(f"지하철역 검색 중 오류 발생: {str(e)}")
-
-                    # JSON 데이터 구성
-                    restaurant_data = {
-                        "restaurant_name": restaurant_name,
-                        "address": restaurant_address,
-                        "latitude": latitude,
-                        "longitude": longitude,
-                        "station_name": f"{station_name}({station_distance}m)",
-                        "video_url": video_url,
-                        "menus": restaurant_info["menus"],
-                    }
-
-                    # 전체 식당 목록에 추가 (video_id + 인덱스를 키로 사용)
-                    all_restaurants[f"{video_id}_{i}"] = restaurant_data
-
-            # 변경사항 즉시 저장
-            with open(json_file_path, "w", encoding="utf-8") as f:
-                json.dump(all_restaurants, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"'{video_title}' 정보 저장 완료 (JSON)")
-            processed_count += 1
-
-        except Exception as e:
-            error_reason = f"자막을 가져오는 중 오류 발생: {str(e)}"
-            logger.error(error_reason)
-            error_count += 1
+start_time = time.time()
+stage_stats = pipeline.run(iter_jobs(playlist_info.get("entries", [])))
 
-    except Exception as e:
-        error_reason = f"비디오 처리 중 오류 발생: {str(e)}"
-        logger.error(error_reason)
-        error_count += 1
-        # 잠시 대기 후 계속 진행
-        time.sleep(5)
+processed_count = stage_stats[-1]["done"]
+skipped_count += sum(stat["skipped"] for stat in stage_stats)
+error_count = sum(stat["failed"] for stat in stage_stats)
 
 # 임시 쿠키 파일 삭제
-if cookie_file_path and os.path.exists(cookie_file_path):
-    os.unlink(cookie_file_path)
-    logger.info("임시 쿠키 파일 삭제 완료")
+remove_cookie_file()
 
 
 logger.info(
-    f"작업 완료: 총 {total_videos}개 중 {processed_count}개 처리, {skipped_count}개 건너뜀, {error_count}개 오류"
+    f"작업 완료: 총 {total_videos}개 중 {processed_count}개 처리, {skipped_count}개 건너뜀, {error_count}개 오류 "
+    f"({time.time() - start_time:.1f}초)"
 )
+logger.info(f"수집 상태: {crawl_state.summary()}")
+for cache in (coordinate_cache, station_cache):
+    logger.info(f"조회 캐시: {cache.stats()}")
 logger.info(
-    f"총 {len(all_restaurants)}개의 식당 정보가 {json_file_path}에 저장되었습니다."
+    f"총 {len(all_restaurants)}개의 식당 정보가 {journal.journal_path}에 저장되었습니다."
 )
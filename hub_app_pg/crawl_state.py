@@ -0,0 +1,203 @@
+# crawl_state.py
+import hashlib
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 실패한 영상의 재시도 간격: 기본 간격 * 2^(시도 횟수 - 1), 최대 간격으로 제한
+CRAWL_RETRY_BASE_SEC = int(os.getenv("CRAWL_RETRY_BASE_SEC", str(30 * 60)))
+CRAWL_RETRY_MAX_SEC = int(os.getenv("CRAWL_RETRY_MAX_SEC", str(7 * 24 * 3600)))
+
+# 처리 중 (설명까지 가져온 상태, 중간에 프로세스가 종료되면 다음 실행에서 다시 처리)
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+# Shorts 등 다시 시도해도 결과가 같은 영상
+STATUS_SKIPPED = "skipped"
+
+CREATE_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS crawl_state (
+        video_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        next_retry_at TIMESTAMPTZ,
+        content_hash TEXT,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+UPSERT_QUERY = """
+    INSERT INTO crawl_state
+        (video_id, status, attempts, last_error, next_retry_at, content_hash, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+    ON CONFLICT (video_id) DO UPDATE SET
+        status = EXCLUDED.status,
+        attempts = EXCLUDED.attempts,
+        last_error = EXCLUDED.last_error,
+        next_retry_at = EXCLUDED.next_retry_at,
+        content_hash = EXCLUDED.content_hash,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def content_hash(text: str) -> str:
+    """영상 설명 등 입력 내용의 해시 (내용이 바뀌었는지 비교용)"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """시도 횟수에 따른 다음 재시도까지의 대기 시간 (지수 백오프)"""
+    seconds = CRAWL_RETRY_BASE_SEC * 2 ** max(0, attempts - 1)
+    return timedelta(seconds=min(seconds, CRAWL_RETRY_MAX_SEC))
+
+
+class CrawlStateStore:
+    """
+    영상별 수집 상태 저장소 (Postgres crawl_state 테이블).
+    시작 시 전체 상태를 한 번 읽어 메모리(딕셔너리/세트)에서 조회하며,
+    변경은 즉시 테이블에 반영합니다. 파이프라인 작업 스레드들이 함께 사용합니다.
+    conn이 None이면 DB 없이 메모리에서만 동작합니다. (실행 중에만 유지)
+    """
+
+    def __init__(self, conn=None):
+        self.conn = conn
+        self._lock = threading.Lock()
+        # video_id -> {"status", "attempts", "last_error", "next_retry_at", "content_hash"}
+        self._states: Dict[str, dict] = {}
+
+        if self.conn is not None:
+            self.conn.autocommit = True
+            with self.conn.cursor() as cursor:
+                cursor.execute(CREATE_TABLE_QUERY)
+                cursor.execute(
+                    "SELECT video_id, status, attempts, last_error, next_retry_at, content_hash "
+                    "FROM crawl_state"
+                )
+                for row in cursor.fetchall():
+                    self._states[row[0]] = {
+                        "status": row[1],
+                        "attempts": row[2],
+                        "last_error": row[3],
+                        "next_retry_at": row[4],
+                        "content_hash": row[5],
+                    }
+        logger.info(f"수집 상태 {len(self._states)}건 로드")
+
+    def completed_ids(self) -> Set[str]:
+        """다시 처리할 필요가 없는 영상 ID (완료 또는 영구 건너뜀)"""
+        with self._lock:
+            return {
+                video_id
+                for video_id, state in self._states.items()
+                if state["status"] in (STATUS_DONE, STATUS_SKIPPED)
+            }
+
+    def retry_wait(self, video_id: str, now: Optional[datetime] = None) -> Optional[timedelta]:
+        """실패한 영상의 남은 대기 시간 (지금 처리해도 되면 None)"""
+        with self._lock:
+            state = self._states.get(video_id)
+        if not state or state["status"] != STATUS_FAILED or not state["next_retry_at"]:
+            return None
+        remaining = state["next_retry_at"] - (now or datetime.now(timezone.utc))
+        return remaining if remaining.total_seconds() > 0 else None
+
+    def _save(self, video_id: str, state: dict):
+        with self._lock:
+            self._states[video_id] = state
+            if self.conn is None:
+                return
+            try:
+                with self.conn.cursor() as cursor:
+                    cursor.execute(
+                        UPSERT_QUERY,
+                        (
+                            video_id,
+                            state["status"],
+                            state["attempts"],
+                            state["last_error"],
+                            state["next_retry_at"],
+                            state["content_hash"],
+                        ),
+                    )
+            except Exception as e:
+                logger.error(f"수집 상태 저장 중 오류 발생 ({video_id}): {str(e)}")
+
+    def record_content(self, video_id: str, hash_value: str):
+        """
+        영상 설명 해시를 기록합니다.
+        이전 실패 때와 내용이 달라졌으면 (주소 추가 등) 백오프를 처음부터 다시 시작합니다.
+        """
+        with self._lock:
+            state = dict(self._states.get(video_id) or {})
+        if state.get("content_hash") == hash_value:
+            return
+        attempts = state.get("attempts", 0) if state.get("content_hash") is None else 0
+        self._save(
+            video_id,
+            {
+                "status": STATUS_PENDING,
+                "attempts": attempts,
+                "last_error": state.get("last_error"),
+                "next_retry_at": None,
+                "content_hash": hash_value,
+            },
+        )
+
+    def mark_done(self, video_id: str):
+        with self._lock:
+            state = dict(self._states.get(video_id) or {})
+        self._save(
+            video_id,
+            {
+                "status": STATUS_DONE,
+                "attempts": state.get("attempts", 0) + 1,
+                "last_error": None,
+                "next_retry_at": None,
+                "content_hash": state.get("content_hash"),
+            },
+        )
+
+    def mark_skipped(self, video_id: str, reason: str):
+        with self._lock:
+            state = dict(self._states.get(video_id) or {})
+        self._save(
+            video_id,
+            {
+                "status": STATUS_SKIPPED,
+                "attempts": state.get("attempts", 0) + 1,
+                "last_error": reason,
+                "next_retry_at": None,
+                "content_hash": state.get("content_hash"),
+            },
+        )
+
+    def mark_failed(self, video_id: str, error: str) -> datetime:
+        """실패 기록 후 다음 재시도 시각을 반환합니다."""
+        with self._lock:
+            state = dict(self._states.get(video_id) or {})
+        attempts = state.get("attempts", 0) + 1
+        next_retry_at = datetime.now(timezone.utc) + retry_delay(attempts)
+        self._save(
+            video_id,
+            {
+                "status": STATUS_FAILED,
+                "attempts": attempts,
+                "last_error": error,
+                "next_retry_at": next_retry_at,
+                "content_hash": state.get("content_hash"),
+            },
+        )
+        return next_retry_at
+
+    def summary(self) -> Dict[str, int]:
+        """상태별 영상 수"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for state in self._states.values():
+                counts[state["status"]] = counts.get(state["status"], 0) + 1
+        return counts
@@ -0,0 +1,148 @@
+# file_sweeper.py
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from audio_utils import STATIC_AUDIO_DIR
+
+# 정적 오디오 파일 보관 기간 (초, 마지막 사용 시각 기준)
+STATIC_AUDIO_TTL_SEC = int(os.getenv("STATIC_AUDIO_TTL_SEC", 6 * 60 * 60))
+# 정적 오디오 디렉토리 최대 용량 (바이트), 초과하면 오래된 파일부터 삭제
+STATIC_AUDIO_MAX_BYTES = int(os.getenv("STATIC_AUDIO_MAX_BYTES", 2 * 1024**3))
+# 용량 초과 시에도 이 시간(초) 안에 사용된 파일은 변환 중일 수 있으므로 삭제하지 않음
+STATIC_AUDIO_MIN_AGE_SEC = 60 * 60
+# 정리 작업 실행 주기 (초)
+SWEEP_INTERVAL_SEC = int(os.getenv("SWEEP_INTERVAL_SEC", 10 * 60))
+
+# collecting_data.py가 만드는 임시 쿠키 파일 (프로세스가 비정상 종료되면 남을 수 있음)
+# 쿠키 파일은 cron 컨테이너에 생기므로 collecting_data.py 시작 시 정리
+COOKIE_FILE_PREFIX = "yt_cookies_"
+COOKIE_FILE_TTL_SEC = 60 * 60
+
+
+def sweep_directory(
+    directory: Path,
+    ttl_sec: int,
+    max_bytes: Optional[int] = None,
+    pattern: str = "*",
+    min_age_sec: int = 0,
+    now: Optional[float] = None,
+) -> dict:
+    """
+    디렉토리의 오래된 파일을 삭제합니다.
+    1) 수정 시각이 ttl_sec보다 오래된 파일을 삭제하고
+    2) 남은 용량이 max_bytes를 넘으면 min_age_sec보다 오래된 파일 중 가장 오래된 것부터 삭제합니다.
+
+    Args:
+        directory: 정리할 디렉토리
+        ttl_sec: 보관 기간 (초)
+        max_bytes: 최대 용량 (None이면 용량 제한 없음)
+        pattern: 정리 대상 파일 glob 패턴
+        min_age_sec: 용량 정리 시 보호할 최근 파일 기준 (초)
+        now: 기준 시각 (기본값: 현재 시각)
+
+    Returns:
+        {"removed": 삭제 파일 수, "reclaimed_bytes": 확보한 용량, "remaining_bytes": 남은 용량}
+    """
+    now = now or time.time()
+    stats = {"removed": 0, "reclaimed_bytes": 0, "remaining_bytes": 0}
+    if not directory.exists():
+        return stats
+
+    files = []
+    for path in directory.glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.is_file():
+            files.append((stat.st_mtime, stat.st_size, path))
+    files.sort()
+
+    def remove(path: Path, size: int) -> bool:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"[ERROR] 파일 삭제 실패: {path} ({e})")
+            return False
+        stats["removed"] += 1
+        stats["reclaimed_bytes"] += size
+        return True
+
+    remaining = []
+    for mtime, size, path in files:
+        if now - mtime > ttl_sec and remove(path, size):
+            continue
+        remaining.append((mtime, size, path))
+
+    total_bytes = sum(size for _, size, _ in remaining)
+    if max_bytes is not None:
+        for mtime, size, path in remaining:
+            if total_bytes <= max_bytes:
+                break
+            if now - mtime > min_age_sec and remove(path, size):
+                total_bytes -= size
+    stats["remaining_bytes"] = total_bytes
+    return stats
+
+
+def sweep_static_audio(now: Optional[float] = None) -> dict:
+    """정적 오디오 디렉토리(업로드 원본, 전처리 결과, 분할 청크, 임시 .part 파일) 정리"""
+    return sweep_directory(
+        STATIC_AUDIO_DIR,
+        STATIC_AUDIO_TTL_SEC,
+        max_bytes=STATIC_AUDIO_MAX_BYTES,
+        min_age_sec=STATIC_AUDIO_MIN_AGE_SEC,
+        now=now,
+    )
+
+
+def sweep_cookie_files(now: Optional[float] = None) -> dict:
+    """시스템 임시 디렉토리에 남은 쿠키 파일 정리"""
+    return sweep_directory(
+        Path(tempfile.gettempdir()),
+        COOKIE_FILE_TTL_SEC,
+        pattern=f"{COOKIE_FILE_PREFIX}*",
+        now=now,
+    )
+
+
+def run_sweep() -> dict:
+    """모든 정리 작업을 한 번 실행하고 결과를 출력"""
+    audio = sweep_static_audio()
+    cookies = sweep_cookie_files()
+    print(
+        f"[INFO] 파일 정리 완료: 오디오 {audio['removed']}개 "
+        f"({audio['reclaimed_bytes'] / 1024**2:.1f}MB 확보, "
+        f"남은 용량 {audio['remaining_bytes'] / 1024**2:.1f}MB), "
+        f"쿠키 파일 {cookies['removed']}개"
+    )
+    return {"audio": audio, "cookies": cookies}
+
+
+def start_background_sweeper(interval_sec: int = SWEEP_INTERVAL_SEC) -> threading.Thread:
+    """
+    주기적으로 run_sweep을 실행하는 데몬 스레드를 시작합니다.
+    Streamlit에서는 st.cache_resource로 감싸 프로세스당 한 번만 호출해야 합니다.
+    """
+
+    def loop():
+        while True:
+            try:
+                run_sweep()
+            except Exception as e:
+                print(f"[ERROR] 파일 정리 실패: {e}")
+            time.sleep(interval_sec)
+
+    thread = threading.Thread(target=loop, name="file-sweeper", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    run_sweep()
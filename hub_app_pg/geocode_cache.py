@@ -0,0 +1,187 @@
+# geocode_cache.py
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 찾지 못한 결과(주소 검색 실패 등)를 다시 조회하지 않을 기간 (Kakao 데이터가 갱신될 수 있으므로 만료)
+GEOCODE_NEGATIVE_TTL_SEC = int(
+    os.getenv("GEOCODE_NEGATIVE_TTL_SEC", str(30 * 24 * 3600))
+)
+
+CREATE_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS geocode_cache (
+        kind TEXT NOT NULL,
+        cache_key TEXT NOT NULL,
+        value JSONB,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (kind, cache_key)
+    )
+"""
+
+UPSERT_QUERY = """
+    INSERT INTO geocode_cache (kind, cache_key, value, updated_at)
+    VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+    ON CONFLICT (kind, cache_key) DO UPDATE SET
+        value = EXCLUDED.value,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# 캐시 키 계산 시 같은 지역으로 취급할 행정구역 이름
+REGION_ALIASES = {
+    "서울특별시": "서울",
+    "서울시": "서울",
+    "부산광역시": "부산",
+    "대구광역시": "대구",
+    "인천광역시": "인천",
+    "광주광역시": "광주",
+    "대전광역시": "대전",
+    "울산광역시": "울산",
+    "세종특별자치시": "세종",
+    "경기도": "경기",
+    "강원도": "강원",
+    "강원특별자치도": "강원",
+    "충청북도": "충북",
+    "충청남도": "충남",
+    "전라북도": "전북",
+    "전북특별자치도": "전북",
+    "전라남도": "전남",
+    "경상북도": "경북",
+    "경상남도": "경남",
+    "제주특별자치도": "제주",
+}
+
+
+def normalize_address(address: str) -> str:
+    """
+    주소 캐시 키 (표기만 다른 같은 주소가 같은 키를 갖도록)
+    유니코드 정규화, 괄호 안 상세 정보와 쉼표 제거, 공백 정리, 행정구역 약칭 통일
+    """
+    text = unicodedata.normalize("NFKC", address or "")
+    text = re.sub(r"\(.*?\)", " ", text)
+    text = text.replace(",", " ")
+    parts = text.split()
+    if parts:
+        parts[0] = REGION_ALIASES.get(parts[0], parts[0])
+    return " ".join(parts)
+
+
+def coordinate_key(latitude, longitude) -> Optional[str]:
+    """좌표 캐시 키 (소수점 5자리, 약 1m 단위). 좌표가 없으면 None"""
+    try:
+        return f"{float(latitude):.5f},{float(longitude):.5f}"
+    except (TypeError, ValueError):
+        return None
+
+
+class LookupCache:
+    """
+    외부 API 조회 결과 캐시 (Postgres geocode_cache 테이블, kind별로 구분).
+    시작 시 해당 kind를 모두 메모리로 읽고, 새 결과는 즉시 테이블에 저장합니다.
+    찾지 못한 결과(None)도 GEOCODE_NEGATIVE_TTL_SEC 동안 저장해 같은 조회를 반복하지 않습니다.
+    fetch에서 발생한 예외(일시적 오류)는 저장하지 않고 그대로 전달합니다.
+    conn이 None이면 메모리에서만 동작합니다.
+    """
+
+    def __init__(
+        self, kind: str, conn=None, negative_ttl_sec: int = GEOCODE_NEGATIVE_TTL_SEC
+    ):
+        self.kind = kind
+        self.conn = conn
+        self.negative_ttl = timedelta(seconds=negative_ttl_sec)
+        self._lock = threading.Lock()
+        # cache_key -> (값 또는 None, 저장 시각)
+        self._entries: Dict[str, tuple] = {}
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+        if self.conn is not None:
+            self.conn.autocommit = True
+            with self.conn.cursor() as cursor:
+                cursor.execute(CREATE_TABLE_QUERY)
+                cursor.execute(
+                    "SELECT cache_key, value, updated_at FROM geocode_cache WHERE kind = %s",
+                    (kind,),
+                )
+                for cache_key, value, updated_at in cursor.fetchall():
+                    self._entries[cache_key] = (value, updated_at)
+        logger.info(f"{kind} 캐시 {len(self._entries)}건 로드")
+
+    def _lookup(self, cache_key: str):
+        """(찾음 여부, 값)"""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+        if entry is None:
+            return False, None
+        value, updated_at = entry
+        if value is None and (
+            updated_at is None
+            or datetime.now(timezone.utc) - updated_at > self.negative_ttl
+        ):
+            return False, None
+        return True, value
+
+    def _store(self, cache_key: str, value):
+        with self._lock:
+            self._entries[cache_key] = (value, datetime.now(timezone.utc))
+            if self.conn is None:
+                return
+            try:
+                with self.conn.cursor() as cursor:
+                    cursor.execute(
+                        UPSERT_QUERY,
+                        (
+                            self.kind,
+                            cache_key,
+                            json.dumps(value, ensure_ascii=False) if value else None,
+                        ),
+                    )
+            except Exception as e:
+                logger.error(
+                    f"{self.kind} 캐시 저장 중 오류 발생 ({cache_key}): {str(e)}"
+                )
+
+    def get(self, cache_key: str, fetch: Callable[[], Any]):
+        """캐시에 있으면 반환하고, 없으면 fetch()로 조회한 뒤 저장합니다."""
+        found, value = self._lookup(cache_key)
+        if found:
+            with self._lock:
+                if value is None:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        try:
+            value = fetch()
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        self._store(cache_key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            cached = self.hits + self.negative_hits
+            return {
+                "kind": self.kind,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round(cached / lookups, 3) if lookups else 0.0,
+            }
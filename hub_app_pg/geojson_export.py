@@ -0,0 +1,173 @@
+# geojson_export.py
+import argparse
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from restaurant import parse_coordinate
+
+# 전체 맛집 지도에서 불러오는 정적 파일 위치 (Streamlit 정적 파일 서빙: /app/static/...)
+# server.baseUrlPath를 지정하면 그 경로가 앞에 붙음 (pages/meokten.py에서 처리)
+STATIC_MEOKTEN_DIR = Path(__file__).parent.absolute() / "static" / "meokten"
+STATIC_MEOKTEN_URL = "/app/static/meokten"
+GEOJSON_FILE_NAME = "restaurants.geojson.gz"
+
+# 식당별 대표 카테고리는 가장 먼저 저장된 메뉴의 종류를 사용
+EXPORT_QUERY = """
+    SELECT r.id, r.name, r.address, r.latitude, r.longitude, r.station_name,
+           r.video_url,
+           (SELECT m.menu_type FROM menus m
+             WHERE m.restaurant_id = r.id ORDER BY m.id LIMIT 1) AS category
+    FROM restaurants r
+    ORDER BY r.id
+"""
+
+
+def build_feature_collection(rows: Iterable[Tuple]) -> Dict[str, Any]:
+    """
+    식당 행 목록을 GeoJSON FeatureCollection으로 변환합니다.
+    좌표가 없는 식당은 제외합니다.
+
+    Args:
+        rows: (id, name, address, latitude, longitude, station_name, video_url, category)
+
+    Returns:
+        GeoJSON FeatureCollection 딕셔너리
+    """
+    features = []
+    for id_, name, address, latitude, longitude, station, video_url, category in rows:
+        lat = parse_coordinate(latitude, -90.0, 90.0)
+        lng = parse_coordinate(longitude, -180.0, 180.0)
+        if lat is None or lng is None:
+            continue
+        features.append(
+            {
+                "type": "Feature",
+                # GeoJSON 좌표 순서는 [경도, 위도]
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [round(lng, 6), round(lat, 6)],
+                },
+                "properties": {
+                    "id": id_,
+                    "name": name,
+                    "address": address,
+                    "station": station,
+                    "category": category or "기타",
+                    "video_url": video_url,
+                },
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def write_geojson_gz(collection: Dict[str, Any], file_path: Path) -> int:
+    """
+    GeoJSON을 gzip으로 압축해 원자적으로 저장합니다. (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)
+
+    Returns:
+        저장된 파일 크기 (바이트)
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(collection, ensure_ascii=False, separators=(",", ":"))
+    fd, temp_path = tempfile.mkstemp(dir=file_path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(gzip.compress(payload.encode("utf-8"), compresslevel=9))
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return file_path.stat().st_size
+
+
+def export_restaurants_geojson(conn, file_path: Path = None) -> Dict[str, Any]:
+    """
+    DB의 전체 식당을 GeoJSON 정적 파일로 내보냅니다. (save_db.py 실행 후 호출)
+
+    Args:
+        conn: psycopg2 연결
+        file_path: 저장 경로 (기본값: static/meokten/restaurants.geojson.gz)
+
+    Returns:
+        {"features": 식당 수, "bytes": 파일 크기, "elapsed_sec": 소요 시간}
+    """
+    file_path = file_path or STATIC_MEOKTEN_DIR / GEOJSON_FILE_NAME
+    start_time = time.time()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(EXPORT_QUERY)
+        collection = build_feature_collection(cursor.fetchall())
+    finally:
+        cursor.close()
+    size = write_geojson_gz(collection, file_path)
+    return {
+        "features": len(collection["features"]),
+        "bytes": size,
+        "elapsed_sec": round(time.time() - start_time, 2),
+    }
+
+
+def generate_synthetic_rows(count: int, seed: int = 42) -> List[Tuple]:
+    """벤치마크용 가짜 식당 데이터 (서울 일대 임의 좌표)"""
+    rng = random.Random(seed)
+    categories = ["한식", "중식", "일식", "양식", "분식", "고기", "해산물", "기타"]
+    return [
+        (
+            i,
+            f"식당 {i}",
+            f"서울특별시 테스트로 {i}",
+            str(37.45 + rng.random() * 0.25),
+            str(126.80 + rng.random() * 0.35),
+            "정보 없음",
+            f"https://www.youtube.com/watch?v=bench{i}",
+            rng.choice(categories),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def run_benchmark(sizes: List[int]):
+    """
+    1k/10k/50k 등 크기별 벤치마크 파일을 만들고 생성 시간과 크기를 출력합니다.
+    만든 파일은 먹텐 페이지에 ?benchmark=<개수>로 접속하면 전체 지도에서 불러오며,
+    브라우저 콘솔에 로드/인덱스/렌더링 시간이 기록됩니다.
+    """
+    for size in sizes:
+        start_time = time.time()
+        collection = build_feature_collection(generate_synthetic_rows(size))
+        file_path = STATIC_MEOKTEN_DIR / f"benchmark_{size}.geojson.gz"
+        file_size = write_geojson_gz(collection, file_path)
+        print(
+            f"[BENCH] {size}개: 생성 {time.time() - start_time:.2f}초, "
+            f"gzip {file_size / 1024:.1f}KB -> {file_path.name}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="먹텐 전체 식당 GeoJSON 생성")
+    parser.add_argument(
+        "--benchmark",
+        nargs="*",
+        type=int,
+        help="DB 대신 지정한 개수의 가짜 데이터로 벤치마크 파일 생성 (기본: 1000 10000 50000)",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        run_benchmark(args.benchmark or [1000, 10000, 50000])
+    else:
+        from save_db import get_db_connection
+
+        conn = get_db_connection()
+        try:
+            print(f"[INFO] GeoJSON 내보내기 완료: {export_restaurants_geojson(conn)}")
+        finally:
+            conn.close()
@@ -0,0 +1,221 @@
+# job_queue.py
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+# 대기 중인 티켓이 이 시간(초) 동안 상태를 확인하지 않으면 이탈한 것으로 간주
+TICKET_HEARTBEAT_TIMEOUT = 30
+
+
+class TranscriptionQueue:
+    """
+    프로세스 전역 FIFO 작업 큐.
+    모든 사용자 세션이 같은 인스턴스를 공유하며 동시에 max_concurrency개 작업만 실행합니다.
+    engine을 지정하면 Postgres 어드바이저리 락으로 여러 프로세스(컨테이너) 사이에서도
+    동시 실행 수를 제한합니다. (FIFO 순서는 프로세스 내에서만 보장)
+    """
+
+    def __init__(self, max_concurrency: int, engine=None, lock_namespace: int = 7031):
+        self.max_concurrency = max(1, max_concurrency)
+        self.engine = engine
+        self.lock_namespace = lock_namespace
+
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        # 티켓 번호 -> (등록 시각, 마지막 확인 시각)
+        self._waiting: "OrderedDict[int, list]" = OrderedDict()
+        # 티켓 번호 -> (시작 시각, Postgres 연결, 슬롯 번호)
+        self._running: Dict[int, tuple] = {}
+        # 전역 슬롯을 확보하는 중인 티켓 (DB 조회는 잠금 밖에서 실행)
+        self._acquiring: set = set()
+        # 티켓 번호 -> 청크 병렬 변환용으로 추가 확보한 [(Postgres 연결, 슬롯 번호)]
+        self._extra: Dict[int, list] = {}
+
+        self.wait_times = deque(maxlen=100)
+        self.service_times = deque(maxlen=100)
+
+    def enqueue(self) -> int:
+        """대기열에 등록하고 티켓 번호를 반환합니다."""
+        with self._lock:
+            ticket = next(self._counter)
+            now = time.time()
+            self._waiting[ticket] = [now, now]
+            return ticket
+
+    def _prune_abandoned(self, now: float):
+        for ticket, (_, last_seen) in list(self._waiting.items()):
+            if now - last_seen > TICKET_HEARTBEAT_TIMEOUT:
+                del self._waiting[ticket]
+
+    def position(self, ticket: int) -> int:
+        """앞에 대기 중인 작업 수 (0이면 다음 차례)"""
+        with self._lock:
+            for index, waiting_ticket in enumerate(self._waiting):
+                if waiting_ticket == ticket:
+                    return index
+            return 0
+
+    def eta(self, ticket: int) -> float:
+        """평균 처리 시간을 기준으로 계산한 예상 대기 시간 (초)"""
+        average = self.average_service_time() or 60.0
+        rounds = (self.position(ticket) + self._used_slots()) / self.max_concurrency
+        return rounds * average
+
+    def try_start(self, ticket: int) -> bool:
+        """
+        차례가 되었고 빈 슬롯이 있으면 작업을 시작 상태로 바꿉니다.
+        대기 중에는 주기적으로 호출해야 하며, 호출 자체가 이탈 여부 확인(heartbeat)으로 사용됩니다.
+
+        Returns:
+            작업을 시작해도 되면 True
+        """
+        with self._lock:
+            now = time.time()
+            if ticket not in self._waiting:
+                # 오래 확인하지 않아 제거된 티켓은 맨 뒤로 다시 등록
+                self._waiting[ticket] = [now, now]
+            self._waiting[ticket][1] = now
+            self._prune_abandoned(now)
+
+            if not self._can_start(ticket) or ticket in self._acquiring:
+                return False
+            self._acquiring.add(ticket)
+
+        # DB 왕복 동안 다른 세션의 heartbeat가 막히지 않도록 잠금 밖에서 슬롯 확보
+        try:
+            conn, slot = self._acquire_global_slot()
+        finally:
+            with self._lock:
+                self._acquiring.discard(ticket)
+        if self.engine is not None and conn is None:
+            return False
+
+        with self._lock:
+            # 슬롯을 확보하는 동안 상태가 바뀌었으면 (취소, 다른 작업 시작) 슬롯 반환
+            if self._can_start(ticket):
+                now = time.time()
+                enqueued_at, _ = self._waiting.pop(ticket)
+                self.wait_times.append(now - enqueued_at)
+                self._running[ticket] = (now, conn, slot)
+                return True
+        self._release_global_slot(conn, slot)
+        return False
+
+    def _used_slots(self) -> int:
+        """실행 중인 작업과 추가 확보한 슬롯 수"""
+        return len(self._running) + sum(len(extra) for extra in self._extra.values())
+
+    def _can_start(self, ticket: int) -> bool:
+        """맨 앞 차례이고 프로세스 내 빈 슬롯이 있는지 (self._lock을 잡은 상태에서 호출)"""
+        if not self._waiting or next(iter(self._waiting)) != ticket:
+            return False
+        return self._used_slots() < self.max_concurrency
+
+    def try_reserve_extra(self, ticket: int, count: int) -> int:
+        """
+        실행 중인 작업이 청크를 병렬로 변환할 수 있도록 빈 슬롯을 최대 count개 추가로 확보합니다.
+        대기 중인 작업이 있으면 확보하지 않으므로 청크 수만큼 동시 실행 제한을 넘지 않습니다.
+        확보한 슬롯은 finish()에서 함께 반환됩니다.
+
+        Returns:
+            추가로 확보한 슬롯 수
+        """
+        granted = 0
+        for _ in range(count):
+            with self._lock:
+                if (
+                    ticket not in self._running
+                    or self._waiting
+                    or self._used_slots() >= self.max_concurrency
+                ):
+                    break
+
+            conn, slot = self._acquire_global_slot()
+            if self.engine is not None and conn is None:
+                break
+
+            with self._lock:
+                if (
+                    ticket in self._running
+                    and self._used_slots() < self.max_concurrency
+                ):
+                    self._extra.setdefault(ticket, []).append((conn, slot))
+                    granted += 1
+                    continue
+            self._release_global_slot(conn, slot)
+            break
+        return granted
+
+    def finish(self, ticket: int):
+        """작업 완료(또는 대기 취소) 처리"""
+        with self._lock:
+            self._waiting.pop(ticket, None)
+            running = self._running.pop(ticket, None)
+            extra = self._extra.pop(ticket, [])
+        for conn, slot in extra:
+            self._release_global_slot(conn, slot)
+        if running:
+            started_at, conn, slot = running
+            self.service_times.append(time.time() - started_at)
+            self._release_global_slot(conn, slot)
+
+    def _acquire_global_slot(self):
+        """Postgres 어드바이저리 락으로 전역 슬롯 하나를 확보 (engine이 없으면 생략)"""
+        if self.engine is None:
+            return None, None
+        conn = None
+        try:
+            conn = self.engine.connect()
+            for slot in range(self.max_concurrency):
+                acquired = conn.execute(
+                    text("SELECT pg_try_advisory_lock(:namespace, :slot)"),
+                    {"namespace": self.lock_namespace, "slot": slot},
+                ).scalar()
+                if acquired:
+                    return conn, slot
+        except Exception as e:
+            print(f"[ERROR] 전역 작업 슬롯 확인 실패: {e}")
+        if conn is not None:
+            conn.close()
+        return None, None
+
+    def _release_global_slot(self, conn, slot: Optional[int]):
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                text("SELECT pg_advisory_unlock(:namespace, :slot)"),
+                {"namespace": self.lock_namespace, "slot": slot},
+            )
+        except Exception as e:
+            print(f"[ERROR] 전역 작업 슬롯 해제 실패: {e}")
+            # 세션 수준 락을 쥔 채 풀로 돌아가지 않도록 연결을 폐기 (연결이 끊기면 락도 해제됨)
+            conn.invalidate()
+        finally:
+            conn.close()
+
+    def average_wait_time(self) -> float:
+        return sum(self.wait_times) / len(self.wait_times) if self.wait_times else 0.0
+
+    def average_service_time(self) -> float:
+        if not self.service_times:
+            return 0.0
+        return sum(self.service_times) / len(self.service_times)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            waiting = len(self._waiting)
+            running = len(self._running)
+            slots = self._used_slots()
+        return {
+            "waiting": waiting,
+            "running": running,
+            "slots": slots,
+            "max_concurrency": self.max_concurrency,
+            "avg_wait_sec": round(self.average_wait_time(), 1),
+            "avg_service_sec": round(self.average_service_time(), 1),
+        }
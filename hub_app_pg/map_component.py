@@ -0,0 +1,65 @@
+# map_component.py
+import os
+from typing import List, Optional
+
+import streamlit.components.v1 as components
+from restaurant import Restaurant
+
+# 정적 HTML/JS로 작성된 프론트엔드 (별도 빌드 과정 없음)
+FRONTEND_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend")
+
+_meokten_map = components.declare_component(
+    "meokten_map", path=os.path.join(FRONTEND_ROOT, "meokten_map")
+)
+_meokten_all_map = components.declare_component(
+    "meokten_all_map", path=os.path.join(FRONTEND_ROOT, "meokten_all_map")
+)
+
+
+def meokten_map(
+    map_html: str,
+    restaurants: List[Restaurant],
+    highlighted_id: Optional[int] = None,
+    height: int = 700,
+    key: Optional[str] = None,
+):
+    """
+    folium 지도 HTML과 식당 목록을 받아 표시하는 커스텀 컴포넌트.
+    식당 선택(하이라이트, 이동, 확대)은 브라우저 안에서 처리되므로 페이지를 다시 실행하지 않습니다.
+    map_html이 바뀔 때만 지도를 다시 로드합니다.
+
+    Args:
+        map_html: render_restaurant_map_html로 만든 지도 HTML (하이라이트 없이 렌더링)
+        restaurants: 지도에 표시된 식당 목록
+        highlighted_id: 처음 하이라이트할 식당 ID
+        height: 컴포넌트 높이 (px)
+        key: Streamlit 위젯 키
+
+    Returns:
+        현재 지도 영역 {"south", "west", "north", "east", "zoom"}
+        (이동이 멈추고 보이는 타일 범위가 바뀔 때만 갱신, 처음에는 None)
+    """
+    markers = [restaurant.to_marker() for restaurant in restaurants]
+    return _meokten_map(
+        map_html=map_html,
+        restaurants=markers,
+        highlighted_id=highlighted_id,
+        height=height,
+        key=key,
+        default=None,
+    )
+
+
+def meokten_all_map(geojson_url: str, height: int = 700, key: Optional[str] = None):
+    """
+    전체 식당 GeoJSON(gzip)을 브라우저에서 한 번만 내려받아 클러스터링하여 표시하는 컴포넌트.
+    서버는 파일 URL만 전달하므로 식당 수와 관계없이 Python 쪽 렌더링 비용이 없습니다.
+
+    Args:
+        geojson_url: geojson_export로 만든 정적 파일 URL (바뀔 때만 다시 내려받음)
+        height: 컴포넌트 높이 (px)
+        key: Streamlit 위젯 키
+    """
+    return _meokten_all_map(
+        geojson_url=geojson_url, height=height, key=key, default=None
+    )
@@ -1,50 +1,163 @@
 # utils/map_utils.py
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
 import folium
+from branca.element import MacroElement
 from folium.plugins import MarkerCluster, FeatureGroupSubGroup
-from typing import List, Dict, Any
-import random
+from jinja2 import Template
+from typing import List
+
+from restaurant import BASE_LAT, BASE_LNG, MISSING, Restaurant, restaurants_key
+
+# 일반 마커 색상 (하이라이트는 red, 좌표 오류는 gray)
+CATEGORY_COLORS = [
+    "blue",
+    "green",
+    "purple",
+    "orange",
+    "darkblue",
+    "lightred",
+    "beige",
+    "darkgreen",
+    "darkpurple",
+    "cadetblue",
+]
+
+# 렌더링된 지도 HTML 캐시 크기
+MAP_CACHE_SIZE = int(os.getenv("MAP_CACHE_SIZE", 64))
+
+
+def get_restaurant_category(restaurant: Restaurant) -> str:
+    """식당 카테고리 (지도 서브그룹과 마커 색상에 사용)"""
+    return restaurant.category or "기타"
+
+
+def get_category_color(category: str) -> str:
+    """카테고리별로 항상 같은 마커 색상을 반환 (프로세스가 달라도 동일)"""
+    return CATEGORY_COLORS[zlib.crc32(category.encode("utf-8")) % len(CATEGORY_COLORS)]
 
-def create_simple_popup(restaurant: dict) -> str:
+
+def get_popup_data(restaurant: Restaurant) -> list:
+    """지연 팝업용 간단한 데이터 [이름, 주소, 역, 대표 메뉴, 영상 URL] (없는 값은 빈 문자열)"""
+    menu_names = [name.strip() for name in restaurant.menu.split(",") if name.strip()]
+    menu_text = ""
+    if menu_names and restaurant.menu != MISSING:
+        menu_text = ", ".join(menu_names[:2]) + (" 외" if len(menu_names) > 2 else "")
+    return [
+        restaurant.name,
+        restaurant.address,
+        restaurant.subway if restaurant.subway != MISSING else "",
+        menu_text,
+        restaurant.video_url if restaurant.has_video else "",
+    ]
+
+
+class LazyPopups(MacroElement):
+    """
+    마커별 팝업 HTML 대신 간단한 데이터만 한 번 포함하고, 팝업을 열 때 브라우저에서 내용을 만듭니다.
+    지도에 마지막으로 추가해야 마커 변수가 모두 정의된 뒤 실행됩니다.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function () {
+            var popupData = {{ this.data_json }};
+            function line(label, value) {
+                var p = document.createElement("p");
+                p.style.cssText = "margin: 3px 0; font-size: 12px;";
+                var strong = document.createElement("strong");
+                strong.textContent = label + ": ";
+                p.appendChild(strong);
+                p.appendChild(document.createTextNode(value));
+                return p;
+            }
+            function buildPopup(item) {
+                var div = document.createElement("div");
+                div.style.cssText = "min-width: 150px; max-width: 200px; font-family: sans-serif;";
+                var title = document.createElement("h4");
+                title.style.cssText = "margin: 5px 0; color: #333;";
+                title.textContent = item[0];
+                div.appendChild(title);
+                div.appendChild(line("주소", item[1]));
+                if (item[2]) div.appendChild(line("역", item[2]));
+                if (item[3]) div.appendChild(line("대표 메뉴", item[3]));
+                if (item[4]) {
+                    var p = document.createElement("p");
+                    p.style.cssText = "margin: 3px 0; font-size: 12px;";
+                    var link = document.createElement("a");
+                    link.href = item[4];
+                    link.target = "_blank";
+                    link.style.color = "#FF0000";
+                    link.textContent = "🎬 유튜브 영상";
+                    p.appendChild(link);
+                    div.appendChild(p);
+                }
+                return div;
+            }
+            Object.keys(popupData).forEach(function (name) {
+                window[name].bindPopup(function () {
+                    return buildPopup(popupData[name]);
+                }, { maxWidth: 200 });
+            });
+        })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, popup_data: dict):
+        super().__init__()
+        self._name = "LazyPopups"
+        # 스크립트 안에 넣으므로 </script>로 끝나지 않도록 "</"를 이스케이프
+        self.data_json = json.dumps(
+            popup_data, ensure_ascii=False, separators=(",", ":")
+        ).replace("</", "<\\/")
+
+
+def create_simple_popup(restaurant: Restaurant) -> str:
     """
     식당 정보를 바탕으로 간단한 팝업 내용을 생성합니다.
 
     Args:
-        restaurant: 식당 정보 딕셔너리
+        restaurant: 식당 정보
 
     Returns:
         HTML 형식의 팝업 내용
     """
-    name = restaurant.get("name", "이름 없음")
-    address = restaurant.get("address", "주소 없음")
-    station = restaurant.get("subway", "")
-
     # 메뉴 정보 (최대 2개까지만 표시)
     menu_html = ""
-    if "menus" in restaurant and restaurant["menus"]:
-        menus = restaurant["menus"][:2]  # 최대 2개까지만
-        menu_names = [
-            menu.get("menu_name", "") for menu in menus if menu.get("menu_name")
-        ]
-        if menu_names:
-            menu_text = ", ".join(menu_names)
-            if len(restaurant["menus"]) > 2:
-                menu_text += " 외"
-            menu_html = f"<p><strong>대표 메뉴:</strong> {menu_text}</p>"
+    menu_names = [
+        name.strip() for name in restaurant.menu.split(",") if name.strip()
+    ]
+    if menu_names and restaurant.menu != MISSING:
+        menu_text = ", ".join(menu_names[:2])
+        if len(menu_names) > 2:
+            menu_text += " 외"
+        menu_html = f'<p style="margin: 3px 0; font-size: 12px;"><strong>대표 메뉴:</strong> {menu_text}</p>'
 
     # 유튜브 링크
     video_html = ""
-    if "video_url" in restaurant and restaurant["video_url"]:
-        video_url = restaurant["video_url"]
-        video_html = f'<p><a href="{video_url}" target="_blank" style="color: #FF0000;">🎬 유튜브 영상</a></p>'
+    if restaurant.has_video:
+        video_html = f'<p style="margin: 3px 0; font-size: 12px;"><a href="{restaurant.video_url}" target="_blank" style="color: #FF0000;">🎬 유튜브 영상</a></p>'
+
+    station_html = ""
+    if restaurant.subway and restaurant.subway != MISSING:
+        station_html = f'<p style="margin: 3px 0; font-size: 12px;"><strong>역:</strong> {restaurant.subway}</p>'
 
     # 팝업 내용 생성 (간단한 형태)
     popup_content = f"""
     <div style="min-width: 150px; max-width: 200px; font-family: sans-serif;">
-        <h4 style="margin: 5px 0; color: #333;">{name}</h4>
-        <p style="margin: 3px 0; font-size: 12px;"><strong>주소:</strong> {address}</p>
-        {f'<p style="margin: 3px 0; font-size: 12px;"><strong>역:</strong> {station}</p>' if station else ''}
-        {menu_html.replace('<p>', '<p style="margin: 3px 0; font-size: 12px;">')}
-        {video_html.replace('<p>', '<p style="margin: 3px 0; font-size: 12px;">')}
+        <h4 style="margin: 5px 0; color: #333;">{restaurant.name}</h4>
+        <p style="margin: 3px 0; font-size: 12px;"><strong>주소:</strong> {restaurant.address}</p>
+        {station_html}
+        {menu_html}
+        {video_html}
     </div>
     """
 
@@ -52,158 +165,197 @@ def create_simple_popup(restaurant: dict) -> str:
 
 
 def create_restaurant_map(
-    restaurants: List[Dict[str, Any]],
+    restaurants: List[Restaurant],
     center=None,
     highlighted_id=None,
     use_clustering=True,
     zoom_start=14,
+    lazy_popups=True,
 ):
-    """식당 정보를 지도에 표시, 특정 식당 하이라이트 가능"""
+    """
+    식당 정보를 지도에 표시, 특정 식당 하이라이트 가능.
+    좌표는 Restaurant 생성 시 이미 검증되었으므로 그대로 사용합니다.
+    lazy_popups가 True이면 팝업 HTML을 마커마다 만들지 않고 클릭 시 브라우저에서 생성합니다.
+    """
     # 중심 좌표 설정 (기본값: 서울)
     if center is None:
-        center = [37.5665, 126.9780]
+        center = [BASE_LAT, BASE_LNG]
 
     # 지도 생성
     m = folium.Map(location=center, zoom_start=zoom_start, tiles="cartodbpositron")
 
-    # 클러스터링 설정
-    if use_clustering and len(restaurants) > 1:
+    # 클러스터링 설정 (카테고리별 서브그룹)
+    clustered = use_clustering and len(restaurants) > 1
+    categories = {}
+    if clustered:
         marker_cluster = MarkerCluster(name="식당 클러스터")
         marker_cluster.add_to(m)
-
-        # 카테고리별 서브그룹 생성
-        categories = {}
         for restaurant in restaurants:
-            # 메뉴 정보에서 카테고리 추출
-            category = "기타"
-            if restaurant.get("menus"):
-                menu_types = [
-                    menu.get("menu_type", "") for menu in restaurant.get("menus", [])
-                ]
-                if menu_types and menu_types[0]:
-                    category = menu_types[0]
-
+            category = get_restaurant_category(restaurant)
             if category not in categories:
                 categories[category] = FeatureGroupSubGroup(
                     marker_cluster, name=f"{category} 식당"
                 )
                 categories[category].add_to(m)
 
-    # 서울 중심 좌표 (기본값)
-    base_lat, base_lng = 37.5665, 126.9780
-
     # 식당 마커 추가
-    for i, restaurant in enumerate(restaurants, 1):
-        # 위도, 경도 확인
-        try:
-            # 좌표 데이터 처리 개선
-            lat = restaurant.get("lat", None)
-            lng = restaurant.get("lng", None)
-
-            # 문자열인 경우 float로 변환
-            if isinstance(lat, str) and lat not in ["정보 없음", "0", ""]:
-                lat = float(lat)
-            if isinstance(lng, str) and lng not in ["정보 없음", "0", ""]:
-                lng = float(lng)
-
-            # 유효한 좌표인지 확인
-            if not lat or not lng or lat == 0 or lng == 0:
-                print(
-                    f"유효하지 않은 좌표: {restaurant['name']} - lat: {lat}, lng: {lng}"
-                )
-                # 기본 좌표에 오프셋 추가
-                lat = base_lat + (i * 0.001)
-                lng = base_lng + (i * 0.001)
-                print(f"기본 좌표 할당: {restaurant['name']} - lat: {lat}, lng: {lng}")
-
-            # 아이콘 선택
-            icon_name = "cutlery"
-
-            # 간단한 팝업 내용 생성
-            popup_html = create_simple_popup(restaurant)
-
-            # 하이라이트 여부 확인
-            is_highlighted = str(restaurant.get("id", "")) == str(highlighted_id)
-
-            # 마커 색상 및 아이콘 설정
-            icon_color = (
-                "red"
-                if is_highlighted
-                else random.choice(
-                    [
-                        "blue",
-                        "green",
-                        "purple",
-                        "orange",
-                        "darkblue",
-                        "lightred",
-                        "beige",
-                        "darkgreen",
-                        "darkpurple",
-                        "cadetblue",
-                    ]
-                )
-            )
+    popup_data = {}
+    for restaurant in restaurants:
+        category = get_restaurant_category(restaurant)
+        is_highlighted = str(restaurant.id) == str(highlighted_id)
 
-            # 마커 생성
-            marker = folium.Marker(
-                location=[lat, lng],
-                popup=folium.Popup(popup_html, max_width=200),
-                tooltip=restaurant["name"],
-                icon=folium.Icon(color=icon_color, icon=icon_name, prefix="fa"),
-            )
+        # 마커 색상 및 아이콘 설정 (좌표를 찾지 못한 식당은 회색 물음표)
+        if restaurant.approximate:
+            icon = folium.Icon(color="gray", icon="question", prefix="fa")
+        else:
+            icon_color = "red" if is_highlighted else get_category_color(category)
+            icon = folium.Icon(color=icon_color, icon="cutlery", prefix="fa")
 
-            # 마커 추가 (클러스터링 사용 여부에 따라)
-            if use_clustering and len(restaurants) > 1:
-                if category in categories:
-                    marker.add_to(categories[category])
-                else:
-                    marker.add_to(marker_cluster)
-            else:
-                marker.add_to(m)
-
-            # 하이라이트된 마커에 추가 효과
-            if is_highlighted:
-                # 원형 마커 추가
-                folium.CircleMarker(
-                    location=[lat, lng],
-                    radius=30,
-                    color="#FF4B4B",
-                    fill=True,
-                    fill_color="#FF4B4B",
-                    fill_opacity=0.2,
-                    weight=3,
-                ).add_to(m)
-
-        except (ValueError, TypeError) as e:
-            print(f"좌표 변환 오류: {restaurant.get('name', '이름 없음')} - {e}")
-            # 오류 발생 시 기본 좌표에 오프셋 추가
-            lat = base_lat + (i * 0.001)
-            lng = base_lng + (i * 0.001)
-            print(
-                f"오류 발생으로 기본 좌표 할당: {restaurant.get('name', '이름 없음')} - lat: {lat}, lng: {lng}"
-            )
+        marker = folium.Marker(
+            location=[restaurant.lat, restaurant.lng],
+            popup=(
+                None
+                if lazy_popups
+                else folium.Popup(create_simple_popup(restaurant), max_width=200)
+            ),
+            tooltip=restaurant.name,
+            icon=icon,
+        )
+        if lazy_popups:
+            popup_data[marker.get_name()] = get_popup_data(restaurant)
 
-            try:
-                # 마커 생성 및 추가 시도
-                marker = folium.Marker(
-                    location=[lat, lng],
-                    popup=folium.Popup(create_simple_popup(restaurant), max_width=200),
-                    tooltip=restaurant.get("name", "이름 없음"),
-                    icon=folium.Icon(color="gray", icon="question", prefix="fa"),
-                )
+        # 마커 추가 (클러스터링 사용 여부에 따라)
+        marker.add_to(categories[category] if clustered else m)
 
-                # 마커 추가
-                if use_clustering and len(restaurants) > 1:
-                    marker.add_to(marker_cluster)
-                else:
-                    marker.add_to(m)
-            except Exception as e2:
-                print(f"마커 생성 오류: {restaurant.get('name', '이름 없음')} - {e2}")
-                continue
+        # 하이라이트된 마커에 추가 효과
+        if is_highlighted:
+            folium.CircleMarker(
+                location=[restaurant.lat, restaurant.lng],
+                radius=30,
+                color="#FF4B4B",
+                fill=True,
+                fill_color="#FF4B4B",
+                fill_opacity=0.2,
+                weight=3,
+            ).add_to(m)
 
     # 레이어 컨트롤 추가 (클러스터링 사용 시)
-    if use_clustering and len(restaurants) > 1 and categories:
+    if categories:
         folium.LayerControl().add_to(m)
 
+    if popup_data:
+        LazyPopups(popup_data).add_to(m)
+
     return m
+
+
+def get_restaurants_hash(restaurants: List[Restaurant]) -> str:
+    """식당 목록 내용 기반 해시 (지도 캐시 키로 사용)"""
+    payload = json.dumps(restaurants_key(restaurants), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MapHtmlCache:
+    """렌더링된 지도 HTML을 보관하는 LRU 캐시 (모든 세션이 공유)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[tuple, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            html = self._data.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key, html: str):
+        with self._lock:
+            self._data[key] = html
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+map_html_cache = MapHtmlCache(MAP_CACHE_SIZE)
+
+
+def render_restaurant_map_html(
+    restaurants: List[Restaurant],
+    center=None,
+    highlighted_id=None,
+    zoom_start=14,
+):
+    """
+    create_restaurant_map 결과를 HTML로 렌더링합니다.
+    (식당 목록 해시, 하이라이트 ID, 중심 좌표, 줌) 조합별로 결과를 캐시하여
+    채팅 등으로 페이지가 다시 실행될 때 지도를 다시 만들지 않습니다.
+
+    Returns:
+        (지도 HTML, 측정 정보 {"cached", "render_ms", "bytes"})
+    """
+    if center is None:
+        center = [BASE_LAT, BASE_LNG]
+    key = (
+        get_restaurants_hash(restaurants),
+        str(highlighted_id) if highlighted_id is not None else None,
+        (round(float(center[0]), 6), round(float(center[1]), 6)),
+        zoom_start,
+    )
+
+    start_time = time.perf_counter()
+    html = map_html_cache.get(key)
+    cached = html is not None
+    if not cached:
+        m = create_restaurant_map(
+            restaurants,
+            center=center,
+            highlighted_id=highlighted_id,
+            use_clustering=True,
+            zoom_start=zoom_start,
+        )
+        html = m.get_root().render()
+        map_html_cache.set(key, html)
+
+    stats = {
+        "cached": cached,
+        "render_ms": round((time.perf_counter() - start_time) * 1000, 1),
+        "bytes": len(html.encode("utf-8")),
+    }
+    return html, stats
+
+
+if __name__ == "__main__":
+    # 벤치마크: 마커 100/1000개에서 팝업 방식별 지도 HTML 크기와 렌더링 시간
+    import random
+
+    rng = random.Random(0)
+    for count in [100, 1000]:
+        restaurants = [
+            Restaurant(
+                id=i,
+                name=f"식당 {i}",
+                address=f"서울특별시 테스트로 {i}",
+                subway="시청역",
+                menu="김치찌개, 제육볶음, 계란말이",
+                review="맛있다",
+                video_url=f"https://www.youtube.com/watch?v=bench{i}",
+                lat=37.45 + rng.random() * 0.25,
+                lng=126.80 + rng.random() * 0.35,
+            )
+            for i in range(1, count + 1)
+        ]
+        for lazy in [False, True]:
+            start_time = time.perf_counter()
+            html = create_restaurant_map(restaurants, lazy_popups=lazy).get_root().render()
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            print(
+                f"{count}개, {'지연 팝업' if lazy else '기존 팝업'}: "
+                f"{len(html.encode('utf-8')) / 1024:.1f}KB, {elapsed_ms:.0f}ms"
+            )
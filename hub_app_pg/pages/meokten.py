@@ -1,7 +1,7 @@
 # app.py
 import streamlit as st
+import streamlit.components.v1 as components
 from dotenv import load_dotenv
-from streamlit_folium import st_folium
 
 from agent.config import get_logger
 
@@ -9,7 +9,11 @@ from agent.db import get_db_connection
 
 # 커스텀 모듈 임포트
 from agent.graph import AgentGraph
-from map_utils import create_restaurant_map
+from geojson_export import GEOJSON_FILE_NAME, STATIC_MEOKTEN_DIR, STATIC_MEOKTEN_URL
+from map_component import meokten_all_map, meokten_map
+from map_utils import map_html_cache, render_restaurant_map_html
+from restaurant import BASE_LAT, BASE_LNG, parse_restaurants
+from utils import BOUNDS_MIN_ZOOM, get_restaurants_in_bounds
 
 # 페이지 네비게이션 숨기기
 hide_pages = """
@@ -53,124 +57,6 @@ if "agent_graph" not in st.session_state:
     st.session_state.agent_graph = create_agent_graph()
     logger.info("에이전트 그래프 초기화 완료")
 
-# 자바스크립트 코드 추가 (이벤트 리스너, 자동 스크롤, 지도 크기 유지)
-st.markdown(
-    f"""
-    <style>
-    /* 지도 컨테이너 크기 유지를 위한 CSS */
-    [data-testid="stContainer"] {{
-        min-height: {MAP_HEIGHT}px !important;
-        height: {MAP_HEIGHT}px !important;
-    }}
-    /* 특정 지도 컨테이너에 적용 (좀 더 구체적인 선택자) */
-    [data-testid="column"]:first-child [data-testid="stContainer"] {{
-        min-height: {MAP_HEIGHT}px !important;
-        height: {MAP_HEIGHT}px !important;
-    }}
-    .folium-map {{
-        width: 100%;
-        height: {MAP_HEIGHT}px !important;
-        min-height: {MAP_HEIGHT}px !important;
-        z-index: 1;
-    }}
-    iframe {{
-        height: {MAP_HEIGHT}px !important;
-        min-height: {MAP_HEIGHT}px !important;
-        width: 100% !important;
-    }}
-    .stApp [data-testid="column"] {{
-        overflow: visible !important;
-    }}
-    /* 왼쪽 컬럼 지도 영역 스타일 */
-    [data-testid="column"]:first-child {{
-        min-height: {MAP_HEIGHT + 100}px !important;
-        height: auto !important;
-    }}
-    
-    /* 지도가 표시되는 영역이 충분한 공간을 가지도록 함 */
-    [data-testid="column"]:first-child [data-testid="block-container"] {{
-        height: auto !important;
-        min-height: {MAP_HEIGHT}px !important;
-        padding-bottom: 50px !important;
-    }}
-    </style>
-    <script>
-    // 메시지 이벤트 리스너 설정
-    window.addEventListener('message', function(e) {{
-        if (e.data && e.data.type === 'highlight_restaurant') {{
-            // URL 파라미터 설정하여 페이지 리로드
-            const url = new URL(window.location.href);
-            url.searchParams.set('restaurant_id', e.data.id);
-            window.location.href = url.toString();
-        }}
-    }});
-    
-    // 자동 스크롤 함수
-    function scrollChatToBottom() {{
-        var chatContainer = document.querySelector('[data-testid="stVerticalBlock"] > [data-testid="stVerticalBlock"]');
-        if (chatContainer) {{
-            chatContainer.scrollTop = chatContainer.scrollHeight;
-        }}
-    }}
-    
-    // 지도 크기 유지 함수
-    function maintainMapSize() {{
-        // 지도 iframe 찾기
-        const mapIframes = document.querySelectorAll('.folium-map iframe');
-        mapIframes.forEach(iframe => {{
-            iframe.style.height = '{MAP_HEIGHT}px';
-            iframe.style.minHeight = '{MAP_HEIGHT}px';
-            iframe.style.width = '100%';
-        }});
-        
-        // 지도 컨테이너 찾기 (좀 더 정확한 선택자 사용)
-        const leftColumn = document.querySelector('[data-testid="column"]:first-child');
-        if (leftColumn) {{
-            const mapContainers = leftColumn.querySelectorAll('[data-testid="stContainer"]');
-            mapContainers.forEach(container => {{
-                container.style.minHeight = '{MAP_HEIGHT}px';
-                container.style.height = '{MAP_HEIGHT}px';
-            }});
-            
-            // 왼쪽 컬럼 자체의 크기도 조정
-            leftColumn.style.minHeight = '{MAP_HEIGHT + 100}px';
-        }}
-        
-        // 전체 지도 영역 강제 리사이징
-        const mapElements = document.querySelectorAll('.folium-map');
-        mapElements.forEach(map => {{
-            map.style.height = '{MAP_HEIGHT}px';
-            map.style.minHeight = '{MAP_HEIGHT}px';
-        }});
-    }}
-    
-    // 페이지 로드 후 실행
-    window.addEventListener('load', function() {{
-        scrollChatToBottom();
-        maintainMapSize();
-        
-        // MutationObserver를 사용하여 DOM 변경 감지 및 지도 크기 유지
-        const observer = new MutationObserver(function(mutations) {{
-            maintainMapSize();
-        }});
-        
-        // body의 모든 하위 요소 변경 감시
-        observer.observe(document.body, {{ 
-            childList: true, 
-            subtree: true 
-        }});
-    }});
-    
-    // 1초마다 스크롤 (새 메시지가 추가될 때)
-    setInterval(scrollChatToBottom, 1000);
-    
-    // 0.5초마다 지도 크기 확인 및 조정
-    setInterval(maintainMapSize, 500);
-    </script>
-    """,
-    unsafe_allow_html=True,
-)
-
 # 제목 및 소개
 st.title("🍽️ 먹텐 - 맛집 추천 AI")
 st.subheader("성시경의 '먹을텐데' 맛집 추천 서비스")
@@ -201,7 +87,7 @@ with st.sidebar:
         ### 사용 방법
         1. 원하는 맛집 정보를 질문하세요
         2. AI가 맛집을 추천해드립니다
-        3. 식당 이름을 클릭하면 상세 정보를 볼 수 있습니다
+        3. 지도 위 식당 이름을 클릭하면 해당 위치로 이동합니다
         
         ### 예시 질문
         - 논현역 맛집 추천해줘
@@ -223,141 +109,125 @@ if "messages" not in st.session_state:
 
 # 식당 JSON 파싱 함수
 def parse_restaurant_info(data):
+    """
+    에이전트 응답을 (채팅 답변 텍스트, Restaurant 목록)으로 변환.
+    좌표 검증과 기본 좌표 할당은 Restaurant.from_info에서 한 번만 수행됨.
+    """
     try:
-        if "answer" in data:
-            # 식당 정보 추출
-            Answer = data.get("answer", "")
-            restaurants = []
-            if isinstance(data, dict) and "infos" in data:
-                logger.info(f"응답에서 {len(data['infos'])}개의 식당 정보 발견")
-
-                # 서울 중심 좌표 (기본값)
-                base_lat, base_lng = 37.5665, 126.9780
-
-                for i, info in enumerate(data["infos"], 1):
-                    # 좌표 정보 처리
-                    try:
-                        lat = info.get("lat", "0")
-                        lng = info.get("lng", "0")
-
-                        # 문자열인 경우 변환 처리
-                        if isinstance(lat, str):
-                            lat = float(lat) if lat and lat != "정보 없음" else 0
-                        if isinstance(lng, str):
-                            lng = float(lng) if lng and lng != "정보 없음" else 0
-
-                        # 좌표가 없거나 0인 경우 기본 좌표에 오프셋 추가
-                        if not lat or not lng or lat == 0 or lng == 0:
-                            lat = base_lat + (i * 0.001)
-                            lng = base_lng + (i * 0.001)
-                            logger.info(
-                                f"식당 {i}에 기본 좌표 할당: lat={lat}, lng={lng}"
-                            )
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"좌표 변환 오류, 기본값 사용: {str(e)}")
-                        lat = base_lat + (i * 0.001)
-                        lng = base_lng + (i * 0.001)
-
-                    logger.info(
-                        f"식당 {i}: {info.get('name', '이름 없음')} - 좌표: lat={lat}, lng={lng}"
-                    )
-
-                    Answer += f"\n\n{i}. {info.get('name', '이름 없음')}\n\n"
-                    Answer += f"\t📍 주소: {info.get('address', '주소 없음')}\n\n"
-                    Answer += f"\t🚇 지하철: {info.get('subway', '정보 없음')}\n\n"
-                    Answer += f"\t🍽️ 메뉴: {info.get('menu', '정보 없음')}\n\n"
-                    Answer += f"\t⭐ 리뷰: {info.get('review', '정보 없음')}\n\n"
-                    Answer += (
-                        f"\t🎬 유튜브 영상: {info.get('video_url', '정보 없음')}\n\n"
-                    )
-                    restaurant = {
-                        "id": i,
-                        "name": info.get("name", "이름 없음"),
-                        "address": info.get("address", "주소 없음"),
-                        "subway": info.get("subway", "정보 없음"),
-                        "menu": info.get("menu", "정보 없음"),
-                        "review": info.get("review", "정보 없음"),
-                        "video_url": info.get("video_url", "정보 없음"),
-                        "lat": lat,
-                        "lng": lng,
-                    }
-                    restaurants.append(restaurant)
-            elif isinstance(data, list):
-                # 직접 식당 목록이 전달된 경우 (예: [{...}, {...}])
-                logger.info(f"응답에서 {len(data)}개의 식당 정보 발견")
-
-                # 서울 중심 좌표 (기본값)
-                base_lat, base_lng = 37.5665, 126.9780
-
-                for i, info in enumerate(data, 1):
-                    # 좌표 정보 처리
-                    try:
-                        lat = info.get("lat", "0")
-                        lng = info.get("lng", "0")
-
-                        # 문자열인 경우 변환 처리
-                        if isinstance(lat, str):
-                            lat = float(lat) if lat and lat != "정보 없음" else 0
-                        if isinstance(lng, str):
-                            lng = float(lng) if lng and lng != "정보 없음" else 0
-
-                        # 좌표가 없거나 0인 경우 기본 좌표에 오프셋 추가
-                        if not lat or not lng or lat == 0 or lng == 0:
-                            lat = base_lat + (i * 0.001)
-                            lng = base_lng + (i * 0.001)
-                            logger.info(
-                                f"식당 {i}에 기본 좌표 할당: lat={lat}, lng={lng}"
-                            )
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"좌표 변환 오류, 기본값 사용: {str(e)}")
-                        lat = base_lat + (i * 0.001)
-                        lng = base_lng + (i * 0.001)
-
-                    logger.info(
-                        f"식당 {i}: {info.get('name', '이름 없음')} - 좌표: lat={lat}, lng={lng}"
-                    )
-
-                    Answer += f"\n\n{i}. {info.get('name', '이름 없음')}\n\n"
-                    Answer += f"\t📍 주소: {info.get('address', '주소 없음')}\n\n"
-                    Answer += f"\t🚇 지하철: {info.get('subway', '정보 없음')}\n\n"
-                    Answer += f"\t🍽️ 메뉴: {info.get('menu', '정보 없음')}\n\n"
-                    Answer += f"\t⭐ 리뷰: {info.get('review', '정보 없음')}\n"
-                    restaurant = {
-                        "id": i,
-                        "name": info.get("name", "이름 없음"),
-                        "address": info.get("address", "주소 없음"),
-                        "subway": info.get("subway", "정보 없음"),
-                        "menu": info.get("menu", "정보 없음"),
-                        "review": info.get("review", "정보 없음"),
-                        "lat": lat,
-                        "lng": lng,
-                    }
-                    restaurants.append(restaurant)
-
-            # 추출된 식당 정보 요약 로깅
-            logger.info(f"총 {len(restaurants)}개 식당 정보 추출 완료")
-            for i, r in enumerate(restaurants, 1):
-                logger.info(
-                    f"추출된 식당 {i}: {r.get('name')} - 좌표: lat={r.get('lat')}, lng={r.get('lng')}"
-                )
-
-            return Answer, restaurants
-        else:
+        if "answer" not in data:
             return data, []
 
+        answer = data.get("answer", "")
+        restaurants = parse_restaurants(data.get("infos", []))
+        for restaurant in restaurants:
+            answer += restaurant.to_answer_text()
+
+        approximate = [r.name for r in restaurants if r.approximate]
+        if approximate:
+            logger.warning(f"좌표가 없어 기본 좌표를 사용한 식당: {approximate}")
+        logger.info(f"총 {len(restaurants)}개 식당 정보 추출 완료")
+        return answer, restaurants
+
     except Exception as e:
         logger.error(f"JSON 파싱 오류: {str(e)}")
         logger.debug(f"파싱 실패한 문자열: {data}")
         return data, []
 
 
-# 식당 하이라이트 함수
-def highlight_restaurant(restaurant_id):
-    """식당을 하이라이트하는 함수"""
-    logger.info(f"식당 하이라이트 요청: ID={restaurant_id}")
-    st.session_state.highlighted_restaurant = int(restaurant_id)
-    # URL 파라미터 설정을 위한 쿼리 파라미터 업데이트
-    st.query_params["restaurant_id"] = restaurant_id
+def show_restaurant_map(restaurants, center, highlighted_id=None):
+    """
+    캐시된 지도 HTML을 지도 컴포넌트로 표시하고 렌더링 시간과 전송 크기를 기록.
+    하이라이트는 컴포넌트가 브라우저에서 처리하므로 지도 HTML은 식당 목록별로 한 번만 생성됨.
+    """
+    html, stats = render_restaurant_map_html(restaurants, center=center)
+    logger.info(
+        f"지도 렌더링: {'캐시 적중' if stats['cached'] else '새로 생성'}, "
+        f"{stats['render_ms']}ms, {stats['bytes'] / 1024:.1f}KB "
+        f"(캐시 적중 {map_html_cache.hits}회 / 미스 {map_html_cache.misses}회)"
+    )
+    st.session_state.map_bounds = meokten_map(
+        html,
+        restaurants,
+        highlighted_id=highlighted_id,
+        height=MAP_HEIGHT,
+        key="meokten_map",
+    )
+
+
+def show_restaurants_in_view(bounds):
+    """현재 지도 영역 안의 식당 목록 (DB 영역 조회, 에이전트 호출 없음)"""
+    try:
+        restaurants = get_restaurants_in_bounds(
+            bounds["south"], bounds["west"], bounds["north"], bounds["east"], bounds["zoom"]
+        )
+    except Exception as e:
+        logger.error(f"지도 영역 식당 조회 오류: {str(e)}")
+        st.caption("⚠️ 이 지역 맛집을 불러오지 못했습니다. 잠시 후 다시 시도해주세요.")
+        return
+    if restaurants is None:
+        st.caption(f"지도를 더 확대하면(줌 {BOUNDS_MIN_ZOOM} 이상) 이 지역 맛집을 볼 수 있습니다.")
+        return
+    with st.expander(f"🧭 현재 지도 영역의 맛집 ({len(restaurants)}개)", expanded=False):
+        for restaurant in restaurants:
+            st.markdown(
+                f"**{restaurant['name']}** · {restaurant['address']} · "
+                f"🚇 {restaurant['subway'] or '정보 없음'}"
+            )
+
+
+def get_static_meokten_url() -> str:
+    """정적 파일 URL (server.baseUrlPath로 실행하면 그 경로 아래에서 서빙되므로 앞에 붙임)"""
+    base_url_path = (st.get_option("server.baseUrlPath") or "").strip("/")
+    if not base_url_path:
+        return STATIC_MEOKTEN_URL
+    return f"/{base_url_path}{STATIC_MEOKTEN_URL}"
+
+
+def show_all_restaurants_map():
+    """
+    전체 맛집 지도. save_db.py 실행 시 생성되는 GeoJSON 정적 파일을 브라우저가 한 번만
+    내려받아 클러스터링하므로 식당 수와 관계없이 서버에서 마커를 만들지 않음.
+    ?benchmark=<개수>로 접속하면 geojson_export.py --benchmark로 만든 파일을 불러옴.
+    """
+    file_name = GEOJSON_FILE_NAME
+    benchmark = st.query_params.get("benchmark")
+    if benchmark and benchmark.isdigit():
+        file_name = f"benchmark_{benchmark}.geojson.gz"
+
+    file_path = STATIC_MEOKTEN_DIR / file_name
+    if not file_path.exists():
+        st.warning(
+            "전체 맛집 데이터가 아직 생성되지 않았습니다. (save_db.py 실행 후 생성됩니다)"
+        )
+        return
+    # 파일이 갱신되면 URL이 바뀌어 브라우저가 새로 내려받음
+    version = int(file_path.stat().st_mtime)
+    meokten_all_map(
+        f"{get_static_meokten_url()}/{file_name}?v={version}",
+        height=MAP_HEIGHT,
+        key="meokten_all_map",
+    )
+
+
+def scroll_chat_to_latest(message_count):
+    """
+    새 메시지가 추가됐을 때만 채팅 영역을 마지막 메시지로 스크롤.
+    메시지 수가 HTML에 포함되어 있어 수가 바뀔 때만 스크립트가 다시 실행됨.
+    """
+    components.html(
+        f"""
+        <script>
+        // message_count={message_count}
+        const messages = window.parent.document.querySelectorAll(
+            '[data-testid="stChatMessage"]'
+        );
+        if (messages.length) {{
+            messages[messages.length - 1].scrollIntoView({{ block: "end" }});
+        }}
+        </script>
+        """,
+        height=0,
+    )
 
 
 # 좌우 컬럼 생성
@@ -366,161 +236,40 @@ left_col, right_col = st.columns([1, 1])
 # 왼쪽 컬럼: 지도 표시
 with left_col:
     st.header("🗺️ 먹텐 지도")
+    map_mode = st.radio(
+        "지도 보기",
+        ["검색 결과", "전체 맛집"],
+        horizontal=True,
+        label_visibility="collapsed",
+    )
 
     # 지도를 담을 고정 크기 컨테이너 생성
     map_container = st.container(height=MAP_HEIGHT, border=False)
 
     with map_container:
+        if map_mode == "전체 맛집":
+            show_all_restaurants_map()
         # 지도 표시 (식당 정보가 있는 경우)
-        if "restaurants" in st.session_state and st.session_state.restaurants:
-            # 유효한 좌표가 있는 식당 필터링
-            valid_restaurants = []
-            for restaurant in st.session_state.restaurants:
-                try:
-                    lat = restaurant.get("lat")
-                    lng = restaurant.get("lng")
-
-                    # 숫자형으로 변환 확인
-                    if isinstance(lat, (str, float, int)) and lat not in [
-                        "정보 없음",
-                        "0",
-                        "",
-                        0,
-                    ]:
-                        if isinstance(lat, str):
-                            lat = float(lat)
-                        if isinstance(lng, (str, float, int)) and lng not in [
-                            "정보 없음",
-                            "0",
-                            "",
-                            0,
-                        ]:
-                            if isinstance(lng, str):
-                                lng = float(lng)
-
-                        # 유효한 좌표인 경우만 추가 (엄격하게 검사)
-                        if lat and lng and lat != 0 and lng != 0:
-                            # 좌표 정보 업데이트
-                            restaurant_with_coords = restaurant.copy()
-                            restaurant_with_coords["lat"] = lat
-                            restaurant_with_coords["lng"] = lng
-                            valid_restaurants.append(restaurant_with_coords)
-                            logger.info(
-                                f"유효한 좌표: {restaurant.get('name')} - lat={lat}, lng={lng}"
-                            )
-                        else:
-                            logger.warning(
-                                f"유효하지 않은 좌표: {restaurant.get('name', '이름 없음')} - lat={lat}, lng={lng}"
-                            )
-                            # 기본 좌표 할당
-                            base_lat, base_lng = 37.5665, 126.9780
-                            idx = restaurant.get("id", 1)
-                            lat = base_lat + (idx * 0.001)
-                            lng = base_lng + (idx * 0.001)
-                            restaurant_with_coords = restaurant.copy()
-                            restaurant_with_coords["lat"] = lat
-                            restaurant_with_coords["lng"] = lng
-                            valid_restaurants.append(restaurant_with_coords)
-                            logger.info(
-                                f"기본 좌표 할당: {restaurant.get('name')} - lat={lat}, lng={lng}"
-                            )
-                except (ValueError, TypeError) as e:
-                    logger.warning(
-                        f"좌표 변환 오류: {str(e)}, 식당: {restaurant.get('name', '이름 없음')}"
-                    )
-                    # 오류 발생 시 기본 좌표 할당
-                    base_lat, base_lng = 37.5665, 126.9780
-                    idx = restaurant.get("id", 1)
-                    restaurant_with_coords = restaurant.copy()
-                    restaurant_with_coords["lat"] = base_lat + (idx * 0.001)
-                    restaurant_with_coords["lng"] = base_lng + (idx * 0.001)
-                    valid_restaurants.append(restaurant_with_coords)
-                    logger.info(
-                        f"오류 후 기본 좌표 할당: {restaurant.get('name')} - lat={base_lat + (idx * 0.001)}, lng={base_lng + (idx * 0.001)}"
-                    )
-
-            # 식당이 있는 경우 항상 지도 생성 (유효한 좌표가 없어도 기본 좌표로 표시)
-            if st.session_state.restaurants:
-                # 하이라이트된 식당 ID 가져오기
-                highlighted_id = st.session_state.get("highlighted_restaurant")
-                logger.info(f"하이라이트된 식당 ID: {highlighted_id}")
-
-                # 중심 좌표 계산
-                center = None
-                if highlighted_id:
-                    for r in valid_restaurants:
-                        if r.get("id") == highlighted_id:
-                            try:
-                                center = [
-                                    float(r.get("lat")),
-                                    float(r.get("lng")),
-                                ]
-                                logger.info(f"하이라이트된 식당 중심 좌표: {center}")
-                                break
-                            except (ValueError, TypeError):
-                                pass
-
-                if not center and valid_restaurants:
-                    try:
-                        center_lat = float(valid_restaurants[0].get("lat", 37.5665))
-                        center_lng = float(valid_restaurants[0].get("lng", 126.9780))
-                        center = [center_lat, center_lng]
-                        logger.info(f"첫 번째 식당 중심 좌표: {center}")
-                    except (ValueError, TypeError):
-                        center = [37.5665, 126.9780]  # 기본값: 서울
-                        logger.info(f"기본 중심 좌표 사용: {center}")
-                else:
-                    # center가 설정되지 않았을 경우 기본값 설정
-                    if not center:
-                        center = [37.5665, 126.9780]  # 기본값: 서울
-                        logger.info(f"기본 중심 좌표 사용: {center}")
-
-                # 지도 생성 및 표시
-                st.info(f"총 {len(valid_restaurants)}개의 식당을 지도에 표시합니다.")
-                logger.info(f"지도에 표시할 식당 수: {len(valid_restaurants)}")
-                m = create_restaurant_map(
-                    valid_restaurants,
-                    center=center,
-                    highlighted_id=highlighted_id,
-                    use_clustering=True,
-                )
-                # 반환 객체를 빈 리스트로 설정하여 지도 크기 유지
-                st_folium(
-                    m,
-                    width="100%",
-                    height=MAP_HEIGHT,
-                    returned_objects=[],
-                    key="folium_map_main",
-                )
-                st.caption(
-                    f"총 {len(valid_restaurants)}개의 식당이 지도에 표시되었습니다."
-                )
-            else:
-                st.warning("표시할 식당 정보가 없습니다.")
-                logger.warning("유효한 식당 정보가 없어 빈 지도 표시")
-                # 빈 지도 표시 (서울 중심)
-                empty_map = create_restaurant_map([], center=[37.5665, 126.9780])
-                # 반환 객체를 빈 리스트로 설정하여 지도 크기 유지
-                st_folium(
-                    empty_map,
-                    width="100%",
-                    height=MAP_HEIGHT,
-                    returned_objects=[],
-                    key="folium_map_empty",
-                )
+        elif "restaurants" in st.session_state and st.session_state.restaurants:
+            restaurants = st.session_state.restaurants
+            # 하이라이트된 식당 ID 가져오기
+            highlighted_id = st.session_state.get("highlighted_restaurant")
+
+            # 중심 좌표 (하이라이트된 식당으로의 이동은 지도 컴포넌트가 처리)
+            center = [restaurants[0].lat, restaurants[0].lng]
+
+            # 지도 생성 및 표시
+            st.info(f"총 {len(restaurants)}개의 식당을 지도에 표시합니다.")
+            show_restaurant_map(restaurants, center=center, highlighted_id=highlighted_id)
+            st.caption(f"총 {len(restaurants)}개의 식당이 지도에 표시되었습니다.")
         else:
             st.text("검색 결과가 지도에 표시됩니다.")
-            logger.info("식당 정보 없음, 빈 지도 표시")
             # 빈 지도 표시 (서울 중심)
-            empty_map = create_restaurant_map([], center=[37.5665, 126.9780])
-            # 반환 객체를 빈 리스트로 설정하여 지도 크기 유지
-            st_folium(
-                empty_map,
-                width="100%",
-                height=MAP_HEIGHT,
-                returned_objects=[],
-                key="folium_map_initial",
-            )
+            show_restaurant_map([], center=[BASE_LAT, BASE_LNG])
+
+    # 지도 이동 시 보이는 영역의 맛집 표시
+    if map_mode == "검색 결과" and st.session_state.get("map_bounds"):
+        show_restaurants_in_view(st.session_state.map_bounds)
 
     # 식당 목록 표시 (접을 수 있는 섹션)
     if "restaurants" in st.session_state and st.session_state.restaurants:
@@ -528,27 +277,12 @@ with left_col:
             for i, restaurant in enumerate(st.session_state.restaurants, 1):
                 # 식당 정보 컨테이너
                 with st.container():
-                    col1, col2 = st.columns([3, 1])
-
-                    with col1:
-                        st.markdown(f"**{i}. {restaurant.get('name', '이름 없음')}**")
-                        st.markdown(
-                            f"📍 주소: {restaurant.get('address', '주소 없음')}"
-                        )
-                        st.markdown(
-                            f"🚇 지하철: {restaurant.get('subway', '정보 없음')}"
-                        )
-                        st.markdown(f"🍽️ 메뉴: {restaurant.get('menu', '정보 없음')}")
-                        st.markdown(f"⭐ 리뷰: {restaurant.get('review', '정보 없음')}")
-                        st.markdown(
-                            f"🎬 유튜브 영상: {restaurant.get('video_url', '정보 없음')}"
-                        )
-
-                    with col2:
-                        # 지도에서 보기 버튼
-                        if st.button("🗺️ 지도에서 보기", key=f"map_{i}"):
-                            highlight_restaurant(i)
-                            st.rerun()
+                    st.markdown(f"**{i}. {restaurant.name}**")
+                    st.markdown(f"📍 주소: {restaurant.address}")
+                    st.markdown(f"🚇 지하철: {restaurant.subway}")
+                    st.markdown(f"🍽️ 메뉴: {restaurant.menu}")
+                    st.markdown(f"⭐ 리뷰: {restaurant.review}")
+                    st.markdown(f"🎬 유튜브 영상: {restaurant.video_url}")
 
                 st.divider()
 
@@ -571,6 +305,8 @@ with right_col:
             with st.chat_message("assistant"):
                 st.write("🤔먹을 텐데~\n 식당을 찾고있어요.")
 
+    scroll_chat_to_latest(len(st.session_state.messages))
+
     # 사용자 입력 (컨테이너 외부에 배치)
     prompt = st.chat_input(
         "맛집을 추천해드릴까요? (예: 서울에서 맛있는 한식 맛집 추천해줘)"
@@ -652,16 +388,3 @@ with right_col:
 
             # 에러 표시를 위한 페이지 리로드
             st.rerun()
-
-# URL 파라미터 처리
-query_params = st.query_params
-if "restaurant_id" in query_params:
-    restaurant_id = query_params["restaurant_id"]
-    try:
-        # 문자열을 정수로 변환
-        restaurant_id = int(restaurant_id)
-        # 세션 상태에 하이라이트할 식당 ID 저장
-        st.session_state.highlighted_restaurant = restaurant_id
-        logger.info(f"URL 파라미터에서 식당 ID 로드: {restaurant_id}")
-    except (ValueError, TypeError) as e:
-        logger.error(f"식당 ID 파라미터 처리 오류: {str(e)}")
@@ -1,13 +1,33 @@
+import hashlib
 import os
 import time
-from pathlib import Path
-from tempfile import TemporaryDirectory
-import shutil  # 파일 복사를 위한 라이브러리 추가
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import google.generativeai as genai
 import streamlit as st
+from agent.config import get_logger
+from audio_utils import (
+    AUDIO_PREPROCESS,
+    WHISPER_CHUNKS,
+    get_audio_url,
+    get_peak_rss_mb,
+    hash_upload,
+    preprocess_audio,
+    remap_segments,
+    split_audio,
+    stitch_segments,
+    store_upload,
+)
 from dotenv import load_dotenv
-from utils import check_runpod_status
+from file_sweeper import start_background_sweeper
+from job_queue import TranscriptionQueue
+from utils import (
+    check_runpod_status,
+    db,
+    init_transcript_cache,
+    load_cached_transcript,
+    save_cached_transcript,
+)
 
 # 페이지 네비게이션 숨기기
 hide_pages = """
@@ -22,15 +42,22 @@ st.markdown(hide_pages, unsafe_allow_html=True)
 
 load_dotenv()
 
+logger = get_logger()
+
 # RunPod 정보
 RUNPOD_ENDPOINT_ID = os.getenv("RUNPOD_ENDPOINT_ID_WHISPER")  # Whisper 엔드포인트 ID
-
-
-# 전역 처리 상태 관리를 위한 세션 상태 초기화
-if "processing" not in st.session_state:
-    st.session_state.processing = False
-if "process_id" not in st.session_state:
-    st.session_state.process_id = None
+WHISPER_MODEL = "large-v3"  # RunPod에서 사용할 모델 크기
+# 이 글자 수를 넘는 녹취록은 구간별로 요약한 뒤 합침 (map-reduce)
+MINUTES_CHUNK_CHARS = int(os.getenv("MINUTES_CHUNK_CHARS", 12000))
+# 구간 요약을 동시에 요청할 최대 개수
+MINUTES_MAX_WORKERS = int(os.getenv("MINUTES_MAX_WORKERS", 4))
+# Whisper 엔드포인트에 동시에 보낼 수 있는 변환 작업 수
+WHISPER_MAX_CONCURRENCY = int(os.getenv("WHISPER_MAX_CONCURRENCY", 1))
+# "postgres"로 설정하면 여러 프로세스(컨테이너) 사이에서도 동시 실행 수를 제한
+TRANSCRIPTION_QUEUE_BACKEND = os.getenv("TRANSCRIPTION_QUEUE_BACKEND", "local")
+
+
+# 세션 상태 초기화
 if "full_text" not in st.session_state:
     st.session_state.full_text = ""
 if "pure_text" not in st.session_state:
@@ -44,6 +71,11 @@ if "transcription_done" not in st.session_state:
 if "generate_minutes" not in st.session_state:
     st.session_state.generate_minutes = False
 
+if "minutes_metrics" not in st.session_state:
+    st.session_state.minutes_metrics = None
+if "minutes_partials" not in st.session_state:
+    st.session_state.minutes_partials = {}
+
 
 # Gemini AI 모델 초기화 함수
 @st.cache_resource
@@ -54,29 +86,390 @@ def load_gemini_model(api_key):
     return model
 
 
-# 회의록 생성 함수
-def generate_meeting_minutes(text, model):
-    """Gemini AI를 사용하여 회의록을 생성하는 함수"""
-    prompt = f"""
-    다음은 회의 녹취록입니다. 이 내용을 바탕으로 전문적인 회의록을 작성해주세요.
-    회의록에는 다음 내용이 포함되어야 합니다:
+# 모든 사용자 세션이 공유하는 음성 변환 대기열
+@st.cache_resource
+def get_transcription_queue():
+    engine = db._engine if TRANSCRIPTION_QUEUE_BACKEND == "postgres" else None
+    return TranscriptionQueue(WHISPER_MAX_CONCURRENCY, engine=engine)
+
+
+transcription_queue = get_transcription_queue()
+
+
+def wait_for_turn(ticket, placeholder):
+    """대기열 차례가 될 때까지 대기 순서와 예상 대기 시간을 표시"""
+    while not transcription_queue.try_start(ticket):
+        position = transcription_queue.position(ticket)
+        eta = transcription_queue.eta(ticket)
+        placeholder.info(
+            f"⏳ 대기 중입니다. 앞에 {position}개 작업 · 예상 대기 시간 약 {eta:.0f}초"
+        )
+        time.sleep(1)
+    placeholder.empty()
+
+
+@st.cache_resource
+def ensure_transcript_cache_table():
+    return init_transcript_cache()
+
+
+ensure_transcript_cache_table()
+
+
+# 오류, st.stop(), 탭 종료 등으로 남은 정적 오디오 파일을 주기적으로 정리 (프로세스당 1개)
+@st.cache_resource
+def ensure_file_sweeper():
+    return start_background_sweeper()
+
+
+ensure_file_sweeper()
+
+
+def set_transcription_result(segments_list):
+    """변환 결과를 세션 상태에 반영하고 전체 텍스트를 반환"""
+    st.session_state.segments_list = segments_list
+
+    # 전체 텍스트 구성
+    full_text = ""
+    for segment in segments_list:
+        full_text += f"{segment['start']}s - {segment['end']}s: {segment['text']}\n"
+    st.session_state.full_text = full_text
+
+    # 회의록 생성용 순수 텍스트 추출
+    pure_text = " ".join([segment["text"] for segment in segments_list])
+    st.session_state.pure_text = pure_text
+
+    # 변환 완료 상태 설정
+    st.session_state.transcription_done = True
+    return full_text
+
+
+def build_whisper_payload(audio_url):
+    """URL 방식으로 RunPod Whisper API 요청 페이로드 구성"""
+    return {
+        "input": {
+            "params": {
+                "audio_url": audio_url,  # 로컬 파일 URL 전달
+                "model": WHISPER_MODEL,
+                "batch_size": 32,
+                "language": language,
+            },
+        }
+    }
+
+
+def run_whisper_jobs(chunks):
+    """
+    청크별 Whisper 작업을 병렬로 실행하고 결과를 하나의 세그먼트 목록으로 합침
+    :param chunks: [(청크 파일 경로, 청크 시작 시각)]
+    :return: (RunPod 응답 형식의 결과, 청크별 처리 시간 리스트)
+    """
+
+    def transcribe_chunk(chunk):
+        chunk_path, offset = chunk
+        chunk_start = time.time()
+        result = check_runpod_status(
+            build_whisper_payload(get_audio_url(chunk_path)), RUNPOD_ENDPOINT_ID
+        )
+        return offset, result, time.time() - chunk_start
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        results = list(executor.map(transcribe_chunk, chunks))
+
+    chunk_times = [elapsed for _, _, elapsed in results]
+    if len(results) == 1:
+        return results[0][1], chunk_times
+
+    # 실패한 청크가 있으면 해당 응답을 그대로 반환하여 오류 표시
+    for _, result, _ in results:
+        if not result or "output" not in result:
+            return result, chunk_times
+    segments = stitch_segments(
+        [(offset, result["output"].get("segments", [])) for offset, result, _ in results]
+    )
+    return {"output": {"segments": segments}}, chunk_times
+
+
+def transcribe_uploaded_file(uploaded_file, ticket):
+    """
+    업로드된 파일을 정적 디렉토리에 저장한 뒤 RunPod Whisper로 텍스트 변환
+    :param ticket: 대기열 티켓 (청크 병렬 변환 시 청크마다 대기열 슬롯을 추가로 확보)
+    """
+    with st.status("음성 변환 중...", expanded=True) as status:
+        # 텍스트 추출 시작
+        start_time = time.time()
+        try:
+            # 로컬 정적 디렉토리에 파일 저장 (내용 해시 기반 경로, 이미 있으면 재사용)
+            st.write("파일 저장 중...")
+            static_file_path = store_upload(uploaded_file, st.session_state.file_hash)
+
+            # 파일 경로 저장
+            st.session_state.local_file_path = str(static_file_path)
+
+            st.write("파일 저장 완료")
+            logger.info(
+                f"업로드 파일 저장: {uploaded_file.size / 1024 / 1024:.1f}MB, "
+                f"업로드 후 제출까지 {time.time() - st.session_state.upload_seen_at:.2f}초, "
+                f"최대 메모리 {get_peak_rss_mb():.0f}MB"
+            )
+
+            # 16kHz 모노 변환 및 무음 제거 (실패 시 원본 그대로 전송)
+            audio_path = static_file_path
+            time_map = None
+            if AUDIO_PREPROCESS != "off":
+                st.write("오디오 전처리 중 (16kHz 모노 변환, 무음 구간 제거)...")
+                try:
+                    audio_path, time_map = preprocess_audio(static_file_path)
+                    st.session_state.processed_file_path = str(audio_path)
+                except Exception as e:
+                    logger.warning(f"오디오 전처리 실패, 원본 파일 사용: {str(e)}")
+                    audio_path = static_file_path
+            original_bytes = static_file_path.stat().st_size
+            upload_bytes = audio_path.stat().st_size
+            st.write(
+                f"전송 크기: {original_bytes / 1024 / 1024:.1f}MB → {upload_bytes / 1024 / 1024:.1f}MB"
+            )
+
+            st.write(get_audio_url(audio_path))
+
+            # 긴 녹음은 무음 지점에서 나눠 병렬로 변환
+            # 청크마다 RunPod 작업이 하나씩 생기므로 대기열에서 확보한 슬롯 수만큼만 분할
+            chunks = [(audio_path, 0.0)]
+            if WHISPER_CHUNKS > 1:
+                num_chunks = 1 + transcription_queue.try_reserve_extra(
+                    ticket, WHISPER_CHUNKS - 1
+                )
+                if num_chunks > 1:
+                    try:
+                        chunks = split_audio(audio_path, num_chunks)
+                    except Exception as e:
+                        logger.warning(f"오디오 분할 실패, 단일 작업으로 변환: {str(e)}")
+            chunk_paths = [path for path, _ in chunks if path != audio_path]
+
+            # RunPod API 호출
+            st.write(
+                f"백엔드 API 처리 중... ({len(chunks)}개 작업)"
+                if len(chunks) > 1
+                else "백엔드 API 처리 중..."
+            )
+            try:
+                transcribe_start = time.time()
+                result, chunk_times = run_whisper_jobs(chunks)
+                transcribe_time = time.time() - transcribe_start
+                logger.info(
+                    f"Whisper 변환 시간 {transcribe_time:.1f}초, "
+                    f"전송 크기 {original_bytes} -> {upload_bytes} bytes "
+                    f"(전처리 {'적용' if time_map else '미적용'})"
+                )
+                if len(chunks) > 1:
+                    logger.info(
+                        f"청크 {len(chunks)}개 병렬 변환: 청크별 {[round(t, 1) for t in chunk_times]}초, "
+                        f"병렬도(청크 처리 시간 합 / 경과 시간) {sum(chunk_times) / transcribe_time:.2f}"
+                    )
+                if result and "output" in result:
+                    status.update(label="처리 완료", state="complete")
+                    output = result["output"]
+
+                    # 결과 처리 (무음 제거로 당겨진 시간을 원본 기준으로 복원)
+                    segments_list = output.get("segments", [])
+                    if time_map:
+                        segments_list = remap_segments(segments_list, time_map)
+                    full_text = set_transcription_result(segments_list)
+                    save_cached_transcript(
+                        st.session_state.file_hash,
+                        language,
+                        WHISPER_MODEL,
+                        segments_list,
+                        full_text,
+                    )
+                    status.update(label="처리 완료", state="complete")
+
+                    # 업로드/전처리 파일은 내용 해시 경로로 다른 세션과 공유되므로 여기서 삭제하지 않음
+                    # (file_sweeper가 TTL이 지난 파일을 정리)
+                else:
+                    st.error(
+                        "RunPod API에서 유효한 응답을 받지 못했습니다."
+                    )
+                    if result:
+                        st.json(result)
+
+                    # 오류 원인 분석 및 제안
+                    st.error("가능한 오류 원인:")
+                    st.markdown(
+                        """
+                    1. RunPod에서 오디오 URL에 접근할 수 없음
+                    2. 오디오 파일 형식이 지원되지 않음
+                    3. RunPod 서버 오류
+
+                    **해결 방법:**
+                    - 오디오 파일이 올바른 형식인지 확인
+                    - RunPod 서비스 상태 확인
+                    - RunPod가 로컬 URL에 접근할 수 있는지 확인
+                    """
+                    )
+                    status.update(label="API 호출 오류", state="error")
+            except Exception as e:
+                status.update(label="API 호출 오류", state="error")
+                st.error(f"RunPod API 호출 중 오류: {str(e)}")
+            finally:
+                # 분할 청크는 이 작업 전용 파일이므로 성공 여부와 관계없이 삭제
+                for chunk_path in chunk_paths:
+                    try:
+                        os.remove(chunk_path)
+                    except OSError:
+                        pass
+
+        except Exception as e:
+            st.error(f"변환 중 오류 발생: {str(e)}")
+            status.update(label="처리 실패", state="error")
+            st.stop()
+
+        # 처리 시간 계산
+        process_time = time.time() - start_time
+
+        # 결과 표시
+        st.success(f"변환 완료! 처리 시간: {process_time:.2f}초")
+
+        # 페이지 새로고침
+        st.rerun()
+
+
+# 회의록에 포함될 항목
+MINUTES_SECTIONS = """
     1. 회의 주요 주제
     2. 논의된 중요 사항
     3. 결정된 사항
     4. 향후 조치 사항
     5. 요약 및 결론
     6. 주요 용어 및 정의
+"""
+
+
+def chunk_segments(segments, max_chars):
+    """세그먼트 경계를 유지하면서 녹취록을 max_chars 이하의 구간으로 나눔"""
+    chunks = []
+    current = []
+    current_length = 0
+    for segment in segments:
+        line = f"[{segment['start']:.0f}s] {segment['text'].strip()}"
+        if current and current_length + len(line) > max_chars:
+            chunks.append("\n".join(current))
+            current, current_length = [], 0
+        current.append(line)
+        current_length += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def summarize_minutes_chunk(chunk_text, model):
+    """녹취록 일부 구간을 회의록 항목 기준으로 요약 (작업 스레드에서 실행되므로 st 호출 금지)"""
+    prompt = f"""
+    다음은 긴 회의 녹취록의 일부 구간입니다. 이 구간에서 아래 항목에 해당하는 내용을
+    빠짐없이 간결하게 정리해주세요. 해당 내용이 없는 항목은 생략하세요.
+    {MINUTES_SECTIONS}
+    녹취록 구간:
+    {chunk_text}
+    """
+    return model.generate_content(prompt).text
 
+
+def stream_minutes(prompt, model, placeholder, start_time, map_sec=None):
+    """
+    Gemini 응답을 스트리밍으로 받아 placeholder에 토큰이 도착하는 대로 표시
+    :param start_time: 회의록 생성 요청 시각 (첫 응답/전체 시간은 이 시각부터 측정)
+    :param map_sec: map-reduce 모드에서 구간 요약(map)에 걸린 시간
+    """
+    first_token_sec = None
+    minutes = ""
+    for chunk in model.generate_content(prompt, stream=True):
+        if not chunk.parts:
+            continue
+        if first_token_sec is None:
+            first_token_sec = time.time() - start_time
+        minutes += chunk.text
+        placeholder.markdown(minutes + "▌")
+    total_sec = time.time() - start_time
+    placeholder.markdown(minutes)
+
+    st.session_state.minutes_metrics = {
+        "first_token_sec": round(first_token_sec or total_sec, 2),
+        "total_sec": round(total_sec, 2),
+        "map_sec": round(map_sec, 2) if map_sec is not None else None,
+    }
+    logger.info(
+        f"회의록 스트리밍 완료: 첫 토큰 {first_token_sec or total_sec:.2f}초, "
+        f"전체 {total_sec:.2f}초"
+        + (f" (구간 요약 {map_sec:.2f}초 포함)" if map_sec is not None else "")
+        + f", {len(minutes)}자"
+    )
+    return minutes
+
+
+# 회의록 생성 함수
+def generate_meeting_minutes(segments, model, placeholder):
+    """
+    Gemini AI를 사용하여 회의록을 생성하는 함수.
+    녹취록이 길면 구간별로 병렬 요약(map)한 뒤 하나의 회의록으로 합침(reduce).
+    완료된 구간 요약은 세션에 저장되어 재시도 시 다시 요청하지 않음.
+    최종 회의록 생성 단계는 스트리밍으로 placeholder에 바로 표시됨.
+    """
+    start_time = time.time()
+    text = " ".join([segment["text"] for segment in segments])
+    if len(text) <= MINUTES_CHUNK_CHARS:
+        prompt = f"""
+    다음은 회의 녹취록입니다. 이 내용을 바탕으로 전문적인 회의록을 작성해주세요.
+    회의록에는 다음 내용이 포함되어야 합니다:
+    {MINUTES_SECTIONS}
     녹취록:
     {text}
     """
+        return stream_minutes(prompt, model, placeholder, start_time)
+
+    chunks = chunk_segments(segments, MINUTES_CHUNK_CHARS)
+    partials = st.session_state.minutes_partials
+    chunk_keys = [hashlib.sha256(chunk.encode("utf-8")).hexdigest() for chunk in chunks]
+    pending = [
+        (key, chunk) for key, chunk in zip(chunk_keys, chunks) if key not in partials
+    ]
+    logger.info(
+        f"회의록 map-reduce: 구간 {len(chunks)}개 중 {len(chunks) - len(pending)}개 재사용"
+    )
+    if pending:
+        placeholder.info(f"녹취록 구간 {len(pending)}개를 요약하는 중입니다...")
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=MINUTES_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(summarize_minutes_chunk, chunk, model): key
+            for key, chunk in pending
+        }
+        for future in as_completed(futures):
+            try:
+                partials[futures[future]] = future.result()
+            except Exception as e:
+                failed += 1
+                logger.warning(f"회의록 구간 요약 실패: {str(e)}")
+    if failed:
+        raise RuntimeError(
+            f"{len(chunks)}개 구간 중 {failed}개 요약에 실패했습니다. "
+            "다시 시도하면 완료된 구간은 재사용됩니다."
+        )
 
-    try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        st.error(f"Gemini API 호출 중 오류: {str(e)}")
-        return f"회의록 생성 중 오류가 발생했습니다: {str(e)}"
+    joined_partials = "\n\n".join(
+        f"[구간 {i}]\n{partials[key]}" for i, key in enumerate(chunk_keys, 1)
+    )
+    prompt = f"""
+    다음은 긴 회의 녹취록을 시간 순서대로 구간별 요약한 내용입니다.
+    이 내용을 종합하여 하나의 전문적인 회의록을 작성해주세요.
+    중복된 내용은 합치고, 회의록에는 다음 내용이 포함되어야 합니다:
+    {MINUTES_SECTIONS}
+    구간별 요약:
+    {joined_partials}
+    """
+    return stream_minutes(
+        prompt, model, placeholder, start_time, map_sec=time.time() - start_time
+    )
 
 
 # 제목 및 설명
@@ -96,7 +489,6 @@ with st.sidebar:
 
 # 사이드바 설정
 with st.sidebar:
-    model_size = "large-v3"  # RunPod에서 사용할 모델 크기
     language = st.selectbox(
         "언어 선택",
         ["자동감지", "ko", "en", "ja"],
@@ -119,6 +511,13 @@ with st.sidebar:
             "Google Gemini API 키가 설정되지 않았습니다. .env 파일에 GOOGLE_API_KEY를 추가해주세요."
         )
 
+    queue_metrics = transcription_queue.metrics()
+    st.caption(
+        f"변환 대기열: 처리 중 {queue_metrics['running']}/{queue_metrics['max_concurrency']} · "
+        f"대기 {queue_metrics['waiting']} · 평균 대기 {queue_metrics['avg_wait_sec']}초 · "
+        f"평균 처리 {queue_metrics['avg_service_sec']}초"
+    )
+
     # RunPod API 키 확인
     if not RUNPOD_ENDPOINT_ID:
         st.warning(
@@ -147,272 +546,150 @@ uploaded_file = st.file_uploader(
     "음성 파일 업로드 (.mp3, .wav, .m4a, .ogg)", type=["mp3", "wav", "m4a", "ogg"]
 )
 
-# 정적 파일 저장을 위한 디렉토리 설정
-STATIC_DIR = Path("static/audio")
-STATIC_DIR.mkdir(parents=True, exist_ok=True)  # 디렉토리가 없으면 생성
-
-
 # cloudinary_public_id 대신 file_path 저장
 if "local_file_path" not in st.session_state:
     st.session_state.local_file_path = None
 
-# 파일이 업로드되면 세션 상태 초기화
-if uploaded_file is not None and "current_file" not in st.session_state:
-    st.session_state.current_file = uploaded_file.name
+# 새 파일이 업로드되면 세션 상태 초기화 (같은 이름의 다른 파일도 구분하도록 file_id 사용)
+if uploaded_file is not None and st.session_state.get("current_file") != uploaded_file.file_id:
+    # 이전 파일은 같은 내용을 올린 다른 세션이 사용 중일 수 있으므로 삭제하지 않음 (file_sweeper가 정리)
+    st.session_state.current_file = uploaded_file.file_id
+    st.session_state.upload_seen_at = time.time()
+    # 파일 해시는 업로드당 1회만 계산 (memoryview를 읽으므로 파일 복사 없음)
+    st.session_state.file_hash = hash_upload(uploaded_file)
     st.session_state.transcription_done = False
     st.session_state.meeting_minutes = ""
+    st.session_state.minutes_metrics = None
+    st.session_state.minutes_partials = {}
     st.session_state.local_file_path = None  # 로컬 파일 경로 저장용
-elif (
-    uploaded_file is not None
-    and st.session_state.get("current_file") != uploaded_file.name
-):
-    # 새 파일이 업로드되면 상태 초기화
-    # 이전 파일이 있으면 삭제
-    if st.session_state.get("local_file_path") and os.path.exists(st.session_state.local_file_path):
-        try:
-            os.remove(st.session_state.local_file_path)
-            st.session_state.local_file_path = None
-        except Exception as e:
-            st.warning(f"이전 파일 삭제 중 오류 발생: {str(e)}")
-
-    st.session_state.current_file = uploaded_file.name
-    st.session_state.transcription_done = False
-    st.session_state.meeting_minutes = ""
-
-# 다른 사용자가 처리 중인지 확인
-if st.session_state.processing and st.session_state.process_id != id(st.session_state):
-    st.warning(
-        "⚠️ 현재 다른 사용자가 음성 변환을 처리 중입니다. 잠시 후 다시 시도해주세요."
-    )
+    # 같은 파일을 다시 올려도 저장된 변환 결과를 다시 조회하도록 초기화
+    st.session_state.transcript_cache_checked = None
 
 if uploaded_file is not None:
-    # 임시 디렉토리 생성 및 파일 저장
-    with TemporaryDirectory() as temp_dir:
-        temp_file_path = Path(temp_dir) / uploaded_file.name
-        temp_file_path.write_bytes(uploaded_file.getvalue())
-
-        # 변환 시작 버튼 추가
-        if not st.session_state.transcription_done:
-            if st.button("음성 변환 시작") and not (
-                st.session_state.processing
-                and st.session_state.process_id != id(st.session_state)
-            ):
-                # 처리 상태 설정
-                st.session_state.processing = True
-                st.session_state.process_id = id(st.session_state)
-
-                with st.status("음성 변환 중...", expanded=True) as status:
-                    # 텍스트 추출 시작
-                    start_time = time.time()
-                    try:
-                        # 로컬 정적 디렉토리에 파일 저장
-                        st.write("파일 저장 중...")
-                        # 고유한 파일 이름 생성 (시간 스탬프 추가)
-                        timestamp = int(time.time())
-                        ext = Path(temp_file_path).suffix
-                        static_filename = f"{timestamp}{ext}"
-
-                        # 현재 스크립트 위치를 기준으로 절대 경로 생성
-                        current_script_dir = Path(__file__).parent.absolute()
-                        app_root = current_script_dir.parent  # hub_app 디렉토리
-                        static_file_path = app_root / "static" / "audio" / static_filename
-
-                        # 정적 디렉토리 생성
-                        static_dir = app_root / "static" / "audio"
-                        static_dir.mkdir(parents=True, exist_ok=True)
-
-                        # 임시 파일을 정적 디렉토리로 복사
-                        shutil.copy(temp_file_path, static_file_path)
-
-                        # 권한 부여                        
-                        os.chmod(static_file_path, 0o644)
-
-                        
-                        # 파일 경로 저장
-                        st.session_state.local_file_path = str(static_file_path)
-                        
-                        # 파일 URL 생성 - 단순화된 버전
-                        audio_url = f"https://grapeman.duckdns.org/static/audio/{static_filename}"
-                        st.write("파일 저장 완료")
-                        st.write(audio_url)
-
-                        # URL 방식으로 RunPod API 요청 페이로드 구성
-                        payload = {
-                            "input": {
-                                "params": {
-                                    "audio_url": audio_url,  # 로컬 파일 URL 전달
-                                    "model": "large-v3",
-                                    "batch_size": 32,
-                                    "language": language,
-                                },
-                            }
+    # 같은 파일(내용 해시)과 언어의 변환 결과가 있으면 파일 저장 없이 바로 표시
+    cache_key = (st.session_state.file_hash, language)
+    if (
+        not st.session_state.transcription_done
+        and st.session_state.get("transcript_cache_checked") != cache_key
+    ):
+        st.session_state.transcript_cache_checked = cache_key
+        cached = load_cached_transcript(
+            st.session_state.file_hash, language, WHISPER_MODEL
+        )
+        if cached:
+            logger.info(f"음성 변환 캐시 적중: {st.session_state.file_hash[:12]}")
+            set_transcription_result(cached["segments"])
+            st.success("이전에 변환한 파일입니다. 저장된 결과를 불러왔습니다.")
+
+    # 변환 시작 버튼 추가
+    if not st.session_state.transcription_done:
+        if st.button("음성 변환 시작"):
+            # 대기열 등록 후 차례가 될 때까지 대기
+            ticket = transcription_queue.enqueue()
+            try:
+                wait_for_turn(ticket, st.empty())
+                logger.info(f"음성 변환 시작: 대기열 {transcription_queue.metrics()}")
+                transcribe_uploaded_file(uploaded_file, ticket)
+            finally:
+                # 완료, 오류, 페이지 이탈(st.stop/rerun 포함) 시 슬롯 반환
+                transcription_queue.finish(ticket)
+                logger.info(f"음성 변환 종료: 대기열 {transcription_queue.metrics()}")
+
+    # 변환이 완료된 경우 결과 표시
+    if st.session_state.transcription_done:
+        st.subheader("결과")
+        # 텍스트 다운로드 버튼
+        st.download_button(
+            label="텍스트 파일 다운로드",
+            data=st.session_state.full_text,
+            file_name=f"{os.path.splitext(uploaded_file.name)[0]}_transcript.txt",
+            mime="text/plain",
+        )
+
+        # 세그먼트별 텍스트 표시 - 컨테이너로 감싸기
+        with st.container():
+            st.subheader("시간별 텍스트")
+
+            # 접을 수 있는 expander로 추가 옵션 제공 (선택사항)
+            with st.expander("시간별 텍스트 보기", expanded=False):
+                # 세그먼트 데이터를 표 형식으로 표시
+                segment_data = []
+                for i, segment in enumerate(st.session_state.segments_list):
+                    segment_data.append(
+                        {
+                            "번호": i + 1,
+                            "시작 시간": f"{segment['start']:.2f}s",
+                            "종료 시간": f"{segment['end']:.2f}s",
+                            "텍스트": segment["text"],
                         }
+                    )
 
-                        # RunPod API 호출
-                        st.write("백엔드 API 처리 중...")
-                        try:
-                            result = check_runpod_status(payload, RUNPOD_ENDPOINT_ID)
-                            if result and "output" in result:
-                                status.update(label="처리 완료", state="complete")
-                                output = result["output"]
-
-                                # 결과 처리
-                                segments_list = output.get("segments", [])
-                                st.session_state.segments_list = segments_list
-
-                                # 전체 텍스트 구성
-                                full_text = ""
-                                for segment in segments_list:
-                                    full_text += f"{segment['start']}s - {segment['end']}s: {segment['text']}\n"
-                                st.session_state.full_text = full_text
-
-                                # 회의록 생성용 순수 텍스트 추출
-                                pure_text = " ".join(
-                                    [segment["text"] for segment in segments_list]
-                                )
-                                st.session_state.pure_text = pure_text
-
-                                # 변환 완료 상태 설정
-                                st.session_state.transcription_done = True
-                                status.update(label="처리 완료", state="complete")
-                                
-                                # 파일 처리 완료 후 정적 디렉토리에 저장된 파일 삭제
-                                if st.session_state.transcription_done and st.session_state.get("local_file_path"):
-                                    try:
-                                        os.remove(st.session_state.local_file_path)
-                                        st.session_state.local_file_path = None
-                                        # st.write("임시 파일이 삭제되었습니다.")
-                                    except Exception as e:
-                                        # st.warning(f"임시 파일 삭제 중 오류 발생: {str(e)}")
-                                        pass
-                            else:
-                                st.error(
-                                    "RunPod API에서 유효한 응답을 받지 못했습니다."
-                                )
-                                if result:
-                                    st.json(result)
-
-                                # 오류 원인 분석 및 제안
-                                st.error("가능한 오류 원인:")
-                                st.markdown(
-                                    """
-                                1. RunPod에서 오디오 URL에 접근할 수 없음
-                                2. 오디오 파일 형식이 지원되지 않음
-                                3. RunPod 서버 오류
-                                
-                                **해결 방법:**
-                                - 오디오 파일이 올바른 형식인지 확인
-                                - RunPod 서비스 상태 확인
-                                - RunPod가 로컬 URL에 접근할 수 있는지 확인
-                                """
-                                )
-                                status.update(label="API 호출 오류", state="error")
-                        except Exception as e:
-                            status.update(label="API 호출 오류", state="error")
-                            st.error(f"RunPod API 호출 중 오류: {str(e)}")
+                st.dataframe(segment_data, use_container_width=True)
 
-                    except Exception as e:
-                        st.error(f"변환 중 오류 발생: {str(e)}")
-                        # 처리 상태 해제
-                        st.session_state.processing = False
-                        status.update(label="처리 실패", state="error")
-                        st.stop()
-
-                    # 처리 시간 계산
-                    process_time = time.time() - start_time
-
-                    # 결과 표시
-                    st.success(f"변환 완료! 처리 시간: {process_time:.2f}초")
-
-                    # 처리 상태 해제
-                    st.session_state.processing = False
-
-                    # 페이지 새로고침
-                    st.rerun()
-
-        # 변환이 완료된 경우 결과 표시
-        if st.session_state.transcription_done:
-            st.subheader("결과")
-            # 텍스트 다운로드 버튼
-            st.download_button(
-                label="텍스트 파일 다운로드",
-                data=st.session_state.full_text,
-                file_name=f"{os.path.splitext(uploaded_file.name)[0]}_transcript.txt",
-                mime="text/plain",
-            )
+        # 구분선 추가로 섹션 분리
+        st.markdown("---")
 
-            # 세그먼트별 텍스트 표시 - 컨테이너로 감싸기
-            with st.container():
-                st.subheader("시간별 텍스트")
-
-                # 접을 수 있는 expander로 추가 옵션 제공 (선택사항)
-                with st.expander("시간별 텍스트 보기", expanded=False):
-                    # 세그먼트 데이터를 표 형식으로 표시
-                    segment_data = []
-                    for i, segment in enumerate(st.session_state.segments_list):
-                        segment_data.append(
-                            {
-                                "번호": i + 1,
-                                "시작 시간": f"{segment['start']:.2f}s",
-                                "종료 시간": f"{segment['end']:.2f}s",
-                                "텍스트": segment["text"],
-                            }
+        # 회의록 생성 버튼 추가
+        with st.container():
+            st.subheader("AI 회의록 생성")
+
+            # 회의록 생성 버튼 (세션 상태를 사용하여 상태 유지)
+            if api_key:
+                if st.button("회의록 생성") or st.session_state.generate_minutes:
+                    if (
+                        not st.session_state.meeting_minutes
+                    ):  # 회의록이 아직 생성되지 않은 경우에만 실행
+                        st.session_state.generate_minutes = True
+                        minutes_placeholder = st.empty()
+                        minutes_placeholder.info("AI가 회의록을 작성 중입니다...")
+                        try:
+                            meeting_minutes = generate_meeting_minutes(
+                                st.session_state.segments_list,
+                                gemini_model,
+                                minutes_placeholder,
+                            )
+                            st.session_state.meeting_minutes = meeting_minutes
+                            st.session_state.generate_minutes = (
+                                False  # 생성 완료 후 상태 업데이트
+                            )
+                            # 스트리밍 미리보기를 지우고 아래에서 최종 회의록과 다운로드 버튼을 표시
+                            minutes_placeholder.empty()
+                        except Exception as e:
+                            minutes_placeholder.empty()
+                            st.error(f"회의록 생성 중 오류 발생: {str(e)}")
+                            st.error(
+                                "상세 오류 정보: " + str(e.__class__.__name__)
+                            )
+                            st.session_state.generate_minutes = False
+            else:
+                st.warning(
+                    "회의록 생성을 위한 Google Gemini API 키가 설정되지 않았습니다. .env 파일을 확인해주세요."
+                )
+
+            # 회의록이 생성되었으면 표시
+            if st.session_state.meeting_minutes:
+                with st.container():
+                    st.markdown("### AI 회의록")
+                    st.markdown(st.session_state.meeting_minutes)
+                    if st.session_state.minutes_metrics:
+                        metrics = st.session_state.minutes_metrics
+                        map_sec = metrics.get("map_sec")
+                        st.caption(
+                            (f"구간 요약 {map_sec}초 · " if map_sec is not None else "")
+                            + f"첫 응답 {metrics['first_token_sec']}초 · "
+                            f"전체 생성 {metrics['total_sec']}초"
                         )
 
-                    st.dataframe(segment_data, use_container_width=True)
-
-            # 구분선 추가로 섹션 분리
-            st.markdown("---")
-
-            # 회의록 생성 버튼 추가
-            with st.container():
-                st.subheader("AI 회의록 생성")
-
-                # 회의록 생성 버튼 (세션 상태를 사용하여 상태 유지)
-                if api_key:
-                    if st.button("회의록 생성") or st.session_state.generate_minutes:
-                        if (
-                            not st.session_state.meeting_minutes
-                        ):  # 회의록이 아직 생성되지 않은 경우에만 실행
-                            st.session_state.generate_minutes = True
-                            with st.spinner("AI가 회의록을 작성 중입니다..."):
-                                try:
-                                    meeting_minutes = generate_meeting_minutes(
-                                        st.session_state.pure_text, gemini_model
-                                    )
-                                    st.session_state.meeting_minutes = meeting_minutes
-                                    st.session_state.generate_minutes = (
-                                        False  # 생성 완료 후 상태 업데이트
-                                    )
-                                    st.success("회의록 생성 완료!")
-                                    st.rerun()  # 페이지 새로고침
-                                except Exception as e:
-                                    st.error(f"회의록 생성 중 오류 발생: {str(e)}")
-                                    st.error(
-                                        "상세 오류 정보: " + str(e.__class__.__name__)
-                                    )
-                                    st.session_state.generate_minutes = False
-                else:
-                    st.warning(
-                        "회의록 생성을 위한 Google Gemini API 키가 설정되지 않았습니다. .env 파일을 확인해주세요."
+                    # 회의록 다운로드 버튼
+                    st.download_button(
+                        label="회의록 다운로드",
+                        data=st.session_state.meeting_minutes,
+                        file_name=f"{os.path.splitext(uploaded_file.name)[0]}_meeting_minutes.txt",
+                        mime="text/plain",
                     )
-
-                # 회의록이 생성되었으면 표시
-                if st.session_state.meeting_minutes:
-                    with st.container():
-                        st.markdown("### AI 회의록")
-                        st.markdown(st.session_state.meeting_minutes)
-
-                        # 회의록 다운로드 버튼
-                        st.download_button(
-                            label="회의록 다운로드",
-                            data=st.session_state.meeting_minutes,
-                            file_name=f"{os.path.splitext(uploaded_file.name)[0]}_meeting_minutes.txt",
-                            mime="text/plain",
-                        )
-        else:
-            st.info(
-                "파일이 업로드되었습니다. '음성 변환 시작' 버튼을 클릭하여 변환을 시작하세요."
-            )
+    else:
+        st.info(
+            "파일이 업로드되었습니다. '음성 변환 시작' 버튼을 클릭하여 변환을 시작하세요."
+        )
 else:
     st.info("위에서 음성 파일을 업로드해주세요.")
@@ -1,14 +1,25 @@
+import csv
+import io
+import json
 import os
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import streamlit as st
 from agent.config import get_logger
 from dotenv import load_dotenv
+from transcript_index import TranscriptIndex, format_context_hint
 from utils import (
+    chat_answer_cache,
     check_runpod_status,
+    DOWNLOAD_MIME_TYPES,
     create_downloadable_file,
+    expand_video_urls,
+    fetch_script_summary,
+    get_chat_cache_key,
     get_current_time,
+    get_session_content_hash,
     get_video_id,
     send_feedback_email,
 )
@@ -17,6 +28,11 @@ load_dotenv()
 
 logger = get_logger()
 
+# 채팅 질문마다 백엔드에 힌트로 보낼 스크립트 세그먼트 수
+TRANSCRIPT_TOP_K = int(os.getenv("TRANSCRIPT_TOP_K", 5))
+# 일괄 요약 시 동시에 실행할 RunPod 작업 수
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 3))
+
 # 페이지 네비게이션 숨기기
 hide_pages = """
     <style>
@@ -89,6 +105,10 @@ def initialize_session_state():
         st.session_state.session_id = str(uuid.uuid4())
     if "runpod_id" not in st.session_state:
         st.session_state.runpod_id = os.getenv("RUNPOD_ENDPOINT_ID")
+    if "video_start" not in st.session_state:
+        st.session_state.video_start = 0
+    if "transcript_view_rows" not in st.session_state:
+        st.session_state.transcript_view_rows = []
 
 
 def reset_session_state():
@@ -101,20 +121,135 @@ def reset_session_state():
     st.session_state.summary = ""
     st.session_state.transcript = []
     st.session_state.recommendations = []
+    st.session_state.video_start = 0
+    st.session_state.transcript_view_rows = []
     st.session_state.session_id = str(uuid.uuid4())  # 새로운 세션 ID 생성
 
 
 initialize_session_state()
 
 
-def process_chat_response(prompt, url_id, message_placeholder):
-    """AI 응답을 스트리밍 방식으로 처리"""
+def format_timestamp(seconds):
+    """초 단위 시간을 H:MM:SS 형식으로 변환"""
+    seconds = int(float(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_transcript_table(video_id, _transcript):
+    """스크립트 세그먼트를 컬럼 단위 표로 변환 (영상별 1회만 생성)"""
+    table = {
+        "시작": [format_timestamp(item["start"]) for item in _transcript],
+        "종료": [format_timestamp(item["end"]) for item in _transcript],
+        "내용": [item["text"] for item in _transcript],
+        "start_sec": [float(item["start"]) for item in _transcript],
+    }
+    text_bytes = sum(len(text.encode("utf-8")) for text in table["내용"])
+    logger.info(
+        f"스크립트 표 생성: {video_id}, 세그먼트 {len(_transcript)}개 "
+        f"(기존 st.write {len(_transcript)}개 요소 -> dataframe 1개, 텍스트 {text_bytes} bytes)"
+    )
+    return table
+
+
+def filter_transcript_rows(table, query):
+    """검색어가 포함된 세그먼트의 행 번호 목록 반환"""
+    if not query:
+        return list(range(len(table["내용"])))
+    query = query.strip().lower()
+    return [i for i, text in enumerate(table["내용"]) if query in text.lower()]
+
+
+def jump_to_selected_segment():
+    """스크립트 표에서 선택한 세그먼트의 시작 시간으로 영상 이동"""
+    selection = st.session_state.transcript_table.selection
+    if not selection.rows:
+        return
+    row = st.session_state.transcript_view_rows[selection.rows[0]]
+    table = build_transcript_table(
+        st.session_state.video_id, st.session_state.transcript
+    )
+    st.session_state.video_start = int(table["start_sec"][row])
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_transcript_index(video_id, _transcript):
+    """영상별 스크립트 BM25 색인 (영상당 1회 생성, 모든 세션이 공유)"""
+    logger.info(f"스크립트 색인 생성: {video_id}, 세그먼트 {len(_transcript)}개")
+    return TranscriptIndex(_transcript)
+
+
+def search_transcript(question):
+    """질문과 관련된 스크립트 세그먼트 검색"""
+    if not st.session_state.transcript:
+        return []
+    index = get_transcript_index(
+        st.session_state.video_id, st.session_state.transcript
+    )
+    return index.search(question, top_k=TRANSCRIPT_TOP_K)
+
+
+def set_video_start(start):
+    st.session_state.video_start = int(start)
+
+
+def render_context_segments(segments, key_prefix):
+    """답변 근거 세그먼트를 클릭 가능한 타임스탬프로 표시"""
+    if not segments:
+        return
+    st.caption("관련 구간(click):")
+    cols = st.columns(len(segments))
+    for i, (col, segment) in enumerate(zip(cols, segments)):
+        with col:
+            st.button(
+                f"▶ {format_timestamp(segment['start'])}",
+                key=f"{key_prefix}_{i}",
+                help=segment["text"],
+                on_click=set_video_start,
+                args=(segment["start"],),
+            )
+
+
+def replay_cached_answer(answer, message_placeholder):
+    """캐시된 답변을 스트리밍과 같은 형태로 즉시 재생"""
+    words = answer.split(" ")
+    step = max(1, len(words) // 20)
+    for i in range(step, len(words), step):
+        message_placeholder.write(f"{' '.join(words[:i])}▌")
+        time.sleep(0.01)
+    return answer
+
+
+def process_chat_response(
+    prompt, url_id, message_placeholder, context_segments=None, use_cache=False
+):
+    """
+    AI 응답을 스트리밍 방식으로 처리
+    :param use_cache: 추천 질문처럼 대화 맥락과 무관한 질문만 True
+        (백엔드가 x-session-id별로 대화 이력을 유지하므로 후속 질문은 세션마다 답이 다름)
+    """
+    cache_key = get_chat_cache_key(
+        url_id, st.session_state.get("model_selection"), prompt
+    )
+    cached_answer = chat_answer_cache.get(cache_key) if use_cache else None
+    if cached_answer:
+        logger.info(
+            f"채팅 답변 캐시 적중 (오늘 절약된 RunPod 호출: {chat_answer_cache.hits_today()}회)"
+        )
+        return replay_cached_answer(cached_answer, message_placeholder)
+
     bot_message = ""
+    params = {"prompt": prompt, "url_id": url_id}
+    if context_segments:
+        # 로컬 색인으로 찾은 구간을 힌트로 전달하여 백엔드 검색 범위를 줄임
+        params["context_hint"] = format_context_hint(context_segments)
     payload = {
         "input": {
             "endpoint": "rag_stream_chat",
             "headers": {"x-session-id": st.session_state.session_id},
-            "params": {"prompt": prompt, "url_id": url_id},
+            "params": params,
         }
     }
 
@@ -129,6 +264,8 @@ def process_chat_response(prompt, url_id, message_placeholder):
                 message_placeholder.write(f"{bot_message}▌")
                 time.sleep(0.05)
 
+        if bot_message and use_cache:
+            chat_answer_cache.set(cache_key, bot_message)
         return bot_message
     except Exception as e:
         st.error(f"Error processing chat response: {str(e)}")
@@ -148,15 +285,23 @@ def handle_question(question):
     # 봇 응답 생성
     with st.chat_message("assistant"):
         message_placeholder = st.empty()
+        context_segments = search_transcript(question)
         bot_message = process_chat_response(
-            question, st.session_state.video_id, message_placeholder
+            question, st.session_state.video_id, message_placeholder, context_segments
         )
 
         if bot_message:
             final_message = f"{bot_message} ({current_time})"
             message_placeholder.write(final_message)
             st.session_state.messages.append(
-                {"role": "assistant", "content": final_message}
+                {
+                    "role": "assistant",
+                    "content": final_message,
+                    "segments": context_segments,
+                }
+            )
+            render_context_segments(
+                context_segments, f"seg_{len(st.session_state.messages) - 1}"
             )
 
 
@@ -211,7 +356,8 @@ if st.session_state.title:  # 타이틀이 존재하는 경우에만 레이아
 
         if st.session_state.video_id:
             st.markdown(
-                f'<iframe width="100%" height="600" src="https://www.youtube.com/embed/{st.session_state.video_id}" '
+                f'<iframe width="100%" height="600" src="https://www.youtube.com/embed/{st.session_state.video_id}'
+                f'?start={st.session_state.video_start}{"&autoplay=1" if st.session_state.video_start else ""}" '
                 f'frameborder="0" allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" '
                 f"allowfullscreen></iframe>",
                 unsafe_allow_html=True,
@@ -219,22 +365,17 @@ if st.session_state.title:  # 타이틀이 존재하는 경우에만 레이아
         if not st.session_state.summary:
             with st.spinner("요약 중입니다..."):
                 # get_script_summary 엔드포인트 호출
-                payload = {
-                    "input": {
-                        "endpoint": "get_script_summary",
-                        "headers": {"x-session-id": st.session_state.session_id},
-                        "params": {"url": url, "url_id": st.session_state.video_id},
-                    }
-                }
-
-                # 상태를 직접 확인하여 작업 완료 시까지 대기
-                summary_response = check_runpod_status(
-                    payload, st.session_state.runpod_id
+                # 채팅할 백엔드 세션을 준비해야 하므로 캐시된 요약을 쓰지 않음 (캐시는 일괄 요약 전용)
+                result, _ = fetch_script_summary(
+                    url,
+                    st.session_state.video_id,
+                    st.session_state.runpod_id,
+                    st.session_state.session_id,
+                    use_cache=False,
                 )
 
-                if summary_response:
-                    result = summary_response.get("output", {})
-                    summary = result.get("summary_result", "없음")
+                if result.get("summary_result"):
+                    summary = list(result["summary_result"])
                     questions = result.get("recommended_questions", "")
                     summary[0] = f"KEY TOPIC : {summary[0]}"
                     st.session_state.summary = summary
@@ -251,11 +392,30 @@ if st.session_state.title:  # 타이틀이 존재하는 경우에만 레이아
             transcript_expander = st.expander("스크립트 보기", expanded=False)
             with transcript_expander:
                 if st.session_state.transcript:
-                    with st.container(height=400):
-                        for item in st.session_state.transcript:
-                            st.write(
-                                f"{item['start']}초 - {item['end']}초: {item['text']}"
-                            )
+                    table = build_transcript_table(
+                        st.session_state.video_id, st.session_state.transcript
+                    )
+                    search_query = st.text_input(
+                        "스크립트 검색", key="transcript_search"
+                    )
+                    rows = filter_transcript_rows(table, search_query)
+                    st.session_state.transcript_view_rows = rows
+                    st.caption(
+                        f"{len(rows)}/{len(table['내용'])}개 구간 · 행을 선택하면 해당 시간으로 이동합니다."
+                    )
+                    # 전체 세그먼트를 하나의 dataframe으로 전송 (브라우저에서 가상 스크롤)
+                    st.dataframe(
+                        {
+                            column: [table[column][i] for i in rows]
+                            for column in ("시작", "종료", "내용")
+                        },
+                        height=400,
+                        use_container_width=True,
+                        hide_index=True,
+                        on_select=jump_to_selected_segment,
+                        selection_mode="single-row",
+                        key="transcript_table",
+                    )
 
     with col2:
         st.subheader("AI 채팅")
@@ -272,10 +432,16 @@ if st.session_state.title:  # 타이틀이 존재하는 경우에만 레이아
                             {
                                 "role": "user",
                                 "content": f"{question} ({get_current_time()})",
+                                "recommended": True,
                             }
                         )
                         st.rerun()
 
+        if chat_answer_cache.hits_today():
+            st.caption(
+                f"⚡ 오늘 캐시된 답변으로 절약한 RunPod 호출: {chat_answer_cache.hits_today()}회"
+            )
+
         # 메시지를 표시할 고정 컨테이너
         messages_container = st.container(height=800)
 
@@ -289,9 +455,10 @@ if st.session_state.title:  # 타이틀이 존재하는 경우에만 레이아
         # 메시지 표시 (채팅 이력)
         with messages_container:
             # 이전 메시지들 표시
-            for message in st.session_state.messages:
+            for idx, message in enumerate(st.session_state.messages):
                 with st.chat_message(message["role"]):
                     st.write(message["content"])
+                    render_context_segments(message.get("segments"), f"seg_{idx}")
 
             # 마지막 사용자 메시지가 있고 아직 답변이 없는 경우 답변 생성
             if (
@@ -304,8 +471,16 @@ if st.session_state.title:  # 타이틀이 존재하는 경우에만 레이아
                     last_question = st.session_state.messages[-1]["content"].split(
                         " ("
                     )[0]
+                    context_segments = search_transcript(last_question)
                     bot_message = process_chat_response(
-                        last_question, st.session_state.video_id, message_placeholder
+                        last_question,
+                        st.session_state.video_id,
+                        message_placeholder,
+                        context_segments,
+                        # 추천 질문은 모든 사용자에게 같으므로 캐시된 답변 사용
+                        use_cache=st.session_state.messages[-1].get(
+                            "recommended", False
+                        ),
                     )
 
                     if bot_message:
@@ -313,7 +488,15 @@ if st.session_state.title:  # 타이틀이 존재하는 경우에만 레이아
                         logger.info(f"bot_message: {final_message}")
                         message_placeholder.write(final_message)
                         st.session_state.messages.append(
-                            {"role": "assistant", "content": final_message}
+                            {
+                                "role": "assistant",
+                                "content": final_message,
+                                "segments": context_segments,
+                            }
+                        )
+                        render_context_segments(
+                            context_segments,
+                            f"seg_{len(st.session_state.messages) - 1}",
                         )
 
         # 새 메시지 처리
@@ -325,12 +508,134 @@ if st.session_state.title:  # 타이틀이 존재하는 경우에만 레이아
         if st.session_state.summary and st.session_state.transcript:
             st.markdown("---")
             st.header("데이터 다운로드")
-            file_buffer = create_downloadable_file(st.session_state)
+            file_format = st.radio(
+                "파일 형식",
+                list(DOWNLOAD_MIME_TYPES),
+                horizontal=True,
+                key="download_format",
+            )
+            content_hash = get_session_content_hash(st.session_state)
+            # 파일은 생성 버튼 클릭 시에만 만들고, 내용이 바뀌면 다시 생성하도록 안내
+            if st.session_state.get("download_hash") != (content_hash, file_format):
+                if st.button("다운로드 파일 생성"):
+                    st.session_state.download_hash = (content_hash, file_format)
+                    st.rerun()
+            else:
+                st.download_button(
+                    label="요약, 스크립트, 채팅 내역 다운로드",
+                    data=create_downloadable_file(
+                        st.session_state, file_format, content_hash
+                    ),
+                    file_name=f"youtube_{st.session_state.video_id}.{file_format}",
+                    mime=DOWNLOAD_MIME_TYPES[file_format],
+                )
+
+
+def summarize_batch_item(video_id, video_url, runpod_id):
+    """일괄 요약 작업 1건 처리 (작업 스레드에서 실행되므로 st 호출 금지)"""
+    start_time = time.time()
+    try:
+        result, cached = fetch_script_summary(
+            video_url, video_id, runpod_id, str(uuid.uuid4())
+        )
+        summary = result.get("summary_result") or []
+        return {
+            "video_id": video_id,
+            "url": video_url,
+            "status": "완료" if summary else "실패",
+            "cached": cached,
+            "key_topic": summary[0] if summary else "",
+            "summary": "\n".join(summary[1:]),
+            "recommended_questions": "\n".join(
+                result.get("recommended_questions") or []
+            ),
+            "language": result.get("language", ""),
+            "elapsed_sec": round(time.time() - start_time, 1),
+        }
+    except Exception as e:
+        return {
+            "video_id": video_id,
+            "url": video_url,
+            "status": f"오류: {e}",
+            "cached": False,
+            "key_topic": "",
+            "summary": "",
+            "recommended_questions": "",
+            "language": "",
+            "elapsed_sec": round(time.time() - start_time, 1),
+        }
+
+
+def batch_results_to_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+with st.expander("📚 여러 영상 일괄 요약", expanded=False):
+    st.write(
+        "재생목록 URL 또는 영상 URL을 한 줄에 하나씩 입력하세요. "
+        f"최대 {BATCH_CONCURRENCY}개 영상을 동시에 요약합니다."
+    )
+    batch_input = st.text_area("URL 목록", key="batch_urls", height=150)
+    batch_rendered = False
+    if st.button("일괄 요약 시작") and batch_input.strip():
+        with st.spinner("영상 목록을 확인 중입니다..."):
+            videos = expand_video_urls(batch_input)
+        if not videos:
+            st.warning("요약할 영상을 찾지 못했습니다. URL 또는 재생목록 주소를 확인해주세요.")
+        else:
+            logger.info(f"일괄 요약 시작: {len(videos)}개 영상")
+
+            rows = []
+            progress = st.progress(0.0)
+            stats_placeholder = st.empty()
+            table_placeholder = st.empty()
+            batch_start = time.time()
+            runpod_id = st.session_state.runpod_id
+            with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as executor:
+                futures = [
+                    executor.submit(summarize_batch_item, video_id, video_url, runpod_id)
+                    for video_id, video_url in videos
+                ]
+                # 완료되는 순서대로 결과 표에 추가
+                for future in as_completed(futures):
+                    rows.append(future.result())
+                    elapsed = time.time() - batch_start
+                    progress.progress(len(rows) / len(videos))
+                    stats_placeholder.caption(
+                        f"{len(rows)}/{len(videos)}개 완료 · 캐시 재사용 {sum(r['cached'] for r in rows)}개 · "
+                        f"처리량 {len(rows) / elapsed * 3600:.0f}개/시간"
+                    )
+                    table_placeholder.dataframe(rows, use_container_width=True)
+
+            throughput = len(rows) / (time.time() - batch_start) * 3600
+            logger.info(
+                f"일괄 요약 완료: {len(rows)}개, 처리량 {throughput:.0f}개/시간"
+            )
+            st.session_state.batch_results = rows
+            batch_rendered = True
+
+    batch_results = st.session_state.get("batch_results")
+    if batch_results:
+        if not batch_rendered:
+            st.dataframe(batch_results, use_container_width=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "CSV 다운로드",
+                data=batch_results_to_csv(batch_results),
+                file_name="youtube_batch_summary.csv",
+                mime="text/csv",
+            )
+        with col2:
             st.download_button(
-                label="요약, 스크립트, 채팅 내역 다운로드",
-                data=file_buffer,
-                file_name="youtube.txt",
-                mime="text/plain",
+                "JSON 다운로드",
+                data=json.dumps(batch_results, ensure_ascii=False, indent=2),
+                file_name="youtube_batch_summary.json",
+                mime="application/json",
             )
 
 
@@ -0,0 +1,200 @@
+# pipeline.py
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 큐 종료 신호
+_STOP = object()
+
+
+class RateLimiter:
+    """
+    호스트별 요청 속도 제한 (토큰 버킷).
+    여러 작업 스레드가 하나의 인스턴스를 공유하며, acquire()는 토큰이 생길 때까지 대기합니다.
+    :param rate: 초당 허용 요청 수
+    :param burst: 한 번에 몰아서 허용할 최대 요청 수
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SkipItem(Exception):
+    """작업을 오류 없이 건너뛸 때 단계 함수에서 발생시킴 (예: Shorts 영상)"""
+
+
+class Stage:
+    """
+    파이프라인의 한 단계.
+    func(item)은 다음 단계로 넘길 항목을 반환하며, SkipItem을 발생시키면 건너뜀,
+    그 외 예외는 오류로 집계됩니다.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.input: Optional[queue.Queue] = None
+
+        self._lock = threading.Lock()
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.busy_sec = 0.0
+
+    def record(self, outcome: str, elapsed: float):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.busy_sec += elapsed
+
+    def stats(self, elapsed: float) -> dict:
+        with self._lock:
+            return {
+                "stage": self.name,
+                "queue": self.input.qsize() if self.input else 0,
+                "done": self.done,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "per_min": round(self.done / elapsed * 60, 1) if elapsed else 0.0,
+                "avg_sec": round(self.busy_sec / max(1, self.done + self.failed), 2),
+            }
+
+
+class Pipeline:
+    """
+    단계별 작업 스레드 풀을 큐로 연결한 파이프라인.
+    각 단계 사이의 큐는 크기가 제한되어 있어 느린 단계 앞에서 자동으로 속도가 조절됩니다.
+    :param stages: 순서대로 실행할 단계 목록
+    :param queue_size: 단계 사이 큐 최대 크기
+    :param report_interval: 단계별 처리량/대기열 길이를 로그로 남길 주기 (초)
+    :param log: 진행 상황을 남길 로거 (기본값: 이 모듈의 로거)
+    :param on_skip: 항목을 건너뛸 때 호출 (stage, item, exception)
+    :param on_error: 항목 처리에 실패했을 때 호출 (stage, item, exception)
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: int = 16,
+        report_interval: float = 30,
+        log: Optional[logging.Logger] = None,
+        on_skip: Optional[Callable[[Stage, Any, Exception], None]] = None,
+        on_error: Optional[Callable[[Stage, Any, Exception], None]] = None,
+    ):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.log = log or logger
+        self.on_skip = on_skip
+        self.on_error = on_error
+        self._started_at = None
+
+    def _notify(self, callback, stage: Stage, item: Any, error: Exception):
+        if callback is None:
+            return
+        try:
+            callback(stage, item, error)
+        except Exception as e:
+            self.log.error(f"[{stage.name}] 콜백 처리 중 오류: {e}")
+
+    def _worker(self, stage: Stage, output: Optional[queue.Queue]):
+        while True:
+            item = stage.input.get()
+            if item is _STOP:
+                return
+            start_time = time.monotonic()
+            try:
+                result = stage.func(item)
+            except SkipItem as e:
+                stage.record("skipped", time.monotonic() - start_time)
+                self.log.info(f"[{stage.name}] 건너뜀: {e}")
+                self._notify(self.on_skip, stage, item, e)
+                continue
+            except Exception as e:
+                stage.record("failed", time.monotonic() - start_time)
+                self.log.error(f"[{stage.name}] 오류: {e}")
+                self._notify(self.on_error, stage, item, e)
+                continue
+            stage.record("done", time.monotonic() - start_time)
+            if output is not None:
+                output.put(result)
+
+    def stats(self) -> List[dict]:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return [stage.stats(elapsed) for stage in self.stages]
+
+    def log_stats(self):
+        for stat in self.stats():
+            self.log.info(
+                f"[{stat['stage']}] 대기 {stat['queue']} · 완료 {stat['done']} · "
+                f"건너뜀 {stat['skipped']} · 오류 {stat['failed']} · "
+                f"{stat['per_min']}건/분 · 평균 {stat['avg_sec']}초"
+            )
+
+    def run(self, items: Iterable[Any]) -> List[dict]:
+        """모든 항목을 처리할 때까지 실행하고 단계별 통계를 반환합니다."""
+        self._started_at = time.monotonic()
+        for stage in self.stages:
+            stage.input = queue.Queue(maxsize=self.queue_size)
+
+        threads = []
+        for index, stage in enumerate(self.stages):
+            output = (
+                self.stages[index + 1].input if index + 1 < len(self.stages) else None
+            )
+            stage_threads = [
+                threading.Thread(
+                    target=self._worker,
+                    args=(stage, output),
+                    name=f"{stage.name}-{i}",
+                    daemon=True,
+                )
+                for i in range(stage.workers)
+            ]
+            for thread in stage_threads:
+                thread.start()
+            threads.append(stage_threads)
+
+        finished = threading.Event()
+
+        def report():
+            while not finished.wait(self.report_interval):
+                self.log_stats()
+
+        threading.Thread(target=report, name="pipeline-report", daemon=True).start()
+
+        for item in items:
+            self.stages[0].input.put(item)
+
+        # 앞 단계부터 순서대로 종료 (앞 단계 작업이 모두 끝난 뒤 다음 단계에 종료 신호)
+        for stage, stage_threads in zip(self.stages, threads):
+            for _ in stage_threads:
+                stage.input.put(_STOP)
+            for thread in stage_threads:
+                thread.join()
+
+        finished.set()
+        self.log_stats()
+        return self.stats()
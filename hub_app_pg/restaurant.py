@@ -0,0 +1,135 @@
+# restaurant.py
+import math
+from dataclasses import astuple, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 좌표가 없는 식당을 표시할 기본 위치 (서울 시청), 식당 순번만큼 조금씩 떨어뜨려 겹치지 않게 함
+BASE_LAT, BASE_LNG = 37.5665, 126.9780
+FALLBACK_OFFSET = 0.001
+
+MISSING = "정보 없음"
+
+
+def parse_coordinate(value, low: float, high: float) -> Optional[float]:
+    """문자열/숫자 좌표를 float로 변환 (빈 값, 정보 없음, 0, 범위 밖, NaN은 None)"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not number or math.isnan(number) or not low <= number <= high:
+        return None
+    return number
+
+
+@dataclass(slots=True)
+class Restaurant:
+    """
+    에이전트 응답의 식당 정보 1건.
+    좌표는 생성 시 한 번만 검증/변환되며, 이후 채팅 표시와 지도에서 그대로 사용합니다.
+    """
+
+    id: int
+    name: str
+    address: str
+    subway: str
+    menu: str
+    review: str
+    video_url: str
+    lat: float
+    lng: float
+    # 좌표가 없어 기본 위치를 사용한 경우 True
+    approximate: bool = False
+    category: str = "기타"
+
+    @classmethod
+    def from_info(cls, index: int, info: Dict[str, Any]) -> "Restaurant":
+        """
+        에이전트의 infos 항목으로 Restaurant를 만듭니다.
+
+        Args:
+            index: 1부터 시작하는 식당 순번 (ID와 기본 좌표 오프셋으로 사용)
+            info: name, address, subway, lat, lng, menu, review, video_url을 가진 딕셔너리
+        """
+        lat = parse_coordinate(info.get("lat"), -90.0, 90.0)
+        lng = parse_coordinate(info.get("lng"), -180.0, 180.0)
+        approximate = lat is None or lng is None
+        if approximate:
+            lat = BASE_LAT + index * FALLBACK_OFFSET
+            lng = BASE_LNG + index * FALLBACK_OFFSET
+        return cls(
+            id=index,
+            name=info.get("name") or "이름 없음",
+            address=info.get("address") or "주소 없음",
+            subway=info.get("subway") or MISSING,
+            menu=info.get("menu") or MISSING,
+            review=info.get("review") or MISSING,
+            video_url=info.get("video_url") or MISSING,
+            lat=lat,
+            lng=lng,
+            approximate=approximate,
+        )
+
+    @property
+    def has_video(self) -> bool:
+        return bool(self.video_url) and self.video_url != MISSING
+
+    def to_marker(self) -> Dict[str, Any]:
+        """지도 컴포넌트에 전달할 최소 정보"""
+        return {"id": self.id, "name": self.name, "lat": self.lat, "lng": self.lng}
+
+    def to_answer_text(self) -> str:
+        """채팅 답변에 덧붙일 식당 설명"""
+        return (
+            f"\n\n{self.id}. {self.name}\n\n"
+            f"\t📍 주소: {self.address}\n\n"
+            f"\t🚇 지하철: {self.subway}\n\n"
+            f"\t🍽️ 메뉴: {self.menu}\n\n"
+            f"\t⭐ 리뷰: {self.review}\n\n"
+            f"\t🎬 유튜브 영상: {self.video_url}\n\n"
+        )
+
+
+def parse_restaurants(infos: Iterable[Dict[str, Any]]) -> List[Restaurant]:
+    """에이전트 응답의 infos 목록을 Restaurant 목록으로 변환"""
+    return [Restaurant.from_info(i, info) for i, info in enumerate(infos, 1)]
+
+
+def restaurants_key(restaurants: List[Restaurant]) -> Tuple:
+    """식당 목록 내용 비교용 키 (캐시 키 계산에 사용)"""
+    return tuple(astuple(restaurant) for restaurant in restaurants)
+
+
+if __name__ == "__main__":
+    # 마이크로 벤치마크: 식당 1,000개 응답을 변환하는 시간과 메모리
+    import random
+    import timeit
+    import tracemalloc
+
+    rng = random.Random(0)
+    payload = [
+        {
+            "name": f"식당 {i}",
+            "address": f"서울특별시 테스트로 {i}",
+            "subway": "시청역",
+            "lat": str(37.45 + rng.random() * 0.25) if i % 10 else "정보 없음",
+            "lng": str(126.80 + rng.random() * 0.35) if i % 10 else "정보 없음",
+            "menu": "김치찌개, 제육볶음",
+            "review": "맛있다",
+            "video_url": f"https://www.youtube.com/watch?v=bench{i}",
+        }
+        for i in range(1000)
+    ]
+
+    runs = 200
+    elapsed = timeit.timeit(lambda: parse_restaurants(payload), number=runs)
+    print(f"parse_restaurants(1000): {elapsed / runs * 1000:.2f}ms/회")
+
+    for label, build in [
+        ("Restaurant (slots)", lambda: parse_restaurants(payload)),
+        ("dict", lambda: [{**info, "id": i} for i, info in enumerate(payload, 1)]),
+    ]:
+        tracemalloc.start()
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label}: {current / 1024:.1f}KB ({len(result)}개)")
@@ -0,0 +1,226 @@
+# restaurant_journal.py
+import fcntl
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+# 수집 결과 저널 (한 줄에 식당 1건, 추가만 함)과 압축 시 만드는 전체 스냅샷
+JOURNAL_FILE_PATH = "./data/meokten_restaurants.jsonl"
+SNAPSHOT_FILE_PATH = "./data/meokten_restaurants.json"
+
+# 저널이 이 크기(바이트)를 넘으면 스냅샷으로 합치고 새 저널을 시작
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(5 * 1024 * 1024)))
+
+
+def _fsync_dir(path: str):
+    """rename 결과가 디스크에 남도록 디렉터리도 fsync"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(file_path: str, payload: bytes):
+    """임시 파일에 쓰고 fsync한 뒤 rename (읽는 쪽은 이전 파일 또는 완성된 파일만 봄)"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_dir(file_path)
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _read_header(journal_path: str) -> Tuple[int, int]:
+    """저널 첫 줄의 세대 번호와 첫 레코드 위치 (저널이 없으면 (0, 0))"""
+    try:
+        with open(journal_path, "rb") as f:
+            line = f.readline()
+    except FileNotFoundError:
+        return 0, 0
+    if not line.endswith(b"\n"):
+        return 0, 0
+    try:
+        return int(json.loads(line)["generation"]), len(line)
+    except (ValueError, KeyError, TypeError):
+        # 헤더 없는 저널은 0세대로 취급
+        return 0, 0
+
+
+def _load_snapshot(snapshot_path: str) -> Dict[str, Any]:
+    if not os.path.exists(snapshot_path):
+        return {}
+    with open(snapshot_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_updates(
+    generation: Optional[int] = None,
+    offset: int = 0,
+    journal_path: str = JOURNAL_FILE_PATH,
+    snapshot_path: str = SNAPSHOT_FILE_PATH,
+) -> Tuple[Dict[str, Any], int, int]:
+    """
+    저장된 위치 이후에 추가된 식당 정보를 읽습니다. (save_db.py에서 사용)
+    마지막 줄이 아직 쓰이는 중이면 읽지 않고 다음 호출에서 읽습니다.
+    저장된 세대와 현재 저널 세대가 다르면 (그 사이 압축됨) 스냅샷부터 다시 읽습니다.
+
+    Args:
+        generation: 이전 호출에서 반환된 세대 번호 (처음이면 None)
+        offset: 이전 호출에서 반환된 저널 위치 (바이트)
+
+    Returns:
+        (video_id_i 키 -> 식당 정보, 현재 세대 번호, 다음에 읽을 위치)
+    """
+    current_generation, header_end = _read_header(journal_path)
+    updates: Dict[str, Any] = {}
+    if generation != current_generation:
+        updates.update(_load_snapshot(snapshot_path))
+        offset = header_end
+
+    try:
+        with open(journal_path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return updates, current_generation, offset
+
+    # 완성된 줄(개행으로 끝나는 줄)까지만 처리
+    complete = data[: data.rfind(b"\n") + 1]
+    for line in complete.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "key" in record:
+            updates[record["key"]] = record["value"]
+    return updates, current_generation, offset + len(complete)
+
+
+class RestaurantJournal:
+    """
+    수집 결과를 추가 전용 JSONL 저널에 기록합니다.
+    영상마다 전체 JSON을 다시 쓰는 대신 새 식당만 한 줄씩 추가하고 fsync하며,
+    저널이 커지면 스냅샷(meokten_restaurants.json)으로 원자적으로 합친 뒤 새 세대 저널을 시작합니다.
+    수집 작업이 겹쳐 실행될 수 있으므로 추가/압축/복구는 잠금 파일(<저널>.lock)의 flock으로
+    프로세스 사이에서도 하나씩만 실행합니다.
+    """
+
+    def __init__(
+        self,
+        journal_path: str = JOURNAL_FILE_PATH,
+        snapshot_path: str = SNAPSHOT_FILE_PATH,
+        compact_bytes: int = JOURNAL_COMPACT_BYTES,
+    ):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.compact_bytes = compact_bytes
+        self.lock_path = journal_path + ".lock"
+        self._lock = threading.Lock()
+        with self._file_lock():
+            self._repair_tail()
+            self.generation, _ = _read_header(journal_path)
+
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 내 스레드와 다른 프로세스 모두에 대한 배타 잠금"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _repair_tail(self):
+        """
+        비정상 종료로 반쯤 쓰인 마지막 줄 제거
+        (_file_lock 안에서 호출하므로 다른 프로세스가 쓰는 중인 줄은 건드리지 않음)
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _read_all(self) -> Dict[str, Any]:
+        restaurants, _, _ = read_updates(
+            None, 0, journal_path=self.journal_path, snapshot_path=self.snapshot_path
+        )
+        return restaurants
+
+    def load(self) -> Dict[str, Any]:
+        """스냅샷에 저널을 적용한 전체 식당 정보"""
+        with self._file_lock():
+            return self._read_all()
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, records: Dict[str, Any]):
+        """식당 정보를 저널 끝에 추가하고 디스크에 기록될 때까지 대기 (fsync)"""
+        if not records:
+            return
+        payload = b"".join(
+            _encode({"key": key, "value": value}) for key, value in records.items()
+        )
+        with self._file_lock():
+            if os.path.exists(self.journal_path):
+                # 다른 프로세스가 압축했으면 세대가 바뀌어 있음
+                self.generation, _ = _read_header(self.journal_path)
+            else:
+                _write_atomic(self.journal_path, _encode({"generation": self.generation}))
+            with open(self.journal_path, "ab") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def needs_compaction(self) -> bool:
+        return self.size() > self.compact_bytes
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        스냅샷과 저널을 합친 전체 식당 정보를 스냅샷으로 저장하고 저널을 비웁니다. (임시 파일 + rename)
+        메모리의 식당 정보가 아니라 잠금을 잡은 뒤 디스크에서 다시 읽은 내용을 저장하므로
+        다른 프로세스가 추가한 식당도 빠지지 않습니다.
+        스냅샷을 먼저 바꾸므로 중간에 종료되어도 저널 내용은 스냅샷이나 저널 중 한 곳에 남습니다.
+
+        Returns:
+            스냅샷에 저장한 전체 식당 정보
+        """
+        with self._file_lock():
+            restaurants = self._read_all()
+            _write_atomic(
+                self.snapshot_path,
+                json.dumps(restaurants, ensure_ascii=False, indent=2).encode("utf-8"),
+            )
+            generation, _ = _read_header(self.journal_path)
+            self.generation = generation + 1
+            _write_atomic(self.journal_path, _encode({"generation": self.generation}))
+        return restaurants
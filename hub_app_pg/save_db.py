@@ -6,6 +6,10 @@ import logging
 from logging.handlers import RotatingFileHandler
 from dotenv import load_dotenv
 
+from geojson_export import export_restaurants_geojson
+from restaurant import parse_coordinate
+from restaurant_journal import JOURNAL_FILE_PATH, SNAPSHOT_FILE_PATH, read_updates
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -83,6 +87,27 @@ def init_db():
         """
         )
 
+        # 지도 영역 검색용 숫자 좌표 컬럼과 인덱스 (latitude/longitude TEXT 컬럼은 기존 호환용으로 유지)
+        cursor.execute(
+            """
+            ALTER TABLE restaurants
+                ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION,
+                ADD COLUMN IF NOT EXISTS lng DOUBLE PRECISION
+        """
+        )
+        cursor.execute(
+            r"""
+            UPDATE restaurants
+            SET lat = latitude::double precision, lng = longitude::double precision
+            WHERE lat IS NULL
+                AND latitude ~ '^-?[0-9]+(\.[0-9]+)?$'
+                AND longitude ~ '^-?[0-9]+(\.[0-9]+)?$'
+        """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_restaurants_lat_lng ON restaurants (lat, lng)"
+        )
+
         # menus 테이블 생성
         cursor.execute(
             """
@@ -97,6 +122,18 @@ def init_db():
         """
         )
 
+        # 수집 저널을 어디까지 읽었는지 기록 (세대 번호 + 바이트 위치)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS journal_offsets (
+                source TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL,
+                byte_offset BIGINT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+
         conn.commit()
         logger.info("데이터베이스 초기화 완료")
     except Exception as e:
@@ -125,6 +162,44 @@ def load_from_json(json_file_path):
         return None
 
 
+# 저널 읽기 위치 조회 함수 (처음이면 (None, 0))
+def load_journal_offset(source=JOURNAL_FILE_PATH):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT generation, byte_offset FROM journal_offsets WHERE source = %s",
+            (source,),
+        )
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else (None, 0)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# 저널 읽기 위치 저장 함수
+def save_journal_offset(generation, offset, source=JOURNAL_FILE_PATH):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO journal_offsets (source, generation, byte_offset, updated_at)
+            VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (source) DO UPDATE SET
+                generation = EXCLUDED.generation,
+                byte_offset = EXCLUDED.byte_offset,
+                updated_at = CURRENT_TIMESTAMP
+        """,
+            (source, generation, offset),
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
 # 데이터베이스에 정보 저장 함수
 def save_to_db(video_id, restaurant_data):
     conn = get_db_connection()
@@ -156,11 +231,21 @@ def save_to_db(video_id, restaurant_data):
         # 식당 정보 저장
         cursor.execute(
             """
-            INSERT INTO restaurants (name, address, latitude, longitude, station_name, video_id, video_url)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO restaurants (name, address, latitude, longitude, lat, lng, station_name, video_id, video_url)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING id
         """,
-            (name, address, latitude, longitude, station_name, video_id, video_url),
+            (
+                name,
+                address,
+                latitude,
+                longitude,
+                parse_coordinate(latitude, -90.0, 90.0),
+                parse_coordinate(longitude, -180.0, 180.0),
+                station_name,
+                video_id,
+                video_url,
+            ),
         )
 
         # 방금 삽입한 식당의 ID 가져오기
@@ -261,19 +346,28 @@ def main():
     # 데이터베이스 초기화
     init_db()
 
-    # JSON 파일 경로
-    json_file_path = "./data/meokten_restaurants.json"
-
-    # 파일이 없으면 대체 경로 시도
-    if not os.path.exists(json_file_path):
+    journal_position = None
+    if os.path.exists(JOURNAL_FILE_PATH) or os.path.exists(SNAPSHOT_FILE_PATH):
+        # 수집 저널에서 지난번 이후 추가된 항목만 읽기 (압축된 경우 스냅샷부터)
+        generation, offset = load_journal_offset()
+        restaurants_data, new_generation, new_offset = read_updates(generation, offset)
+        journal_position = (new_generation, new_offset)
+        logger.info(
+            f"저널에서 {len(restaurants_data)} 개의 새 항목 로드 "
+            f"(세대 {new_generation}, 위치 {offset} -> {new_offset})"
+        )
+    else:
+        # 이전 형식의 JSON 파일
         json_file_path = "all_restaurants.json"
         if not os.path.exists(json_file_path):
             logger.error("JSON 파일을 찾을 수 없습니다.")
             return
+        restaurants_data = load_from_json(json_file_path)
 
-    # JSON 파일에서 데이터 로드
-    restaurants_data = load_from_json(json_file_path)
     if not restaurants_data:
+        if journal_position:
+            save_journal_offset(*journal_position)
+        logger.info("새로 저장할 항목이 없습니다.")
         return
 
     success_count = 0
@@ -336,12 +430,25 @@ def main():
 
     logger.info(f"작업 완료: {success_count}개 성공, {error_count}개 실패")
 
+    # 실패한 항목이 있으면 위치를 옮기지 않아 다음 실행에서 다시 시도 (이미 저장된 항목은 건너뜀)
+    if journal_position and error_count == 0:
+        save_journal_offset(*journal_position)
+
     # 문제 비디오 목록 출력
     if problem_videos:
         logger.warning(f"문제가 있는 비디오 목록 ({len(problem_videos)}개):")
         for video_id in problem_videos:
             logger.warning(f" - {video_id}")
 
+    # 전체 맛집 지도용 GeoJSON 갱신
+    conn = get_db_connection()
+    try:
+        logger.info(f"GeoJSON 내보내기 완료: {export_restaurants_geojson(conn)}")
+    except Exception as e:
+        logger.error(f"GeoJSON 내보내기 중 오류 발생: {str(e)}")
+    finally:
+        conn.close()
+
     # 저장된 데이터 조회 (테스트용)
     query_db()
 
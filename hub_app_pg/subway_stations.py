@@ -0,0 +1,386 @@
+# subway_stations.py
+import argparse
+import csv
+import heapq
+import math
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# 수도권 지하철역 목록 (Kakao 장소 검색 SW8 결과, --build로 생성)
+STATION_FILE_PATH = Path(__file__).parent.absolute() / "assets" / "subway_stations.csv"
+# 역 목록 파일이 함께 배포되지 않았을 때 Kakao에서 한 번 받아 저장하는 위치 (cron 컨테이너와 공유되는 data/)
+STATION_CACHE_FILE_PATH = Path(__file__).parent.absolute() / "data" / "subway_stations.csv"
+
+# collecting_data.py의 Kakao 역 검색과 같은 기준 (반경 2km 안의 가장 가까운 역)
+STATION_SEARCH_RADIUS_M = 2000
+
+# --build 시 검색할 영역 (경도/위도, 수도권 전철 노선 범위)
+BUILD_BOUNDS = (126.30, 36.70, 127.90, 38.10)
+
+EARTH_RADIUS_M = 6371008.8
+
+
+@dataclass(slots=True)
+class Station:
+    id: str
+    name: str
+    lat: float
+    lng: float
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """두 좌표 사이의 거리 (미터)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _project(lat: float, lng: float) -> Tuple[float, float, float]:
+    """
+    위경도를 지구 중심 기준 3차원 좌표(미터)로 변환.
+    두 점의 직선(현) 거리 순서가 구면 거리 순서와 같으므로 근사 없이 가장 가까운 역을 찾을 수 있습니다.
+    """
+    phi, lam = math.radians(lat), math.radians(lng)
+    return (
+        EARTH_RADIUS_M * math.cos(phi) * math.cos(lam),
+        EARTH_RADIUS_M * math.cos(phi) * math.sin(lam),
+        EARTH_RADIUS_M * math.sin(phi),
+    )
+
+
+class StationIndex:
+    """
+    지하철역 KD-tree (3차원 좌표).
+    노드는 (역 번호, 분할 축, 왼쪽, 오른쪽) 튜플이며 현 거리로 탐색하고,
+    반환하는 거리는 하버사인 거리(미터)입니다.
+    """
+
+    def __init__(self, stations: List[Station]):
+        self.stations = stations
+        self._points = [_project(s.lat, s.lng) for s in stations]
+        self._root = self._build(list(range(len(stations))), 0)
+
+    def _build(self, indices: List[int], depth: int):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self._points[i][axis])
+        middle = len(indices) // 2
+        return (
+            indices[middle],
+            axis,
+            self._build(indices[:middle], depth + 1),
+            self._build(indices[middle + 1 :], depth + 1),
+        )
+
+    def __len__(self):
+        return len(self.stations)
+
+    def nearest(
+        self, lat: float, lng: float, k: int = 1, max_distance: Optional[float] = None
+    ) -> List[Tuple[Station, float]]:
+        """
+        가까운 역 k개를 가까운 순서로 반환합니다.
+
+        Args:
+            lat, lng: 기준 좌표
+            k: 반환할 역 수
+            max_distance: 이 거리(미터)보다 먼 역은 제외
+
+        Returns:
+            [(Station, 거리(m)), ...]
+        """
+        if self._root is None or k <= 0:
+            return []
+        target = _project(lat, lng)
+        # 최대 힙 (음수 제곱거리, 역 번호)
+        best: List[Tuple[float, int]] = []
+        # 현 거리는 구면 거리보다 항상 짧으므로 max_distance를 그대로 탐색 한도로 사용
+        limit = max_distance**2 if max_distance is not None else math.inf
+
+        def search(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self._points[index]
+            distance_sq = (
+                (point[0] - target[0]) ** 2
+                + (point[1] - target[1]) ** 2
+                + (point[2] - target[2]) ** 2
+            )
+            if distance_sq <= limit:
+                if len(best) < k:
+                    heapq.heappush(best, (-distance_sq, index))
+                elif distance_sq < -best[0][0]:
+                    heapq.heapreplace(best, (-distance_sq, index))
+
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            worst = -best[0][0] if len(best) == k else limit
+            if diff * diff < worst:
+                search(far)
+
+        search(self._root)
+
+        results = []
+        for _, index in best:
+            station = self.stations[index]
+            distance = haversine_m(lat, lng, station.lat, station.lng)
+            if max_distance is None or distance <= max_distance:
+                results.append((station, distance))
+        results.sort(key=lambda item: item[1])
+        return results
+
+    def nearest_station(
+        self, lat: float, lng: float, max_distance: float = STATION_SEARCH_RADIUS_M
+    ) -> Optional[Tuple[str, str]]:
+        """
+        가장 가까운 역 (역 이름, 거리 문자열) 또는 반경 안에 역이 없으면 None.
+        Kakao 역 검색 결과와 같은 형식이므로 station_name 컬럼 형식을 그대로 만들 수 있습니다.
+        """
+        results = self.nearest(lat, lng, k=1, max_distance=max_distance)
+        if not results:
+            return None
+        station, distance = results[0]
+        return station.name, str(round(distance))
+
+
+def load_stations(file_path: Path = STATION_FILE_PATH) -> List[Station]:
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        return [
+            Station(
+                id=row["id"],
+                name=row["name"],
+                lat=float(row["lat"]),
+                lng=float(row["lng"]),
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+def load_station_index(file_path: Path = STATION_FILE_PATH) -> Optional[StationIndex]:
+    """역 목록 파일로 인덱스 생성 (파일이 없으면 None)"""
+    if not os.path.exists(file_path):
+        return None
+    return StationIndex(load_stations(file_path))
+
+
+def ensure_station_index(
+    api_key: Optional[str],
+    file_path: Path = STATION_FILE_PATH,
+    cache_path: Path = STATION_CACHE_FILE_PATH,
+) -> Optional[StationIndex]:
+    """
+    역 목록 인덱스를 반환합니다. 함께 배포된 파일이 없으면 data/에 저장한 목록을 사용하고,
+    그것도 없으면 Kakao에서 한 번 받아 data/에 저장합니다. (실패하면 None)
+    """
+    for path in (file_path, cache_path):
+        index = load_station_index(path)
+        if index is not None:
+            return index
+    if not api_key:
+        return None
+    try:
+        stations = fetch_stations_from_kakao(api_key)
+    except Exception as e:
+        print(f"[ERROR] 지하철역 목록 생성 실패: {e}")
+        return None
+    if not stations:
+        return None
+    write_stations(stations, cache_path)
+    print(f"[INFO] 지하철역 {len(stations)}개 저장: {cache_path}")
+    return StationIndex(stations)
+
+
+def format_station_name(station: Optional[Tuple[str, str]]) -> str:
+    """restaurants.station_name 형식 (collecting_data.py와 동일)"""
+    station_name, station_distance = station or ("정보 없음", "정보 없음")
+    return f"{station_name}({station_distance}m)"
+
+
+def recompute_station_names(conn, index: StationIndex) -> dict:
+    """
+    DB의 모든 식당 station_name을 로컬 역 인덱스로 다시 계산합니다. (네트워크 호출 없음)
+    좌표(lat/lng)가 없는 식당과 반경 안에 역이 없는 식당(역 목록 범위 밖의 지역 등)은 그대로 두며,
+    값이 바뀐 행만 수정합니다.
+
+    Returns:
+        {"restaurants": 검사한 식당 수, "updated": 수정한 행 수, "elapsed_sec": 소요 시간}
+    """
+    from psycopg2.extras import execute_batch
+
+    start_time = time.time()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT id, lat, lng, station_name FROM restaurants "
+            "WHERE lat IS NOT NULL AND lng IS NOT NULL"
+        )
+        rows = cursor.fetchall()
+        changes = []
+        for restaurant_id, lat, lng, station_name in rows:
+            station = index.nearest_station(lat, lng)
+            if station is None:
+                continue
+            new_station_name = format_station_name(station)
+            if new_station_name != station_name:
+                changes.append((new_station_name, restaurant_id))
+        execute_batch(
+            cursor, "UPDATE restaurants SET station_name = %s WHERE id = %s", changes
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {
+        "restaurants": len(rows),
+        "updated": len(changes),
+        "elapsed_sec": round(time.time() - start_time, 2),
+    }
+
+
+def fetch_stations_from_kakao(api_key: str, bounds=BUILD_BOUNDS) -> List[Station]:
+    """
+    Kakao 카테고리 검색(SW8)으로 영역 안의 모든 지하철역을 수집합니다. (--build에서 한 번만 사용)
+    한 영역의 결과는 최대 45개까지만 조회되므로 결과가 더 많으면 영역을 4등분하여 다시 검색합니다.
+    """
+    import requests
+
+    url = "https://dapi.kakao.com/v2/local/search/category.json"
+    headers = {"Authorization": f"KakaoAK {api_key}"}
+    stations = {}
+
+    def search(west, south, east, north):
+        documents = []
+        for page in range(1, 4):
+            response = requests.get(
+                url,
+                headers=headers,
+                params={
+                    "category_group_code": "SW8",
+                    "rect": f"{west},{south},{east},{north}",
+                    "page": page,
+                    "size": 15,
+                },
+                timeout=10,
+            )
+            response.raise_for_status()
+            data = response.json()
+            if page == 1 and data["meta"]["total_count"] > 45:
+                mid_lng, mid_lat = (west + east) / 2, (south + north) / 2
+                search(west, south, mid_lng, mid_lat)
+                search(mid_lng, south, east, mid_lat)
+                search(west, mid_lat, mid_lng, north)
+                search(mid_lng, mid_lat, east, north)
+                return
+            documents.extend(data["documents"])
+            if data["meta"]["is_end"]:
+                break
+            time.sleep(0.1)
+        for document in documents:
+            stations[document["id"]] = Station(
+                id=document["id"],
+                name=document["place_name"],
+                lat=float(document["y"]),
+                lng=float(document["x"]),
+            )
+
+    search(*bounds)
+    return sorted(stations.values(), key=lambda s: s.name)
+
+
+def write_stations(stations: List[Station], file_path: Path = STATION_FILE_PATH):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "lat", "lng"])
+        for station in stations:
+            writer.writerow(
+                [station.id, station.name, f"{station.lat:.7f}", f"{station.lng:.7f}"]
+            )
+
+
+def run_benchmark(count: int = 700, queries: int = 10000):
+    """가짜 역 데이터로 조회 시간 측정 (전수 비교와 결과 비교)"""
+    import random
+
+    rng = random.Random(0)
+    stations = [
+        Station(
+            str(i), f"역 {i}", 37.2 + rng.random() * 0.7, 126.6 + rng.random() * 0.7
+        )
+        for i in range(count)
+    ]
+    index = StationIndex(stations)
+    points = [
+        (37.4 + rng.random() * 0.3, 126.8 + rng.random() * 0.35) for _ in range(queries)
+    ]
+
+    start_time = time.perf_counter()
+    results = [index.nearest(lat, lng, k=1)[0][0] for lat, lng in points]
+    elapsed = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    expected = [
+        min(stations, key=lambda s: haversine_m(lat, lng, s.lat, s.lng))
+        for lat, lng in points
+    ]
+    brute_elapsed = time.perf_counter() - start_time
+
+    mismatches = sum(a is not b for a, b in zip(results, expected))
+    print(
+        f"[BENCH] 역 {count}개, 조회 {queries}회: KD-tree {elapsed / queries * 1e6:.1f}µs/회, "
+        f"전수 비교 {brute_elapsed / queries * 1e6:.1f}µs/회, 불일치 {mismatches}건"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지하철역 목록 생성 및 가까운 역 재계산")
+    parser.add_argument(
+        "--build",
+        action="store_true",
+        help="Kakao API로 수도권 지하철역 목록을 받아 assets/subway_stations.csv 생성",
+    )
+    parser.add_argument(
+        "--recompute",
+        action="store_true",
+        help="DB의 모든 식당 station_name을 로컬 역 목록으로 다시 계산 (네트워크 호출 없음)",
+    )
+    parser.add_argument("--benchmark", action="store_true", help="조회 속도 측정")
+    args = parser.parse_args()
+
+    if args.build:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        stations = fetch_stations_from_kakao(os.getenv("KAKAO_API_KEY"))
+        write_stations(stations)
+        print(f"[INFO] 지하철역 {len(stations)}개 저장: {STATION_FILE_PATH}")
+
+    if args.recompute:
+        from geojson_export import export_restaurants_geojson
+        from save_db import get_db_connection
+
+        index = load_station_index() or load_station_index(STATION_CACHE_FILE_PATH)
+        if index is None:
+            raise SystemExit(f"[ERROR] 역 목록 파일이 없습니다: {STATION_FILE_PATH}")
+        conn = get_db_connection()
+        try:
+            print(f"[INFO] station_name 재계산 완료: {recompute_station_names(conn, index)}")
+            print(f"[INFO] GeoJSON 내보내기 완료: {export_restaurants_geojson(conn)}")
+        finally:
+            conn.close()
+
+    if args.benchmark:
+        run_benchmark()
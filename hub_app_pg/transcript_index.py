@@ -0,0 +1,104 @@
+# transcript_index.py
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+# 영문/숫자 단어와 한글 어절을 토큰으로 사용
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    검색용 토큰 생성.
+    한글 어절은 조사가 붙어 형태가 바뀌므로 어절과 함께 2글자 단위(bigram)도 추가합니다.
+
+    Args:
+        text: 원본 텍스트
+
+    Returns:
+        토큰 리스트
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if "가" <= word[0] <= "힣" and len(word) > 2:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class TranscriptIndex:
+    """스크립트 세그먼트에 대한 BM25 역색인 (영상별 1회 생성)"""
+
+    def __init__(self, segments: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.segments = segments
+        self.k1 = k1
+        self.b = b
+
+        # 토큰 -> [(세그먼트 번호, 빈도)]
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+        for doc_id, segment in enumerate(segments):
+            counts = Counter(tokenize(segment.get("text", "")))
+            self.doc_lengths.append(sum(counts.values()))
+            for token, freq in counts.items():
+                self.postings[token].append((doc_id, freq))
+
+        total = len(self.doc_lengths)
+        self.avg_length = (sum(self.doc_lengths) / total) if total else 0.0
+        self.idf = {
+            token: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        질문과 관련도가 높은 세그먼트를 반환합니다.
+
+        Args:
+            query: 사용자 질문
+            top_k: 반환할 최대 세그먼트 수
+
+        Returns:
+            시간순으로 정렬된 세그먼트 리스트 (start, end, text, score)
+        """
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for doc_id, freq in self.postings[token]:
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length
+                )
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norm)
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        results = []
+        for doc_id, score in sorted(best):
+            segment = self.segments[doc_id]
+            results.append(
+                {
+                    "start": float(segment["start"]),
+                    "end": float(segment["end"]),
+                    "text": segment["text"],
+                    "score": round(score, 3),
+                }
+            )
+        return results
+
+
+def format_context_hint(results: List[Dict[str, Any]], max_chars: int = 200) -> str:
+    """
+    검색된 세그먼트를 백엔드에 전달할 간단한 컨텍스트 문자열로 변환합니다.
+
+    Args:
+        results: TranscriptIndex.search 결과
+        max_chars: 세그먼트별 최대 글자 수
+
+    Returns:
+        "[시작초] 텍스트" 형식의 줄 단위 문자열
+    """
+    return "\n".join(
+        f"[{int(item['start'])}s] {item['text'][:max_chars]}" for item in results
+    )
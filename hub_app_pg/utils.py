@@ -1,14 +1,18 @@
-import io
+import hashlib
 import json
+import math
 import os
 import re
 import smtplib
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 import requests
+import yt_dlp
 from agent.db import get_db_connection
 from dotenv import load_dotenv
 from sqlalchemy import text
@@ -30,8 +34,88 @@ NOTICE_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dat
 # 디렉토리가 없으면 생성
 os.makedirs(os.path.dirname(NOTICE_FILE_PATH), exist_ok=True)
 
+# 채팅 답변 캐시 유지 시간 (초)
+CHAT_CACHE_TTL = int(os.getenv("CHAT_CACHE_TTL", 60 * 60 * 24))
+# 스크립트 요약 캐시 유지 시간 (초)
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", 60 * 60 * 24))
+# 지도 영역 식당 조회 타일 캐시 유지 시간 (초, save_db.py 실행 주기와 맞춤)
+RESTAURANT_TILE_CACHE_TTL = int(os.getenv("RESTAURANT_TILE_CACHE_TTL", 60 * 5))
+# 이 줌보다 축소된 지도에서는 영역 조회를 하지 않음 (타일 수가 너무 많아짐)
+BOUNDS_MIN_ZOOM = 11
+# 영역 조회에 사용하는 최대 타일 줌 (더 확대해도 이 줌의 타일 단위로 캐시)
+BOUNDS_TILE_MAX_ZOOM = 15
+
 db, _ = get_db_connection()
 
+
+class TTLCache:
+    """
+    프로세스 전역에서 공유되는 TTL 캐시.
+    모듈 레벨 인스턴스로 사용하면 모든 사용자 세션이 같은 캐시를 공유합니다.
+    :param ttl: 항목 유지 시간 (초)
+    :param maxsize: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 제거)
+    """
+
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._hits_by_day = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            # 캐시 적중 = 백엔드(RunPod) 호출 1회 절약
+            today = datetime.now(kst).strftime("%Y-%m-%d")
+            self._hits_by_day[today] = self._hits_by_day.get(today, 0) + 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def hits_today(self):
+        today = datetime.now(kst).strftime("%Y-%m-%d")
+        return self._hits_by_day.get(today, 0)
+
+    def hits_by_day(self):
+        with self._lock:
+            return dict(self._hits_by_day)
+
+
+# rag_stream_chat 답변 캐시 (영상, 모델, 질문 단위)
+chat_answer_cache = TTLCache(CHAT_CACHE_TTL)
+
+
+# get_script_summary 결과 캐시 (영상, 엔드포인트 단위)
+summary_cache = TTLCache(SUMMARY_CACHE_TTL, maxsize=512)
+
+
+# 지도 영역 식당 조회 캐시 (타일 줌, x, y 단위)
+restaurant_tile_cache = TTLCache(RESTAURANT_TILE_CACHE_TTL, maxsize=2048)
+
+
+def normalize_question(question):
+    """캐시 키 비교를 위해 질문의 공백, 대소문자, 끝 문장부호를 정규화"""
+    question = re.sub(r"\s+", " ", question).strip().lower()
+    return question.rstrip("?!.？！。 ")
+
+
+def get_chat_cache_key(video_id, model, question):
+    return (video_id, model, normalize_question(question))
+
+
 def get_video_id(url):
     # 정규식을 통해 다양한 유튜브 링크에서 ID 추출
     match = re.search(
@@ -79,6 +163,63 @@ def check_runpod_status(payload, RUNPOD_ENDPOINT_ID, interval=5):
             return response.json()
 
 
+def fetch_script_summary(url, video_id, runpod_id, session_id, use_cache=True):
+    """
+    get_script_summary 결과를 가져옴. 같은 영상/엔드포인트의 요약이 캐시에 있으면 재사용.
+    백엔드는 이 호출로 x-session-id 세션에 영상을 준비하므로, 이어서 채팅할 세션은
+    use_cache=False로 항상 백엔드를 호출해야 함 (결과는 일괄 요약용으로 캐시에 저장).
+    :return: (요약 결과 dict, 캐시 사용 여부)
+    """
+    cache_key = (video_id, runpod_id)
+    if use_cache:
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+    payload = {
+        "input": {
+            "endpoint": "get_script_summary",
+            "headers": {"x-session-id": session_id},
+            "params": {"url": url, "url_id": video_id},
+        }
+    }
+    response = check_runpod_status(payload, runpod_id)
+    result = (response or {}).get("output") or {}
+    if result.get("summary_result"):
+        summary_cache.set(cache_key, result)
+    return result, False
+
+
+def expand_video_urls(text):
+    """
+    줄 단위 URL 목록을 개별 영상 URL 목록으로 변환. 재생목록 URL은 포함된 영상으로 펼침.
+    :return: (video_id, url) 리스트 (중복 제거, 입력 순서 유지)
+    """
+    videos = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if "list=" in line and "watch?v=" not in line:
+            ydl_opts = {"quiet": True, "extract_flat": True, "ignoreerrors": True}
+            try:
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    playlist = ydl.extract_info(line, download=False) or {}
+            except Exception as e:
+                print(f"[ERROR] 재생목록 정보 추출 실패: {e}")
+                continue
+            for entry in playlist.get("entries") or []:
+                if entry and entry.get("id"):
+                    videos.setdefault(
+                        entry["id"], f"https://www.youtube.com/watch?v={entry['id']}"
+                    )
+        else:
+            video_id = get_video_id(line)
+            if video_id:
+                videos.setdefault(video_id, line)
+    return list(videos.items())
+
+
 def send_feedback_email(feedback, session_id):
     sender_email = os.getenv("SENDER_EMAIL")
     sender_password = os.getenv("SENDER_PASSWORD")
@@ -107,7 +248,43 @@ def send_feedback_email(feedback, session_id):
         return False
 
 
-def create_downloadable_file(session_state):
+# 다운로드 파일 형식별 MIME 타입
+DOWNLOAD_MIME_TYPES = {
+    "txt": "text/plain",
+    "json": "application/json",
+    "srt": "application/x-subrip",
+}
+
+# 다운로드 파일 캐시 (세션 내용 해시, 형식 단위)
+download_file_cache = TTLCache(ttl=60 * 60, maxsize=64)
+
+
+def get_session_content_hash(session_state):
+    """다운로드 파일 구성에 사용되는 세션 내용의 해시 (스크립트는 영상 단위로 고정)"""
+    content = json.dumps(
+        [
+            session_state.video_id,
+            session_state.title,
+            session_state.hashtags,
+            session_state.summary,
+            len(session_state.transcript),
+            session_state.messages,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def format_srt_time(seconds):
+    """초 단위 시간을 SRT 타임스탬프(HH:MM:SS,mmm)로 변환"""
+    millis = int(round(float(seconds) * 1000))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def build_text_file(session_state):
     # 텍스트 파일로 저장할 내용 구성
     title = f"제목: {session_state.title}"
     hashtags = f"해시태그: {session_state.hashtags}"
@@ -131,13 +308,55 @@ def create_downloadable_file(session_state):
     )
 
     # 모든 내용을 하나의 문자열로 결합
-    data = f"{title}\n{hashtags}\n\n{summary}\n\n{transcript}\n\n{chat_history}"
+    return f"{title}\n{hashtags}\n\n{summary}\n\n{transcript}\n\n{chat_history}"
+
+
+def build_json_file(session_state):
+    return json.dumps(
+        {
+            "video_id": session_state.video_id,
+            "title": session_state.title,
+            "hashtags": session_state.hashtags,
+            "summary": list(session_state.summary),
+            "transcript": list(session_state.transcript),
+            "messages": list(session_state.messages),
+        },
+        ensure_ascii=False,
+        indent=2,
+    )
+
+
+def build_srt_file(session_state):
+    return "\n".join(
+        f"{i}\n{format_srt_time(item['start'])} --> {format_srt_time(item['end'])}\n{item['text']}\n"
+        for i, item in enumerate(session_state.transcript, 1)
+    )
 
-    # 텍스트 파일을 바이트 형식으로 변환
-    file_buffer = io.BytesIO()
-    file_buffer.write(data.encode("utf-8"))
-    file_buffer.seek(0)  # 파일 시작 위치로 포인터 이동
-    return file_buffer
+
+def create_downloadable_file(session_state, file_format="txt", content_hash=None):
+    """
+    요약, 스크립트, 채팅 내역을 다운로드용 바이트로 변환.
+    세션 내용 해시 단위로 캐시되어 내용이 바뀌지 않으면 다시 생성하지 않음.
+    :param file_format: "txt", "json", "srt" 중 하나
+    :param content_hash: 미리 계산한 get_session_content_hash 값 (없으면 계산)
+    :return: UTF-8로 인코딩된 파일 내용
+    """
+    builders = {
+        "txt": build_text_file,
+        "json": build_json_file,
+        "srt": build_srt_file,
+    }
+    if file_format not in builders:
+        raise ValueError(f"지원하지 않는 파일 형식: {file_format}")
+
+    if content_hash is None:
+        content_hash = get_session_content_hash(session_state)
+    cache_key = (content_hash, file_format)
+    data = download_file_cache.get(cache_key)
+    if data is None:
+        data = builders[file_format](session_state).encode("utf-8")
+        download_file_cache.set(cache_key, data)
+    return data
 
 
 # 관리자 인증 함수
@@ -204,3 +423,172 @@ def delete_notice(notice_id):
     except Exception as e:
         print(f"[ERROR] 공지사항 삭제 실패: {e}")
         return False
+
+
+# 음성 변환 결과 캐시 테이블 생성
+def init_transcript_cache():
+    try:
+        query = text(
+            """
+            CREATE TABLE IF NOT EXISTS public.transcript_cache (
+                audio_sha256 TEXT NOT NULL,
+                language TEXT NOT NULL,
+                model TEXT NOT NULL,
+                segments JSONB NOT NULL,
+                full_text TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (audio_sha256, language, model)
+            )
+            """
+        )
+        with db._engine.connect() as conn:
+            conn.execute(query)
+            conn.commit()
+        return True
+    except Exception as e:
+        print(f"[ERROR] 음성 변환 캐시 테이블 생성 실패: {e}")
+        return False
+
+# 음성 변환 결과 캐시 조회 (언어 자동감지는 "auto"로 저장)
+def load_cached_transcript(audio_sha256, language, model):
+    try:
+        query = text(
+            "SELECT segments, full_text FROM public.transcript_cache "
+            "WHERE audio_sha256 = :audio_sha256 AND language = :language AND model = :model"
+        )
+        with db._engine.connect() as conn:
+            row = conn.execute(query, {
+                "audio_sha256": audio_sha256,
+                "language": language or "auto",
+                "model": model,
+            }).fetchone()
+        if not row:
+            return None
+        return {"segments": row.segments, "full_text": row.full_text}
+    except Exception as e:
+        print(f"[ERROR] 음성 변환 캐시 조회 실패: {e}")
+        return None
+
+# 음성 변환 결과 캐시 저장
+def save_cached_transcript(audio_sha256, language, model, segments, full_text):
+    try:
+        query = text(
+            "INSERT INTO public.transcript_cache (audio_sha256, language, model, segments, full_text) "
+            "VALUES (:audio_sha256, :language, :model, CAST(:segments AS JSONB), :full_text) "
+            "ON CONFLICT (audio_sha256, language, model) DO NOTHING"
+        )
+        with db._engine.connect() as conn:
+            conn.execute(query, {
+                "audio_sha256": audio_sha256,
+                "language": language or "auto",
+                "model": model,
+                "segments": json.dumps(segments, ensure_ascii=False),
+                "full_text": full_text,
+            })
+            conn.commit()
+        return True
+    except Exception as e:
+        print(f"[ERROR] 음성 변환 캐시 저장 실패: {e}")
+        return False
+
+
+def lng_to_tile_x(lng, zoom):
+    return int((lng + 180.0) / 360.0 * (1 << zoom))
+
+
+def lat_to_tile_y(lat, zoom):
+    lat_rad = math.radians(lat)
+    return int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * (1 << zoom))
+
+
+def get_tile_bounds(zoom, x, y):
+    """타일의 (남, 서, 북, 동) 경계 좌표"""
+    n = 1 << zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def get_tile_restaurants(zoom, x, y):
+    """타일 하나에 포함된 식당 목록 (lat, lng 인덱스 사용, 타일 단위로 캐시)"""
+    key = (zoom, x, y)
+    cached = restaurant_tile_cache.get(key)
+    if cached is not None:
+        return cached
+
+    south, west, north, east = get_tile_bounds(zoom, x, y)
+    query = text(
+        """
+        SELECT id, name, address, lat, lng, station_name, video_url
+        FROM restaurants
+        WHERE lat >= :south AND lat < :north AND lng >= :west AND lng < :east
+        ORDER BY id
+        """
+    )
+    with db._engine.connect() as conn:
+        result = conn.execute(
+            query, {"south": south, "north": north, "west": west, "east": east}
+        )
+        restaurants = [
+            {
+                "id": row.id,
+                "name": row.name,
+                "address": row.address,
+                "lat": row.lat,
+                "lng": row.lng,
+                "subway": row.station_name,
+                "video_url": row.video_url,
+            }
+            for row in result
+        ]
+    restaurant_tile_cache.set(key, restaurants)
+    return restaurants
+
+
+def get_restaurants_in_bounds(south, west, north, east, zoom, limit=200):
+    """
+    지도 화면 영역 안의 식당을 조회합니다. (LLM 에이전트를 거치지 않는 단순 조회)
+    화면을 타일로 나누어 타일별로 조회/캐시하므로 근처로 이동할 때는 DB 조회가 거의 없습니다.
+    limit보다 많으면 화면 중심에 가까운 식당부터 반환합니다.
+
+    Args:
+        south, west, north, east: 지도 경계 좌표
+        zoom: 지도 줌 레벨
+        limit: 최대 반환 식당 수
+
+    Returns:
+        식당 딕셔너리 리스트 (너무 축소된 지도이면 None)
+
+    Raises:
+        조회 실패 시 DB 예외를 그대로 전달
+    """
+    if zoom < BOUNDS_MIN_ZOOM:
+        return None
+    tile_zoom = min(int(zoom), BOUNDS_TILE_MAX_ZOOM)
+    x_range = range(lng_to_tile_x(west, tile_zoom), lng_to_tile_x(east, tile_zoom) + 1)
+    y_range = range(lat_to_tile_y(north, tile_zoom), lat_to_tile_y(south, tile_zoom) + 1)
+
+    restaurants = []
+    try:
+        for x in x_range:
+            for y in y_range:
+                for restaurant in get_tile_restaurants(tile_zoom, x, y):
+                    if south <= restaurant["lat"] <= north and west <= restaurant["lng"] <= east:
+                        restaurants.append(restaurant)
+    except Exception as e:
+        print(f"[ERROR] 지도 영역 식당 조회 실패: {e}")
+        raise
+
+    # 화면 중심에 가까운 순서 (경도 차이는 위도에 따라 줄어드므로 보정, 같으면 id 순)
+    center_lat = (south + north) / 2
+    center_lng = (west + east) / 2
+    lng_scale = math.cos(math.radians(center_lat))
+    restaurants.sort(
+        key=lambda r: (
+            (r["lat"] - center_lat) ** 2 + ((r["lng"] - center_lng) * lng_scale) ** 2,
+            r["id"],
+        )
+    )
+    return restaurants[:limit]